@@ -0,0 +1,187 @@
+"""
+Offline benchmark for the AI generation paths.
+
+Runs entirely against OfflineProvider, so no API key or network is needed:
+
+    cd backend
+    python -m benchmarks.bench_ai_generation --requests 200 --latency-ms 50
+
+Reports (as JSON):
+  - parse_validate: cost of parse_quiz_response + duplicate filtering per response
+  - endpoints: end-to-end /api/quiz/generate/topic and /generate/file throughput and latency
+  - fallback: latency and success when the first k models are down, and under random failures
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("AI_PROVIDER", "offline")
+
+import httpx
+
+from services.ai_providers import OfflineProvider, set_provider, GEMINI_MODELS
+from services.ai_service import parse_quiz_response, generate_quiz_from_topic
+from services.similarity_service import dedupe_question_texts
+
+
+def _percentiles(samples_ms):
+    if not samples_ms:
+        return {}
+    ordered = sorted(samples_ms)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def bench_parse_validate(num_questions: int, iterations: int) -> dict:
+    provider = OfflineProvider(fenced_rate=0.5, duplicate_rate=0.1)
+    payloads = [provider.generate(GEMINI_MODELS[0], f"topic {i}", num_questions) for i in range(iterations)]
+
+    parse_ms, dedupe_ms = [], []
+    for payload in payloads:
+        started = time.perf_counter()
+        questions = parse_quiz_response(payload)
+        parsed = time.perf_counter()
+        dedupe_question_texts([q.question_text for q in questions])
+        finished = time.perf_counter()
+        parse_ms.append((parsed - started) * 1000)
+        dedupe_ms.append((finished - parsed) * 1000)
+
+    return {
+        "num_questions": num_questions,
+        "parse_and_validate": _percentiles(parse_ms),
+        "dedupe": _percentiles(dedupe_ms),
+    }
+
+
+async def _drive_endpoint(app, path: str, requests: int, concurrency: int, num_questions: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one(i: int):
+            nonlocal failures
+            async with semaphore:
+                started = time.perf_counter()
+                if path.endswith("/topic"):
+                    response = await client.post(path, json={
+                        "topic": f"benchmark topic {i}",
+                        "num_questions": num_questions,
+                        "difficulty": "medium"
+                    })
+                else:
+                    response = await client.post(
+                        path,
+                        files={"file": (f"notes_{i}.txt", f"Benchmark notes {i}. " * 200, "text/plain")},
+                        data={"num_questions": str(num_questions), "difficulty": "medium"}
+                    )
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 200:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "path": path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "failures": failures,
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else None,
+        "latency": _percentiles(latencies),
+    }
+
+
+def bench_endpoints(requests: int, concurrency: int, latency_ms: float, num_questions: int) -> list:
+    from main import app
+
+    set_provider(OfflineProvider(latency_ms=latency_ms))
+    try:
+        return [
+            asyncio.run(_drive_endpoint(app, path, requests, concurrency, num_questions))
+            for path in ("/api/quiz/generate/topic", "/api/quiz/generate/file")
+        ]
+    finally:
+        set_provider(None)
+
+
+def bench_fallback(requests: int, latency_ms: float, num_questions: int) -> dict:
+    def run(provider: OfflineProvider) -> dict:
+        set_provider(provider)
+        latencies, failures, models_used = [], 0, {}
+        for i in range(requests):
+            started = time.perf_counter()
+            try:
+                result = generate_quiz_from_topic(f"fallback topic {i}", num_questions=num_questions)
+                model = result.metadata["model"]
+                models_used[model] = models_used.get(model, 0) + 1
+            except Exception:
+                failures += 1
+            latencies.append((time.perf_counter() - started) * 1000)
+        return {
+            "failures": failures,
+            "provider_calls": provider.calls,
+            "models_used": models_used,
+            "latency": _percentiles(latencies),
+        }
+
+    results = {"outages": [], "random_failures": []}
+    try:
+        for down in range(len(GEMINI_MODELS) + 1):
+            provider = OfflineProvider(latency_ms=latency_ms, failing_models=GEMINI_MODELS[:down])
+            results["outages"].append({"models_down": down, **run(provider)})
+
+        for rate in (0.1, 0.3, 0.5, 0.9):
+            provider = OfflineProvider(latency_ms=latency_ms, failure_rate=rate, malformed_rate=0.05, seed=7)
+            results["random_failures"].append({"failure_rate": rate, **run(provider)})
+    finally:
+        set_provider(None)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AI generation paths with the offline provider")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="simulated model latency per call")
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--output", type=str, default=None, help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    # Route prints and model-fallback warnings go to stderr so stdout stays pure JSON.
+    logging.getLogger("uvicorn").setLevel(logging.ERROR)
+    with contextlib.redirect_stdout(sys.stderr):
+        report = {
+            "config": vars(args),
+            "parse_validate": bench_parse_validate(args.questions, args.requests),
+            "endpoints": bench_endpoints(args.requests, args.concurrency, args.latency_ms, args.questions),
+            "fallback": bench_fallback(max(1, args.requests // 5), args.latency_ms, args.questions),
+        }
+
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(rendered)
+    print(rendered)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Compare the legacy nested-scan export preparation with the SQL path the exporters use now.
+
+    cd backend
+    python -m benchmarks.bench_export_prepare --players 2000 --questions 50
+
+Seeds a throwaway SQLite file with one finished game, then times, on the same data:
+  - legacy: ORM load of players, questions and answers, then the pre-index preparation that
+    scans every answer for each player and every question for each answer (O(P*A + A*Q))
+  - current: _leaderboard_stmt and _detailed_answers_stmt, read in batches exactly as the
+    CSV, Excel and PDF writers read them (ranking, grouping and joins done by the database)
+and checks that both produce the same leaderboard and answer rows. Prints a JSON report.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_DB_DIR = tempfile.mkdtemp(prefix="bench_export_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/bench.db"
+
+GAME_PIN = "424242"
+
+
+def legacy_prepare_game_data_for_export(game_session, players, questions, answers) -> dict:
+    """The pre-index implementation, kept verbatim as the baseline: O(P*A + A*Q)."""
+    players_data = []
+    for player in players:
+        player_answers = [a for a in answers if a.player_id == player.id]
+
+        correct_count = sum(1 for a in player_answers if a.is_correct)
+
+        answers_detail = []
+        for answer in player_answers:
+            question = next((q for q in questions if q.id == answer.question_id), None)
+            if question:
+                answers_detail.append({
+                    'question_number': question.order + 1,
+                    'question_text': question.question_text,
+                    'answer': answer.answer,
+                    'correct_answer': question.correct_answer,
+                    'is_correct': answer.is_correct,
+                    'time_taken': answer.time_taken,
+                    'points_earned': answer.points_earned
+                })
+
+        players_data.append({
+            'name': player.name,
+            'roll_number': player.roll_number,
+            'score': player.score,
+            'correct_count': correct_count,
+            'answers': answers_detail
+        })
+
+    players_data.sort(key=lambda x: x['score'], reverse=True)
+
+    return {
+        'quiz_title': game_session.quiz.title,
+        'pin': game_session.pin,
+        'host_name': game_session.host_name,
+        'created_at': game_session.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'total_questions': len(questions),
+        'players': players_data
+    }
+
+
+def seed_game(num_players: int, num_questions: int, seed: int = 1) -> int:
+    from database import init_db, SessionLocal, Quiz, Question, GameSession, Player, Answer
+
+    rng = random.Random(seed)
+    init_db()
+    questions, players, answers = [], [], []
+    for q in range(num_questions):
+        questions.append({
+            "id": q + 1, "quiz_id": 1, "question_text": f"Question {q}?", "options": ["A", "B", "C", "D"],
+            "correct_answer": "A", "time_limit": 30, "order": q
+        })
+    for p in range(num_players):
+        score = 0
+        for question in questions:
+            choice = rng.choice("ABCD")
+            points = 1000 if choice == "A" else 0
+            score += points
+            answers.append({
+                "id": len(answers) + 1, "player_id": p + 1, "question_id": question["id"], "answer": choice,
+                "is_correct": choice == "A", "time_taken": rng.uniform(0, 30), "points_earned": points
+            })
+        players.append({"id": p + 1, "game_session_id": 1, "name": f"Player {p}", "roll_number": str(p), "score": score})
+
+    with SessionLocal() as db:
+        db.add(Quiz(id=1, title="Benchmark quiz", created_by="bench"))
+        db.add(GameSession(id=1, quiz_id=1, pin=GAME_PIN, host_name="bench", status="finished",
+                           created_at=datetime(2026, 1, 1)))
+        db.execute(Question.__table__.insert(), questions)
+        db.execute(Player.__table__.insert(), players)
+        db.execute(Answer.__table__.insert(), answers)
+        db.commit()
+    return len(answers)
+
+
+def legacy_rows():
+    """ORM load + nested-scan preparation, flattened to the rows the exporters write."""
+    from database import SessionLocal, GameSession, Player, Question, Answer
+
+    with SessionLocal() as db:
+        session = db.query(GameSession).filter(GameSession.pin == GAME_PIN).first()
+        players = db.query(Player).filter(Player.game_session_id == session.id).all()
+        questions = db.query(Question).filter(Question.quiz_id == session.quiz_id).all()
+        answers = db.query(Answer).filter(Answer.player_id.in_([p.id for p in players])).all()
+        data = legacy_prepare_game_data_for_export(session, players, questions, answers)
+
+    leaderboard = [(p['name'], p['roll_number'], p['score'], p['correct_count']) for p in data['players']]
+    details = [
+        (p['name'], p['roll_number'], a['question_number'] - 1, a['question_text'], a['answer'],
+         a['correct_answer'], a['is_correct'], a['time_taken'], a['points_earned'])
+        for p in data['players'] for a in p['answers']
+    ]
+    return leaderboard, details
+
+
+def current_rows():
+    """The two statements the exporters stream from, read in yield_per batches."""
+    from database import SessionLocal, GameSession
+    from services.export_service import _leaderboard_stmt, _detailed_answers_stmt
+
+    with SessionLocal() as db:
+        session = db.query(GameSession).filter(GameSession.pin == GAME_PIN).first()
+        leaderboard = [
+            tuple(row) for partition in db.execute(_leaderboard_stmt(session.id)).partitions() for row in partition
+        ]
+        details = [
+            tuple(row)
+            for partition in db.execute(_detailed_answers_stmt(session.id, session.quiz_id)).partitions()
+            for row in partition
+        ]
+    return leaderboard, details
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, round(time.perf_counter() - started, 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark export data preparation")
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=50)
+    args = parser.parse_args()
+
+    answers = seed_game(args.players, args.questions)
+    legacy, legacy_s = _timed(legacy_rows)
+    current, current_s = _timed(current_rows)
+
+    report = {
+        "config": {"players": args.players, "questions": args.questions, "answers": answers},
+        "legacy_seconds": legacy_s,
+        "current_seconds": current_s,
+        "speedup": round(legacy_s / current_s, 1) if current_s else None,
+        "identical_output": legacy == current,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
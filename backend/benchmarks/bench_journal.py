@@ -0,0 +1,135 @@
+"""
+Measure the game event journal: group-committed appends vs one fsync per record, and replay speed.
+
+    cd backend
+    python -m benchmarks.bench_journal --games 50 --events 20000
+
+Prints a JSON report:
+  - group_commit: JournalWriter appends (what the socket handlers pay per call) and the time
+    until every record is durable, with the number of fsync groups it took
+  - fsync_per_record: the same records written and fsynced one at a time, as a baseline
+  - replay: reading every game's journal back, and compacting one game
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_JOURNAL_DIR = tempfile.mkdtemp(prefix="bench_journal_")
+os.environ["JOURNAL_DIR"] = _JOURNAL_DIR
+
+from config import settings  # noqa: E402
+from services.journal_service import JournalWriter, _encode, _game_dir, journal_group_size, read_journal  # noqa: E402
+
+
+def _events(games: int, events: int, seed: int):
+    rng = random.Random(seed)
+    keys = [(f"{100000 + index}", index + 1) for index in range(games)]
+    for index in range(events):
+        key = rng.choice(keys)
+        yield key, "answer", {
+            "name": f"Player {index % 500}", "player_id": index % 500, "question_id": index % 20,
+            "answer": rng.choice("ABCD"), "time_taken": round(rng.uniform(0.5, 20), 3)
+        }
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1e6, 2)
+
+
+def bench_group_commit(events) -> dict:
+    groups_before = sum(series[2] for series in journal_group_size._series.values())
+    writer = JournalWriter(settings.JOURNAL_DIR, settings.JOURNAL_SEGMENT_BYTES, settings.JOURNAL_MAX_OPEN_FILES)
+    writer.start()
+    append_seconds = []
+    started = time.perf_counter()
+    for key, kind, data in events:
+        call_started = time.perf_counter()
+        writer.append(key, kind, data)
+        append_seconds.append(time.perf_counter() - call_started)
+    writer.close()
+    elapsed = time.perf_counter() - started
+    groups = sum(series[2] for series in journal_group_size._series.values()) - groups_before
+    return {
+        "durable_seconds": round(elapsed, 3),
+        "records_per_second": round(len(events) / elapsed),
+        "fsync_groups": groups,
+        "append_p50_us": _percentile(append_seconds, 0.5),
+        "append_p99_us": _percentile(append_seconds, 0.99),
+    }
+
+
+def bench_fsync_per_record(events) -> dict:
+    directory = tempfile.mkdtemp(prefix="bench_journal_naive_")
+    files = {}
+    started = time.perf_counter()
+    for seq, ((pin, _), kind, data) in enumerate(events, start=1):
+        f = files.get(pin)
+        if f is None:
+            f = files[pin] = open(os.path.join(directory, f"{pin}.seg"), "ab")
+        f.write(_encode(seq, time.time() * 1000, kind, data))
+        f.flush()
+        os.fsync(f.fileno())
+    for f in files.values():
+        f.close()
+    elapsed = time.perf_counter() - started
+    return {"durable_seconds": round(elapsed, 3), "records_per_second": round(len(events) / elapsed)}
+
+
+def bench_replay(keys) -> dict:
+    started = time.perf_counter()
+    records = sum(1 for key in keys for _ in read_journal(key))
+    elapsed = time.perf_counter() - started
+
+    writer = JournalWriter(settings.JOURNAL_DIR, settings.JOURNAL_SEGMENT_BYTES, settings.JOURNAL_MAX_OPEN_FILES)
+    writer.start()
+    key = sorted(keys)[0]
+    # A restarted writer opens a second segment; compaction merges both
+    writer.append(key, "end", {"results": None})
+    before = sum(1 for _ in read_journal(key)) + 1
+    compact_started = time.perf_counter()
+    writer.compact(key)
+    writer.close()
+    compact_elapsed = time.perf_counter() - compact_started
+    return {
+        "records": records,
+        "read_seconds": round(elapsed, 3),
+        "records_per_second": round(records / elapsed) if elapsed else None,
+        "compact_seconds": round(compact_elapsed, 4),
+        "compacted_segments": len(os.listdir(_game_dir(key))),
+        "compacted_records_preserved": before == sum(1 for _ in read_journal(key)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game event journal")
+    parser.add_argument("--games", type=int, default=50)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--baseline-events", type=int, default=2000, help="records for the fsync-per-record baseline")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=str, default=None, help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    events = list(_events(args.games, args.events, args.seed))
+    report = {
+        "config": {"games": args.games, "events": args.events, "journal_dir": _JOURNAL_DIR},
+        "group_commit": bench_group_commit(events),
+        "fsync_per_record": bench_fsync_per_record(events[:args.baseline_events]),
+        "replay": bench_replay({key for key, _, _ in events}),
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Render time and memory of the PDF report engine.
+
+    cd backend
+    python -m benchmarks.bench_pdf_report --players 5000 --questions 20
+
+Seeds a throwaway SQLite database, then renders write_pdf_file in a fresh spawned
+process (as the render pool does) and reports wall time, page count, file size and
+the worker's RSS after imports and its peak RSS as JSON (Linux).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_DB_DIR = tempfile.mkdtemp(prefix="bench_pdf_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/bench.db"
+
+
+def build_game(num_players: int, num_questions: int, seed: int = 1):
+    rng = random.Random(seed)
+    game_session = SimpleNamespace(
+        id=1, quiz_id=1, pin="424242", host_name="bench",
+        created_at=datetime(2026, 1, 1), quiz=SimpleNamespace(title="Benchmark quiz")
+    )
+    questions = [
+        SimpleNamespace(id=q + 1, order=q, question_text=f"Question {q}?", correct_answer="A")
+        for q in range(num_questions)
+    ]
+    players, answers = [], []
+    for p in range(num_players):
+        score = 0
+        for question in questions:
+            choice = rng.choice("ABCD")
+            points = 1000 if choice == "A" else 0
+            score += points
+            answers.append(SimpleNamespace(
+                id=len(answers) + 1, player_id=p + 1, question_id=question.id, answer=choice,
+                is_correct=choice == "A", time_taken=rng.uniform(0, 30), points_earned=points
+            ))
+        players.append(SimpleNamespace(id=p + 1, name=f"Player {p}", roll_number=str(p), score=score))
+    return game_session, players, questions, answers
+
+
+def seed_database(game):
+    """Write a build_game() game into the benchmark database."""
+    from database import init_db, SessionLocal, Quiz, Question, GameSession, Player, Answer
+
+    game_session, players, questions, answers = game
+    init_db()
+    with SessionLocal() as db:
+        db.add(Quiz(id=1, title=game_session.quiz.title, created_by="bench"))
+        db.add(GameSession(id=1, quiz_id=1, pin=game_session.pin, host_name=game_session.host_name,
+                           status="finished", created_at=game_session.created_at))
+        db.execute(Question.__table__.insert(), [
+            {"id": q.id, "quiz_id": 1, "question_text": q.question_text, "options": ["A", "B", "C", "D"],
+             "correct_answer": q.correct_answer, "time_limit": 30, "order": q.order}
+            for q in questions
+        ])
+        db.execute(Player.__table__.insert(), [
+            {"id": p.id, "game_session_id": 1, "name": p.name, "roll_number": p.roll_number, "score": p.score}
+            for p in players
+        ])
+        db.execute(Answer.__table__.insert(), [
+            {"id": a.id, "player_id": a.player_id, "question_id": a.question_id, "answer": a.answer,
+             "is_correct": a.is_correct, "time_taken": a.time_taken, "points_earned": a.points_earned}
+            for a in answers
+        ])
+        db.commit()
+
+
+
+
+def _current_rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _render(database_url: str, game_session_id: int) -> dict:
+    # The spawned worker re-imports this module, which points DATABASE_URL at a new empty file.
+    os.environ["DATABASE_URL"] = database_url
+    from services.export_service import write_pdf_file
+
+    baseline_rss_mb = _current_rss_mb()
+    started = time.perf_counter()
+    path = write_pdf_file(game_session_id)
+    elapsed = time.perf_counter() - started
+
+    with open(path, "rb") as pdf:
+        pages = pdf.read().count(b"/Type /Page\n")
+    size = os.path.getsize(path)
+    os.remove(path)
+
+    return {
+        "render_seconds": round(elapsed, 2),
+        "pages": pages,
+        "file_bytes": size,
+        "worker_rss_after_import_mb": round(baseline_rss_mb, 1),
+        "worker_peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PDF report engine")
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=20)
+    args = parser.parse_args()
+
+    seed_database(build_game(args.players, args.questions))
+
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        result = pool.apply(_render, (os.environ["DATABASE_URL"], 1))
+
+    print(json.dumps({"config": vars(args), **result}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
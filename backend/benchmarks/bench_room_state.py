@@ -0,0 +1,175 @@
+"""
+Compare the legacy dict-of-dicts game state with the slotted GameRoom/PlayerState.
+
+    cd backend
+    python -m benchmarks.bench_room_state --rooms 100 --players 500
+
+Prints a JSON report:
+  - memory: bytes held by active_games for rooms x players (tracemalloc), both layouts
+  - broadcast: encoding one lobby_updated packet per room, as the server does on every
+    emit, with no membership change in between (legacy rebuilds and re-encodes the list;
+    the slotted room reuses its cached fragment)
+  - lobby_fill: one room filling up to --players, each join rebuilding lobby_updated
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.game_state import FragmentJSON, GameRoom, PlayerState  # noqa: E402
+
+SEPARATORS = (",", ":")
+
+
+def _players(rooms: int, players: int):
+    for room in range(rooms):
+        yield f"{100000 + room}", [
+            (f"sid-{room}-{index:06d}xxxxxxxx", f"Player {room}-{index}", room * players + index)
+            for index in range(players)
+        ]
+
+
+def build_legacy(roster) -> dict:
+    games = {}
+    for pin, players in roster:
+        game = games[pin] = {
+            'players': {},
+            'host_sid': None,
+            'status': 'waiting',
+            'current_question': 0,
+            'current_question_data': None
+        }
+        for sid, name, player_id in players:
+            game['players'][sid] = {'name': name, 'player_id': player_id, 'score': 0}
+    return games
+
+
+def build_slotted(roster) -> dict:
+    games = {}
+    for pin, players in roster:
+        game = games[pin] = GameRoom()
+        for sid, name, player_id in players:
+            game.add_player(sid, PlayerState(name, player_id))
+    return games
+
+
+def legacy_lobby_packet(game: dict) -> str:
+    players_list = [
+        {'name': p['name'], 'player_id': p['player_id']}
+        for p in game['players'].values()
+    ]
+    return json.dumps(['lobby_updated', {'players': players_list, 'count': len(players_list)}], separators=SEPARATORS)
+
+
+def slotted_lobby_packet(game: GameRoom) -> str:
+    return FragmentJSON.dumps(['lobby_updated', game.lobby_payload()], separators=SEPARATORS)
+
+
+def measure_memory(build, roster) -> dict:
+    # Materialize the input first so only the game state itself is counted
+    roster = [(pin, list(players)) for pin, players in roster]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    games = build(roster)
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    players = sum(len(players) for _, players in roster)
+    return {"bytes": held, "bytes_per_player": round(held / players, 1), "games": games}
+
+
+def _timed(fn, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round(time.perf_counter() - started, 4)
+
+
+def bench_broadcast(legacy: dict, slotted: dict, repeat: int) -> dict:
+    identical = all(
+        json.loads(legacy_lobby_packet(legacy[pin])) == json.loads(slotted_lobby_packet(slotted[pin]))
+        for pin in legacy
+    )
+    legacy_s = _timed(lambda: [legacy_lobby_packet(game) for game in legacy.values()], repeat)
+    slotted_s = _timed(lambda: [slotted_lobby_packet(game) for game in slotted.values()], repeat)
+    return {
+        "rounds": repeat,
+        "legacy_seconds": legacy_s,
+        "slotted_seconds": slotted_s,
+        "speedup": round(legacy_s / slotted_s, 1) if slotted_s else None,
+        "identical_output": identical,
+    }
+
+
+def bench_lobby_fill(players: int) -> dict:
+    _, roster = next(_players(1, players))
+
+    def legacy_fill():
+        game = build_legacy([("100000", [])])["100000"]
+        for sid, name, player_id in roster:
+            game['players'][sid] = {'name': name, 'player_id': player_id, 'score': 0}
+            legacy_lobby_packet(game)
+
+    def slotted_fill():
+        game = GameRoom()
+        for sid, name, player_id in roster:
+            game.add_player(sid, PlayerState(name, player_id))
+            slotted_lobby_packet(game)
+
+    legacy_s = _timed(legacy_fill, 1)
+    slotted_s = _timed(slotted_fill, 1)
+    return {
+        "players": players,
+        "legacy_seconds": legacy_s,
+        "slotted_seconds": slotted_s,
+        "speedup": round(legacy_s / slotted_s, 1) if slotted_s else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-memory game room state")
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--players", type=int, default=500, help="players per room")
+    parser.add_argument("--broadcasts", type=int, default=20, help="lobby_updated rounds across all rooms")
+    parser.add_argument("--output", type=str, default=None, help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    legacy = measure_memory(build_legacy, _players(args.rooms, args.players))
+    slotted = measure_memory(build_slotted, _players(args.rooms, args.players))
+    # Fragments are built lazily on the first broadcast; count them as part of the slotted state
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for game in slotted["games"].values():
+        game.lobby_payload()
+    payload_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    total_players = args.rooms * args.players
+    report = {
+        "config": {"rooms": args.rooms, "players_per_room": args.players, "players": total_players},
+        "memory": {
+            "legacy_bytes": legacy["bytes"],
+            "legacy_bytes_per_player": legacy["bytes_per_player"],
+            "slotted_bytes": slotted["bytes"],
+            "slotted_bytes_per_player": slotted["bytes_per_player"],
+            "cached_lobby_payload_bytes": payload_bytes,
+            "reduction": round(1 - (slotted["bytes"] + payload_bytes) / legacy["bytes"], 3),
+        },
+        "broadcast": bench_broadcast(legacy["games"], slotted["games"], args.broadcasts),
+        "lobby_fill": bench_lobby_fill(args.players),
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Search latency on a large question bank, checked against a p99 target.
+
+    cd backend
+    python -m benchmarks.bench_search --questions 1000000 --target-p99-ms 20
+
+Seeds a throwaway SQLite database with generated quizzes and questions (word frequencies
+follow a Zipf curve, so common words match a large share of the table), builds the FTS5
+index through the normal startup backfill, then runs search() for narrow, broad and prefix
+queries. Prints a JSON report with per-class percentiles and exits with status 1 when any
+class misses the p99 target.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_DB_DIR = tempfile.mkdtemp(prefix="bench_search_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_DIR}/bench.db"
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from database import init_db, engine, Quiz, Question  # noqa: E402
+from services import search_service  # noqa: E402
+from services.search_service import ensure_search_index, search  # noqa: E402
+
+VOCABULARY_SIZE = 20000
+QUESTIONS_PER_QUIZ = 20
+SEED_BATCH = 20000
+
+
+def _vocabulary(rng: random.Random):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def seed(questions: int, seed_value: int):
+    rng = random.Random(seed_value)
+    words = _vocabulary(rng)
+    cumulative, total = [], 0.0
+    for rank in range(len(words)):
+        total += 1 / (rank + 1)
+        cumulative.append(total)
+    quizzes = (questions + QUESTIONS_PER_QUIZ - 1) // QUESTIONS_PER_QUIZ
+
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(Quiz.__table__.insert(), [
+            {"id": quiz_id, "title": " ".join(rng.choices(words, cum_weights=cumulative, k=4)).title(), "created_by": "bench"}
+            for quiz_id in range(1, quizzes + 1)
+        ])
+        for start in range(0, questions, SEED_BATCH):
+            conn.execute(Question.__table__.insert(), [
+                {
+                    "quiz_id": index // QUESTIONS_PER_QUIZ + 1,
+                    "question_text": " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(6, 14))).capitalize() + "?",
+                    "options": ["A", "B", "C", "D"],
+                    "correct_answer": "A",
+                    "time_limit": 30,
+                    "order": index % QUESTIONS_PER_QUIZ,
+                }
+                for index in range(start, min(start + SEED_BATCH, questions))
+            ])
+    return words
+
+
+def _queries(words, rng: random.Random, per_class: int):
+    common, rare = words[:20], words[2000:]
+    return {
+        "broad": [rng.choice(common) for _ in range(per_class)],
+        "two_terms": [f"{rng.choice(common)} {rng.choice(words[:500])}" for _ in range(per_class)],
+        "narrow": [rng.choice(rare) for _ in range(per_class)],
+        "prefix": [rng.choice(common)[:4] for _ in range(per_class)],
+    }
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
+
+    return {"count": len(ordered), "p50_ms": pick(0.5), "p95_ms": pick(0.95), "p99_ms": pick(0.99), "max_ms": pick(1.0)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full-text search latency")
+    parser.add_argument("--questions", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=200, help="queries per class and scope")
+    parser.add_argument("--target-p99-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=str, default=None, help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    words = seed(args.questions, args.seed)
+    seed_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ensure_search_index()
+    index_seconds = time.perf_counter() - started
+
+    rng = random.Random(args.seed + 1)
+    results = {}
+    with Session(engine) as db:
+        for scope in ("questions", "quizzes"):
+            for name, queries in _queries(words, rng, args.queries).items():
+                search(db, queries[0], scope=scope)  # warm the page cache for this class
+                samples = []
+                for query in queries:
+                    query_started = time.perf_counter()
+                    search(db, query, scope=scope)
+                    samples.append(time.perf_counter() - query_started)
+                results[f"{scope} {name}"] = _percentiles(samples)
+
+    report = {
+        "config": {**vars(args), "backend": search_service._backend},
+        "seed_seconds": round(seed_seconds, 2),
+        "index_backfill_seconds": round(index_seconds, 2),
+        "latency": results,
+        "passed": all(r["p99_ms"] <= args.target_p99_ms for r in results.values()),
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text)
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
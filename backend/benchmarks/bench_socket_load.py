@@ -0,0 +1,562 @@
+"""
+Socket.IO load generator: N hosts with M virtual players each, driving the real game flow.
+
+Against a running instance (pass its pid to report server CPU and RSS):
+
+    cd backend
+    python -m benchmarks.bench_socket_load --url http://127.0.0.1:8000 --server-pid 12345 \\
+        --hosts 10 --players 200 --questions 5
+
+Or let the tool start a throwaway server (uvicorn main:socket_app on a temporary SQLite file):
+
+    python -m benchmarks.bench_socket_load --spawn --hosts 4 --players 250
+
+Each room follows the frontend's sequence:
+  host:   POST /api/quiz/create, POST /api/game/create, GET /api/quiz/{id}, host_join
+  player: POST /api/game/join, join_lobby (until its own lobby_updated arrives)
+  host:   POST /api/game/{pin}/start, start_game
+  per question: next_question -> players POST /api/game/answer/submit then submit_answer
+                (ack: answer_received); host GET /api/game/{pin}/question/{id}/results
+  host:   POST /api/game/{pin}/end, end_game, GET /api/game/{pin}/results
+
+With --prefetch (spawns the server with QUESTION_PREFETCH_ENABLED), players opt in to
+pre-staged questions: the host emits show_results after each results fetch, players receive
+the next question encrypted (question_staged) and open it from question_reveal, which then
+replaces question_update in the broadcast latencies.
+
+Prints a JSON report: join, broadcast and answer-ack latency percentiles, HTTP latencies,
+dropped events (expected deliveries that never arrived), and server CPU/RSS.
+
+Virtual players speak Engine.IO v4 / Socket.IO v5 directly over `websockets` (installed with
+uvicorn[standard]): a full socketio.AsyncClient per player would cost the load generator
+more CPU than the server under test.
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import websockets
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+logger = logging.getLogger("bench_socket_load")
+
+
+def _percentiles(samples_ms):
+    if not samples_ms:
+        return {"count": 0}
+    ordered = sorted(samples_ms)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+class Recorder:
+    """Latency samples and delivery counts shared by every virtual client."""
+
+    def __init__(self):
+        self.latency_ms: Dict[str, List[float]] = defaultdict(list)
+        self.expected: Dict[str, int] = defaultdict(int)
+        self.received: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def sample(self, name: str, started: float):
+        self.latency_ms[name].append((time.perf_counter() - started) * 1000)
+
+    async def http(self, client: httpx.AsyncClient, name: str, method: str, path: str, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.errors[f"http {name}: {type(e).__name__}"] += 1
+            return None
+        self.sample(f"http {name}", started)
+        if response.status_code >= 400:
+            self.errors[f"http {name}: {response.status_code}"] += 1
+            return None
+        return response.json()
+
+
+class VirtualSocket:
+    """Minimal Socket.IO client: connect to '/', emit events, dispatch incoming events."""
+
+    def __init__(self, base_url: str, on_event: Callable[[str, object], None]):
+        scheme = "wss" if base_url.startswith("https") else "ws"
+        self.url = f"{scheme}://{base_url.split('://', 1)[1].rstrip('/')}/socket.io/?EIO=4&transport=websocket"
+        self.on_event = on_event
+        # Events dropped before JSON decoding, so the generator's CPU is not spent on them
+        self.muted = set()
+        self.ws = None
+        self.closed = asyncio.Event()
+        self._reader: Optional[asyncio.Task] = None
+
+    async def connect(self, timeout: float):
+        self.ws = await asyncio.wait_for(
+            websockets.connect(self.url, max_size=None, ping_interval=None, open_timeout=timeout),
+            timeout
+        )
+        handshake = await asyncio.wait_for(self.ws.recv(), timeout)
+        if not handshake.startswith("0"):
+            raise ConnectionError(f"unexpected Engine.IO handshake: {handshake[:40]}")
+        await self.ws.send("40")
+        while True:
+            packet = await asyncio.wait_for(self.ws.recv(), timeout)
+            if packet.startswith("40"):
+                break
+            if packet.startswith("44"):
+                raise ConnectionError(f"namespace connect refused: {packet[2:]}")
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        try:
+            async for packet in self.ws:
+                if packet == "2":
+                    await self.ws.send("3")
+                elif packet.startswith("42"):
+                    if self.muted and packet[4:packet.find('"', 4)] in self.muted:
+                        continue
+                    event, *args = json.loads(packet[2:])
+                    self.on_event(event, args[0] if args else None)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            self.closed.set()
+
+    async def emit(self, event: str, data):
+        await self.ws.send("42" + json.dumps([event, data]))
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+        if self._reader is not None:
+            await self._reader
+
+
+class Broadcast:
+    """One emit to a room: when it was sent and which players have received it."""
+
+    def __init__(self, expected: int):
+        self.sent_at: Optional[float] = None
+        self.expected = expected
+        self.received = 0
+        self.done = asyncio.Event()
+
+    def arrive(self, recorder: Recorder, name: str):
+        if self.sent_at is None:
+            return
+        recorder.sample(f"broadcast {name}", self.sent_at)
+        recorder.received[name] += 1
+        self.received += 1
+        if self.received >= self.expected:
+            self.done.set()
+
+
+class VirtualPlayer:
+    def __init__(self, room: "Room", index: int):
+        self.room = room
+        self.name = f"load-{room.index}-{index}"
+        self.player_id: Optional[int] = None
+        self.socket: Optional[VirtualSocket] = None
+        self.joined = asyncio.Event()
+        self.acked = asyncio.Event()
+        self.join_sent_at = 0.0
+        self.answer_sent_at = 0.0
+        self.staged: Optional[dict] = None
+
+    def on_event(self, event: str, data):
+        recorder = self.room.recorder
+        if event == "lobby_updated":
+            if not self.joined.is_set() and self.join_sent_at and any(
+                p.get("player_id") == self.player_id for p in (data or {}).get("players", [])
+            ):
+                recorder.sample("socket join_lobby", self.join_sent_at)
+                recorder.received["lobby_updated(self)"] += 1
+                self.joined.set()
+                # Later lobby updates carry the whole room; only the first one matters here
+                self.socket.muted.add("lobby_updated")
+        elif event == "answer_received":
+            if self.answer_sent_at and not self.acked.is_set():
+                recorder.sample("answer ack", self.answer_sent_at)
+                recorder.received["answer_received"] += 1
+                self.acked.set()
+        elif event in ("question_update", "question_reveal"):
+            broadcast = self.room.broadcasts.get((event, (data or {}).get("index")))
+            if broadcast is None:
+                return
+            if event == "question_reveal":
+                if self.staged is None or self.staged["index"] != data["index"]:
+                    recorder.errors["question_reveal before question_staged"] += 1
+                    return
+                # The server's questions are encrypted JSON: open it as the frontend does
+                data = json.loads(AESGCM(base64.b64decode(data["key"])).decrypt(
+                    base64.b64decode(self.staged["iv"]), base64.b64decode(self.staged["data"]), None
+                ))
+            broadcast.arrive(recorder, event)
+            task = asyncio.create_task(self.answer(data))
+            self.room.pending.add(task)
+            task.add_done_callback(self.room.pending.discard)
+        elif event == "question_staged":
+            self.staged = data
+            broadcast = self.room.broadcasts.get((event, data["index"]))
+            if broadcast is not None:
+                broadcast.arrive(recorder, event)
+        elif event in ("game_started", "game_ended"):
+            broadcast = self.room.broadcasts.get((event,))
+            if broadcast is not None:
+                broadcast.arrive(recorder, event)
+        elif event == "error":
+            recorder.errors[f"socket error: {(data or {}).get('message')}"] += 1
+
+    async def join(self, http: httpx.AsyncClient, connect_slots: asyncio.Semaphore, timeout: float) -> bool:
+        recorder = self.room.recorder
+        async with connect_slots:
+            player = await recorder.http(http, "POST /api/game/join", "POST", "/api/game/join", json={
+                "name": self.name, "pin": self.room.pin, "roll_number": self.name
+            })
+            if player is None:
+                return False
+            self.player_id = player["id"]
+
+            self.socket = VirtualSocket(self.room.args.url, self.on_event)
+            started = time.perf_counter()
+            try:
+                await self.socket.connect(timeout)
+            except (OSError, asyncio.TimeoutError, ConnectionError, websockets.WebSocketException) as e:
+                recorder.errors[f"socket connect: {type(e).__name__}"] += 1
+                return False
+            recorder.sample("socket connect", started)
+
+            recorder.expected["lobby_updated(self)"] += 1
+            self.join_sent_at = time.perf_counter()
+            await self.socket.emit("join_lobby", {
+                "pin": self.room.pin, "name": self.name, "player_id": self.player_id, "prefetch": self.room.args.prefetch
+            })
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.joined.wait(), timeout)
+            return self.joined.is_set()
+
+    async def answer(self, question: dict):
+        args, recorder = self.room.args, self.room.recorder
+        await asyncio.sleep(random.uniform(0, args.think_ms / 1000))
+        answer = random.choice(question["options"])
+        time_taken = round(random.uniform(0.5, question["time_limit"] - 0.5), 2)
+        submitted = await recorder.http(
+            self.room.http, "POST /api/game/answer/submit", "POST", "/api/game/answer/submit", json={
+                "player_id": self.player_id, "question_id": question["question_id"],
+                "answer": answer, "time_taken": time_taken
+            }
+        )
+        if submitted is None or self.socket.closed.is_set():
+            return
+        self.acked.clear()
+        recorder.expected["answer_received"] += 1
+        self.answer_sent_at = time.perf_counter()
+        await self.socket.emit("submit_answer", {
+            "pin": self.room.pin, "player_id": self.player_id, "question_id": question["question_id"],
+            "answer": answer, "time_taken": time_taken
+        })
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(self.acked.wait(), args.event_timeout)
+        self.room.answered += 1
+
+
+class Room:
+    def __init__(self, index: int, args, recorder: Recorder, http: httpx.AsyncClient):
+        self.index = index
+        self.args = args
+        self.recorder = recorder
+        self.http = http
+        self.pin: Optional[str] = None
+        self.broadcasts: Dict[tuple, Broadcast] = {}
+        self.pending = set()
+        self.answered = 0
+
+    def on_host_event(self, event: str, data):
+        if event == "error":
+            self.recorder.errors[f"host socket error: {(data or {}).get('message')}"] += 1
+
+    async def _broadcast(self, host: VirtualSocket, key: tuple, event: str, data, players: int):
+        broadcast = Broadcast(players)
+        self.broadcasts[key] = broadcast
+        self.recorder.expected[key[0]] += players
+        broadcast.sent_at = time.perf_counter()
+        await host.emit(event, data)
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(broadcast.done.wait(), self.args.event_timeout)
+
+    async def run(self, connect_slots: asyncio.Semaphore):
+        args, recorder, http = self.args, self.recorder, self.http
+        quiz = await recorder.http(http, "POST /api/quiz/create", "POST", "/api/quiz/create", json={
+            "title": f"Load test quiz {self.index}",
+            "created_by": f"load-host-{self.index}",
+            "questions": [
+                {"question_text": f"Load question {q + 1}?", "options": ["A", "B", "C", "D"],
+                 "correct_answer": "A", "time_limit": 30}
+                for q in range(args.questions)
+            ]
+        })
+        if quiz is None:
+            return
+        game = await recorder.http(http, "POST /api/game/create", "POST", "/api/game/create", json={
+            "quiz_id": quiz["id"], "host_name": f"load-host-{self.index}"
+        })
+        if game is None:
+            return
+        self.pin = game["pin"]
+        detail = await recorder.http(http, "GET /api/quiz/{id}", "GET", f"/api/quiz/{quiz['id']}")
+        if detail is None:
+            return
+        questions = sorted(detail["questions"], key=lambda q: q["order"])
+
+        host = VirtualSocket(args.url, self.on_host_event)
+        await host.connect(args.event_timeout)
+        await host.emit("host_join", {"pin": self.pin})
+
+        players = [VirtualPlayer(self, i) for i in range(args.players)]
+        joined = await asyncio.gather(*(p.join(http, connect_slots, args.event_timeout) for p in players))
+        players = [p for p, ok in zip(players, joined) if ok]
+        if not players:
+            await host.close()
+            return
+
+        await recorder.http(http, "POST /api/game/{pin}/start", "POST", f"/api/game/{self.pin}/start")
+        await self._broadcast(host, ("game_started",), "start_game", {"pin": self.pin}, len(players))
+
+        opened_by = "question_reveal" if args.prefetch else "question_update"
+        for index, question in enumerate(questions):
+            self.answered = 0
+            # The first question has no results screen before it, so it is never staged
+            await self._broadcast(host, (opened_by if index else "question_update", index), "next_question", {
+                "pin": self.pin,
+                "question_index": index
+            }, len(players))
+            deadline = time.perf_counter() + args.think_ms / 1000 + args.event_timeout
+            while self.answered < len(players) and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            await recorder.http(
+                http, "GET /api/game/{pin}/question/{id}/results", "GET",
+                f"/api/game/{self.pin}/question/{question['id']}/results"
+            )
+            if args.prefetch and index + 1 < len(questions):
+                await self._broadcast(host, ("question_staged", index + 1), "show_results", {
+                    "pin": self.pin, "results": None
+                }, len(players))
+
+        await recorder.http(http, "POST /api/game/{pin}/end", "POST", f"/api/game/{self.pin}/end")
+        await self._broadcast(host, ("game_ended",), "end_game", {"pin": self.pin, "final_results": []}, len(players))
+        await recorder.http(http, "GET /api/game/{pin}/results", "GET", f"/api/game/{self.pin}/results")
+
+        await asyncio.gather(*(p.socket.close() for p in players), host.close(), return_exceptions=True)
+
+
+class ProcessSampler:
+    """Samples a server process's CPU time and RSS from /proc (Linux)."""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.rss_samples: List[int] = []
+        self._task: Optional[asyncio.Task] = None
+        self._cpu_start = 0.0
+        self._wall_start = 0.0
+
+    def _cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def _rss_bytes(self) -> int:
+        with open(f"/proc/{self.pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    async def _sample(self):
+        while True:
+            with contextlib.suppress(OSError):
+                self.rss_samples.append(self._rss_bytes())
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self.pid is None:
+            return
+        self._cpu_start = self._cpu_seconds()
+        self._wall_start = time.perf_counter()
+        self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> dict:
+        if self._task is None:
+            return {"available": False, "reason": "pass --server-pid or --spawn to sample the server"}
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        wall = time.perf_counter() - self._wall_start
+        cpu = self._cpu_seconds() - self._cpu_start
+        return {
+            "available": True,
+            "pid": self.pid,
+            "cpu_seconds": round(cpu, 3),
+            "cpu_percent_avg": round(100 * cpu / wall, 1) if wall else None,
+            "rss_start_mib": round(self.rss_samples[0] / 2 ** 20, 1) if self.rss_samples else None,
+            "rss_peak_mib": round(max(self.rss_samples) / 2 ** 20, 1) if self.rss_samples else None,
+        }
+
+
+def _scrape_server_metrics(text: str) -> dict:
+    """Pick the loop-health series out of /metrics, when the server exposes it."""
+    wanted = {}
+    for line in text.splitlines():
+        if line.startswith(("quiz_event_loop_lag_seconds_sum", "quiz_event_loop_lag_seconds_count")):
+            name, value = line.rsplit(" ", 1)
+            wanted[name] = float(value)
+        elif line.startswith("quiz_event_loop_stalls_total"):
+            wanted["loop_stalls"] = wanted.get("loop_stalls", 0) + float(line.rsplit(" ", 1)[1])
+    count = wanted.get("quiz_event_loop_lag_seconds_count")
+    return {
+        "loop_lag_mean_ms": round(1000 * wanted["quiz_event_loop_lag_seconds_sum"] / count, 3) if count else None,
+        "loop_stalls": int(wanted.get("loop_stalls", 0)),
+    }
+
+
+async def run_load(args) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.http_connections, max_keepalive_connections=args.http_connections)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.event_timeout * 3) as http:
+        before = await http.get("/metrics")
+        sampler = ProcessSampler(args.server_pid)
+        sampler.start()
+
+        connect_slots = asyncio.Semaphore(args.connect_concurrency)
+        rooms = [Room(i, args, recorder, http) for i in range(args.hosts)]
+        started = time.perf_counter()
+        results = await asyncio.gather(*(room.run(connect_slots) for room in rooms), return_exceptions=True)
+        elapsed = time.perf_counter() - started
+        for result in results:
+            if isinstance(result, Exception):
+                recorder.errors[f"room: {type(result).__name__}: {result}"] += 1
+
+        server = await sampler.stop()
+        after = await http.get("/metrics")
+        if before.status_code == 200 and after.status_code == 200:
+            lag_before, lag_after = _scrape_server_metrics(before.text), _scrape_server_metrics(after.text)
+            server["loop_lag_mean_ms"] = lag_after["loop_lag_mean_ms"]
+            server["loop_stalls_during_run"] = lag_after["loop_stalls"] - lag_before["loop_stalls"]
+
+    latency = {name: _percentiles(samples) for name, samples in sorted(recorder.latency_ms.items())}
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "rooms_started": sum(1 for r in rooms if r.pin),
+        "latency": {
+            "join": {k: v for k, v in latency.items() if k in ("socket connect", "socket join_lobby", "http POST /api/game/join")},
+            "broadcast": {k: v for k, v in latency.items() if k.startswith("broadcast ")},
+            "answer_ack": latency.get("answer ack", {"count": 0}),
+            "http": {k: v for k, v in latency.items() if k.startswith("http ")},
+        },
+        "deliveries": {
+            event: {"expected": expected, "received": recorder.received[event], "dropped": expected - recorder.received[event]}
+            for event, expected in sorted(recorder.expected.items())
+        },
+        "dropped_events": sum(expected - recorder.received[event] for event, expected in recorder.expected.items()),
+        "errors": dict(recorder.errors),
+        "server": server,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def spawned_server(extra_env: Optional[dict] = None):
+    """Start uvicorn main:socket_app on a free port with a throwaway SQLite database and journal."""
+    port = _free_port()
+    db_dir = tempfile.mkdtemp(prefix="bench_socket_load_")
+    env = {
+        **os.environ, "DATABASE_URL": f"sqlite:///{db_dir}/load.db", "JOURNAL_DIR": f"{db_dir}/journal",
+        **(extra_env or {})
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:socket_app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError("spawned server did not become healthy")
+            time.sleep(0.2)
+        yield url, process.pid
+    finally:
+        process.terminate()
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            process.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Socket.IO load test with virtual hosts and players")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--server-pid", type=int, default=None, help="server process to sample for CPU and RSS")
+    parser.add_argument("--spawn", action="store_true", help="start a throwaway local server instead of using --url")
+    parser.add_argument("--hosts", type=int, default=2)
+    parser.add_argument("--players", type=int, default=50, help="players per room")
+    parser.add_argument("--questions", type=int, default=3)
+    parser.add_argument("--think-ms", type=float, default=2000, help="max random delay before a player answers")
+    parser.add_argument("--event-timeout", type=float, default=10.0, help="seconds to wait for an expected event")
+    parser.add_argument("--connect-concurrency", type=int, default=100, help="players joining at once")
+    parser.add_argument("--http-connections", type=int, default=100)
+    parser.add_argument("--prefetch", action="store_true", help="players opt in to pre-staged questions")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=str, default=None, help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+
+    with contextlib.ExitStack() as stack:
+        if args.spawn:
+            extra_env = {"QUESTION_PREFETCH_ENABLED": "true"} if args.prefetch else None
+            args.url, args.server_pid = stack.enter_context(spawned_server(extra_env))
+        report = {
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+            **asyncio.run(run_load(args)),
+        }
+
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(rendered)
+    print(rendered)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Cold-start import cost of the app, and a regression guard for lazy imports.
+
+    cd backend
+    python -m benchmarks.bench_startup --runs 5 --max-seconds 2.5
+
+Each run imports `main` in a fresh interpreter and reports the import time and which
+heavy optional libraries got loaded. Exits with status 1 if any of HEAVY_MODULES is
+imported at startup or the median import time exceeds --max-seconds, so it can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Median import time (s) above which startup counts as regressed
+DEFAULT_MAX_SECONDS = 2.5
+
+# Only needed by the export, file-parsing, certificate, analytics, AI and question-prefetch paths
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "pyarrow",
+    "reportlab",
+    "openpyxl",
+    "PyPDF2",
+    "pptx",
+    "docx",
+    "PIL",
+    "pytesseract",
+    "qrcode",
+    "google.generativeai",
+    "cryptography",
+)
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+heavy = json.loads(sys.argv[1])
+print(json.dumps({"seconds": elapsed, "loaded": [m for m in heavy if m in sys.modules]}))
+"""
+
+
+def probe_once() -> dict:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE, json.dumps(HEAVY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(runs: int, max_seconds: float = DEFAULT_MAX_SECONDS) -> dict:
+    probe_once()  # warm the bytecode cache so every measured run is comparable
+    results = [probe_once() for _ in range(runs)]
+    seconds = [result["seconds"] for result in results]
+    loaded = sorted({module for result in results for module in result["loaded"]})
+    median = statistics.median(seconds)
+
+    return {
+        "median_seconds": round(median, 3),
+        "min_seconds": round(min(seconds), 3),
+        "max_seconds": round(max(seconds), 3),
+        "heavy_modules_loaded": loaded,
+        "passed": not loaded and median <= max_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark app import time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=DEFAULT_MAX_SECONDS,
+                        help="fail if the median import time is above this")
+    args = parser.parse_args()
+
+    report = {"config": vars(args), **measure(args.runs, args.max_seconds)}
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+Replay a recorded game-traffic trace (TRACE_FILE) against a test instance and diff it
+against the recording.
+
+Record on the live server by setting TRACE_FILE (e.g. TRACE_FILE=./traces/monday.jsonl.gz),
+then replay:
+
+    cd backend
+    python -m benchmarks.replay_trace traces/monday.jsonl.gz --spawn --speed 10
+
+--spawn starts a throwaway server that records its own trace, so the latency diff compares
+server-side handler durations on both sides. Against an already running instance, pass
+--url and, if it is also recording, --replay-trace with its TRACE_FILE.
+
+Recorded pins, player ids and question ids are remapped as the replay creates its own
+quizzes, games and players. Timing is compressed by --speed (1-50x), keeping each room's
+burst shape; a record still waits for everything that had finished before it started in the
+recording, so compression cannot reorder a join after the game's start (--open-loop
+disables this). Output is JSON: per-route and per-event latency distributions (recorded vs
+replayed), HTTP status mismatches, and final scores per game compared by player name.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+
+from benchmarks.bench_socket_load import VirtualSocket, _percentiles, spawned_server
+from services.trace_service import read_trace
+
+logger = logging.getLogger("replay_trace")
+
+# Route template parameter -> id space it lives in
+PATH_PARAM_KINDS = {"{pin}": "pin", "{question_id}": "question", "{player_id}": "player"}
+BODY_KEY_KINDS = {"pin": "pin", "player_id": "player", "question_id": "question"}
+
+
+def latency_key(record: dict) -> Optional[str]:
+    if record["k"] == "http":
+        return f"http {record['m']} {record.get('rt') or record['p']}"
+    if record["k"] == "ev":
+        return f"socket {record['e']}"
+    return None
+
+
+def latency_distributions(records) -> Dict[str, dict]:
+    durations = defaultdict(list)
+    for record in records:
+        key = latency_key(record)
+        if key is not None:
+            durations[key].append(record["dur"])
+    return {key: _percentiles(samples) for key, samples in durations.items()}
+
+
+class UnmappedId(Exception):
+    pass
+
+
+class IdMap:
+    """
+    Recorded id -> replayed id, per id space; lookups wait until the replay has created it.
+    A record whose ids cannot be mapped is dropped, never sent with the recorded id, which
+    could belong to a different player on the replay instance.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._futures: Dict[tuple, asyncio.Future] = {}
+
+    def _future(self, kind: str, old) -> asyncio.Future:
+        key = (kind, str(old))
+        if key not in self._futures:
+            self._futures[key] = asyncio.get_running_loop().create_future()
+        return self._futures[key]
+
+    def set(self, kind: str, old, new):
+        future = self._future(kind, old)
+        if not future.done():
+            future.set_result(new)
+
+    def fail(self, kind: str, old):
+        future = self._future(kind, old)
+        if not future.done():
+            future.set_exception(UnmappedId(kind))
+
+    async def get(self, kind: str, old):
+        if old is None:
+            return None
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._future(kind, old)), self.timeout)
+        except asyncio.TimeoutError:
+            raise UnmappedId(kind)
+
+    def known(self, kind: str, old) -> bool:
+        future = self._futures.get((kind, str(old)))
+        return future is not None and future.done() and future.exception() is None
+
+
+class CausalGate:
+    """
+    Keeps the recording's happens-before order under time compression: a record is sent
+    only once every record that had finished before it started (in the recording) has
+    finished in the replay, e.g. the host's start waits for the joins that preceded it.
+    """
+
+    def __init__(self, records: List[dict], timeout: float):
+        self.timeout = timeout
+        by_end = sorted(range(len(records)), key=lambda i: records[i]["t"] + records[i].get("dur", 0))
+        self.end_rank = {index: rank for rank, index in enumerate(by_end)}
+        self.end_times = [records[i]["t"] + records[i].get("dur", 0) for i in by_end]
+        self.completed = [False] * len(records)
+        self.prefix = 0
+        self.condition = asyncio.Condition()
+
+    async def wait(self, record: dict) -> bool:
+        required = bisect_left(self.end_times, record["t"])
+        async with self.condition:
+            try:
+                await asyncio.wait_for(self.condition.wait_for(lambda: self.prefix >= required), self.timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+    async def done(self, index: int):
+        async with self.condition:
+            self.completed[self.end_rank[index]] = True
+            while self.prefix < len(self.completed) and self.completed[self.prefix]:
+                self.prefix += 1
+            self.condition.notify_all()
+
+
+class Replayer:
+    def __init__(self, args, http: httpx.AsyncClient):
+        self.args = args
+        self.http = http
+        self.ids = IdMap(args.map_timeout)
+        self.sockets: Dict[str, asyncio.Future] = {}
+        self.client_latency_ms: Dict[str, List[float]] = defaultdict(list)
+        self.status_mismatches: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.lag_ms: List[float] = []
+
+    def _socket(self, sid: str) -> asyncio.Future:
+        if sid not in self.sockets:
+            self.sockets[sid] = asyncio.get_running_loop().create_future()
+        return self.sockets[sid]
+
+    async def _rewrite(self, value, kind: Optional[str] = None):
+        if kind is not None and isinstance(value, (int, str)):
+            return await self.ids.get(kind, value)
+        if isinstance(value, dict):
+            rewritten = {}
+            for key, item in value.items():
+                if key == "question_data" and isinstance(item, dict):
+                    rewritten[key] = {**item, "id": await self.ids.get("question", item.get("id"))}
+                else:
+                    rewritten[key] = await self._rewrite(item, BODY_KEY_KINDS.get(key))
+            return rewritten
+        if isinstance(value, list):
+            return [await self._rewrite(item) for item in value]
+        return value
+
+    async def _rewrite_path(self, record: dict) -> str:
+        template = record.get("rt")
+        segments = record["p"].split("/")
+        if template:
+            for i, name in enumerate(template.split("/")):
+                kind = PATH_PARAM_KINDS.get(name)
+                if kind and i < len(segments):
+                    segments[i] = str(await self.ids.get(kind, segments[i]))
+        return "/".join(segments)
+
+    async def create_quiz(self, record: dict):
+        questions = sorted(record["questions"], key=lambda q: q["order"])
+        created = await self.http.post("/api/quiz/create", json={
+            "title": record["title"] if len(record["title"]) >= 3 else f"Replay {record['title']}",
+            "created_by": "replay",
+            "questions": [
+                {k: q[k] for k in ("question_text", "options", "correct_answer", "time_limit")}
+                for q in questions
+            ]
+        })
+        if created.status_code != 200:
+            self.errors[f"quiz create: {created.status_code}"] += 1
+            self.ids.fail("quiz_for_pin", record["pin"])
+            return
+        quiz_id = created.json()["id"]
+        detail = (await self.http.get(f"/api/quiz/{quiz_id}")).json()
+        for old, new in zip(questions, sorted(detail["questions"], key=lambda q: q["order"])):
+            self.ids.set("question", old["id"], new["id"])
+        self.ids.set("quiz_for_pin", record["pin"], quiz_id)
+
+    async def send_http(self, record: dict):
+        method, route = record["m"], record.get("rt") or record["p"]
+        body = record.get("b")
+        if (method, route) == ("POST", "/api/game/create"):
+            recorded_pin = (record.get("r") or {}).get("pin")
+            body = {**body, "quiz_id": await self.ids.get("quiz_for_pin", recorded_pin)}
+        elif body is not None:
+            body = await self._rewrite(body)
+        path = await self._rewrite_path(record)
+        query = record.get("q") or ""
+
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(method, path + (f"?{query}" if query else ""), json=body)
+        except httpx.HTTPError as e:
+            self.errors[f"http {method} {route}: {type(e).__name__}"] += 1
+            return
+        self.client_latency_ms[f"http {method} {route}"].append((time.perf_counter() - started) * 1000)
+        if response.status_code != record["s"]:
+            self.status_mismatches[f"{method} {route}: {record['s']} -> {response.status_code}"] += 1
+
+        recorded = record.get("r") or {}
+        if recorded and route in ("/api/game/create", "/api/game/join"):
+            kind, key = ("pin", "pin") if route == "/api/game/create" else ("player", "id")
+            if response.status_code < 400:
+                self.ids.set(kind, recorded[key], response.json()[key])
+            else:
+                self.ids.fail(kind, recorded[key])
+
+    async def send_event(self, record: dict):
+        sid, event = record["sid"], record["e"]
+        if event == "connect":
+            client = VirtualSocket(self.args.url, lambda *_: None)
+            try:
+                await client.connect(self.args.map_timeout)
+            except Exception as e:
+                self.errors[f"socket connect: {type(e).__name__}"] += 1
+                self._socket(sid).set_result(None)
+                return
+            self._socket(sid).set_result(client)
+            return
+
+        try:
+            client = await asyncio.wait_for(asyncio.shield(self._socket(sid)), self.args.map_timeout)
+        except asyncio.TimeoutError:
+            self.errors["socket event before connect"] += 1
+            return
+        if client is None:
+            return
+        if event == "disconnect":
+            await client.close()
+            return
+        await client.emit(event, await self._rewrite(record.get("d")))
+
+    async def dispatch(self, record: dict, index: int, gate: Optional[CausalGate]):
+        if gate is not None and not await gate.wait(record):
+            self.errors["causal wait timed out"] += 1
+        try:
+            if record["k"] == "quiz":
+                await self.create_quiz(record)
+            elif record["k"] == "http":
+                await self.send_http(record)
+            elif record["k"] == "ev":
+                await self.send_event(record)
+        except UnmappedId as e:
+            self.errors[f"dropped {record['k']} record: unmapped {e}"] += 1
+        except Exception as e:
+            self.errors[f"{record['k']}: {type(e).__name__}: {e}"] += 1
+        finally:
+            if gate is not None:
+                await gate.done(index)
+
+    async def run(self, records: List[dict]):
+        tasks = []
+        gate = None if self.args.open_loop else CausalGate(records, self.args.map_timeout)
+        started = time.perf_counter()
+        for index, record in enumerate(records):
+            due = started + record["t"] / 1000 / self.args.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                self.lag_ms.append(-delay * 1000)
+            tasks.append(asyncio.create_task(self.dispatch(record, index, gate)))
+        await asyncio.gather(*tasks)
+        # Let late acks and broadcasts land before sockets close
+        await asyncio.sleep(1)
+        for future in self.sockets.values():
+            if future.done() and future.result() is not None:
+                await future.result().close()
+
+    async def compare_scores(self, finals: List[dict]) -> List[dict]:
+        games = []
+        for final in finals:
+            if not self.ids.known("pin", final["pin"]):
+                games.append({"recorded_pin": final["pin"], "error": "game was not recreated"})
+                continue
+            pin = await self.ids.get("pin", final["pin"])
+            results = (await self.http.get(f"/api/game/{pin}/results")).json()
+            replayed = {p["name"]: p["score"] for p in results.get("players", [])}
+            recorded = final["scores"]
+            mismatches = [
+                {"name": name, "recorded": score, "replayed": replayed.get(name)}
+                for name, score in recorded.items() if replayed.get(name) != score
+            ]
+            games.append({
+                "recorded_pin": final["pin"],
+                "replayed_pin": pin,
+                "players": len(recorded),
+                "scores_matched": len(recorded) - len(mismatches),
+                "mismatches": mismatches[:20],
+            })
+        return games
+
+
+def diff_distributions(recorded: Dict[str, dict], replayed: Dict[str, dict]) -> Dict[str, dict]:
+    diff = {}
+    for key in sorted(set(recorded) | set(replayed)):
+        before, after = recorded.get(key, {"count": 0}), replayed.get(key, {"count": 0})
+        entry = {"recorded": before, "replayed": after}
+        for q in ("p50_ms", "p95_ms", "p99_ms"):
+            if before.get(q) and after.get(q) is not None:
+                entry[f"{q[:-3]}_ratio"] = round(after[q] / before[q], 3)
+        diff[key] = entry
+    return diff
+
+
+async def replay(args, records: List[dict]) -> dict:
+    limits = httpx.Limits(max_connections=args.http_connections, max_keepalive_connections=args.http_connections)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as http:
+        replayer = Replayer(args, http)
+        started = time.perf_counter()
+        await replayer.run([r for r in records if r["k"] in ("quiz", "http", "ev")])
+        elapsed = time.perf_counter() - started
+        scores = await replayer.compare_scores([r for r in records if r["k"] == "final"])
+
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "schedule_lag": _percentiles(replayer.lag_ms),
+        "client_latency": {k: _percentiles(v) for k, v in sorted(replayer.client_latency_ms.items())},
+        "status_mismatches": dict(replayer.status_mismatches),
+        "errors": dict(replayer.errors),
+        "final_scores": scores,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game-traffic trace")
+    parser.add_argument("trace", help="TRACE_FILE recorded by the server (.jsonl or .jsonl.gz)")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--spawn", action="store_true", help="replay against a throwaway local server")
+    parser.add_argument("--replay-trace", default=None, help="trace the target instance records during the replay")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression, 1-50x")
+    parser.add_argument("--open-loop", action="store_true",
+                        help="send every record on its compressed timestamp, ignoring recorded ordering")
+    parser.add_argument("--map-timeout", type=float, default=30.0, help="seconds to wait for a remapped id")
+    parser.add_argument("--http-connections", type=int, default=100)
+    parser.add_argument("--output", type=str, default=None, help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    if not 1 <= args.speed <= 50:
+        parser.error("--speed must be between 1 and 50")
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+
+    records = sorted((r for r in read_trace(args.trace) if "t" in r), key=lambda r: r["t"])
+
+    with contextlib.ExitStack() as stack:
+        if args.spawn:
+            args.replay_trace = os.path.join(tempfile.mkdtemp(prefix="replay_trace_"), "replay.jsonl")
+            args.url, _ = stack.enter_context(spawned_server({"TRACE_FILE": args.replay_trace}))
+        result = asyncio.run(replay(args, records))
+    # Leaving the context stops the spawned server, which flushes its trace
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "recorded_records": len(records),
+        **result,
+    }
+    if args.replay_trace and os.path.exists(args.replay_trace):
+        report["latency_diff"] = diff_distributions(
+            latency_distributions(records),
+            latency_distributions(r for r in read_trace(args.replay_trace) if "t" in r)
+        )
+
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(rendered)
+    print(rendered)
+
+
+if __name__ == "__main__":
+    main()
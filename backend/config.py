@@ -13,10 +13,16 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./quiz_platform.db"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20  # connections opened beyond the pool under load; keep within the server's limit
+    DB_POOL_TIMEOUT: int = 5
     
     # AI Configuration (Switched to Gemini)
-    GEMINI_API_KEY: str  # <--- MAKE SURE THIS IS IN YOUR .ENV
+    AI_PROVIDER: str = "gemini"  # "gemini" or "offline" (deterministic, no network)
+    GEMINI_API_KEY: Optional[str] = None  # <--- Required when AI_PROVIDER is "gemini"
     OPENAI_API_KEY: Optional[str] = None  # Kept as optional just in case
+    AI_OFFLINE_LATENCY_MS: float = 0.0
+    AI_OFFLINE_FAILURE_RATE: float = 0.0
     
     # Frontend base URL for join links and QR codes
     FRONTEND_BASE_URL: str = "http://localhost:3000"
@@ -59,7 +65,66 @@ class Settings(BaseSettings):
     POINTS_CORRECT: int = 1000
     SPEED_BONUS_MAX: int = 500
 
+    # Duplicate detection (token Jaccard similarity, 0-1)
+    DUPLICATE_SIMILARITY_THRESHOLD: float = 0.6
+
+    # HTTP caching
+    # Seconds a client may reuse a finished game's results without revalidating; regrades
+    # change finished games, so keep it short (0 = always revalidate via the ETag)
+    FINISHED_GAME_CACHE_MAX_AGE: int = 0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 512
+
+    # Exports
+    EXPORT_WORKERS: int = 2
+    PDF_RENDER_WORKERS: int = 1
+    EXPORT_ARTIFACT_DIR: str = "./exports"
+    EXPORT_JOB_CONCURRENCY: int = 2
+    EXPORT_JOB_HISTORY: int = 256
+    # Stored artifacts are rebuilt on demand, so the oldest go once they pass either bound
+    EXPORT_ARTIFACT_MAX_AGE_HOURS: int = 72
+    EXPORT_ARTIFACT_MAX_BYTES: int = 2 * 1024 ** 3
+
+    # Socket.IO packet logging (very verbose; for debugging only)
+    SOCKETIO_LOGGING: bool = False
+
+    # Timer wheel for disconnect grace periods and room expiry (span = tick x slots)
+    TIMER_WHEEL_TICK_SECONDS: float = 0.25
+    TIMER_WHEEL_SLOTS: int = 512
+
+    # How long an in-memory room is kept once finished, without a host, or empty (seconds)
+    ROOM_FINISHED_TTL_SECONDS: int = 600
+    ROOM_HOSTLESS_TTL_SECONDS: int = 1800
+    ROOM_ABANDONED_TTL_SECONDS: int = 300
+    # Changed rooms are snapshotted this often and restored on startup; restored players
+    # who do not reconnect within the grace period are dropped
+    ROOM_SNAPSHOT_INTERVAL_SECONDS: float = 2.0
+    ROOM_RESTORE_GRACE_SECONDS: int = 60
+
+    # Append-only per-game event journal (segment files under JOURNAL_DIR/<pin>/<game session id>/)
+    JOURNAL_ENABLED: bool = True
+    JOURNAL_DIR: str = "./journal"
+    JOURNAL_SEGMENT_BYTES: int = 1024 * 1024
+    JOURNAL_MAX_OPEN_FILES: int = 256
+    # Journals outlive their rooms and are deleted with their game; set to also drop them
+    # once untouched for this many days (0 keeps them)
+    JOURNAL_RETENTION_DAYS: int = 0
+
+    # Push the next question (AES-GCM encrypted) to clients that opt in while the previous
+    # question's results are showing, so opening it only sends the key
+    QUESTION_PREFETCH_ENABLED: bool = False
+
+    # Event-loop watchdog and profiler
+    LOOP_WATCHDOG_ENABLED: bool = True
+    LOOP_WATCHDOG_INTERVAL_SECONDS: float = 0.1
+    LOOP_STALL_THRESHOLD_SECONDS: float = 0.25
+    LOOP_STALL_HISTORY: int = 100
+    PROFILE_MAX_SECONDS: int = 60
+
+    # Game traffic capture for replay (JSON Lines; gzip if the path ends in .gz). Off when unset.
+    TRACE_FILE: Optional[str] = None
+
     # Auth
+    ADMIN_HOST_IDS: List[str] = ["admin"]
     JWT_SECRET_KEY: str = "change-me-in-production"
     JWT_EXPIRE_MINUTES: int = 60 * 24
     
@@ -1,13 +1,25 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, JSON, inspect, text
+from sqlalchemy import create_engine, Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Boolean, Float, JSON, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 from config import settings
 
+# Routes run their queries on the event loop, so a checkout that waits for a free
+# connection also stops the requests that would return one. The pool overflows up to
+# DB_MAX_OVERFLOW before waiting, and gives up after DB_POOL_TIMEOUT seconds. SQLite
+# keeps SQLAlchemy's default pool; the sizing only applies to client/server databases.
+_is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+_pool_options = {} if _is_sqlite else {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+}
+
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    echo=settings.DEBUG,
+    **_pool_options
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -22,6 +34,7 @@ class Quiz(Base):
     description = Column(Text, nullable=True)
     created_by = Column(String(100), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    revision = Column(Integer, nullable=False, default=1)  # bumped on every content change
     questions = relationship("Question", back_populates="quiz", cascade="all, delete-orphan")
     game_sessions = relationship("GameSession", back_populates="quiz", cascade="all, delete-orphan")
 
@@ -40,8 +53,18 @@ class Question(Base):
     quiz = relationship("Quiz", back_populates="questions")
 
 
+class QuestionLSHBucket(Base):
+    __tablename__ = "question_lsh_buckets"
+
+    id = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, nullable=False, index=True)  # MinHash band hash
+    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False, index=True)
+
+
 class GameSession(Base):
     __tablename__ = "game_sessions"
+    # Never hand a deleted game's id to a new one: game journals are keyed by it
+    __table_args__ = {"sqlite_autoincrement": True}
     
     id = Column(Integer, primary_key=True, index=True)
     quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
@@ -54,6 +77,7 @@ class GameSession(Base):
     ended_at = Column(DateTime, nullable=True)
     certificate_threshold = Column(Integer, default=75)
     certificate_template_path = Column(String(500), nullable=True)
+    revision = Column(Integer, nullable=False, default=1)  # bumped on every join/answer/state change
     
     quiz = relationship("Quiz", back_populates="game_sessions")
     players = relationship("Player", back_populates="game_session", cascade="all, delete-orphan")
@@ -99,56 +123,67 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
-def init_db():
-    Base.metadata.create_all(bind=engine)
-    _ensure_game_session_certificate_columns()
-    _ensure_player_roll_number_column()
-    _ensure_user_table()
+class GameRoomSnapshot(Base):
+    """Last snapshot of a game's in-memory room state, restored on startup."""
+    __tablename__ = "game_room_snapshots"
 
+    pin = Column(String(64), primary_key=True)
+    state = Column(Text, nullable=False)  # JSON from GameRoom.to_snapshot()
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-def _ensure_game_session_certificate_columns():
-    """
-    Lightweight schema patch for existing DBs without running alembic migrations.
-    """
-    inspector = inspect(engine)
-    if "game_sessions" not in inspector.get_table_names():
-        return
 
-    columns = {column["name"] for column in inspector.get_columns("game_sessions")}
+class IndexBackfill(Base):
+    """Progress of a resumable index backfill, so an interrupted one picks up where it stopped."""
+    __tablename__ = "index_backfills"
+
+    name = Column(String(64), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)  # highest source row id already indexed
+    completed_at = Column(DateTime, nullable=True)
+
 
+def init_db():
     with engine.begin() as conn:
-        if "certificate_threshold" not in columns:
-            conn.execute(text("ALTER TABLE game_sessions ADD COLUMN certificate_threshold INTEGER DEFAULT 75"))
+        Base.metadata.create_all(bind=conn)
+
+        # One reflection pass shared by every legacy-schema patch below; create_all has
+        # already created any missing table (including users on pre-auth databases).
+        inspector = inspect(conn)
+        columns = {
+            table_name: {column["name"] for column in inspector.get_columns(table_name)}
+            for table_name in ("quizzes", "game_sessions", "players")
+        }
 
-        if "certificate_template_path" not in columns:
-            conn.execute(text("ALTER TABLE game_sessions ADD COLUMN certificate_template_path VARCHAR(500)"))
+        _ensure_game_session_certificate_columns(conn, columns["game_sessions"])
+        _ensure_player_roll_number_column(conn, columns["players"])
+        _ensure_revision_columns(conn, columns)
 
 
-def _ensure_player_roll_number_column():
+def _ensure_game_session_certificate_columns(conn, columns):
     """
-    Add roll_number on players for direct join without affecting old rows/flows.
+    Lightweight schema patch for existing DBs without running alembic migrations.
     """
-    inspector = inspect(engine)
-    if "players" not in inspector.get_table_names():
-        return
+    if "certificate_threshold" not in columns:
+        conn.execute(text("ALTER TABLE game_sessions ADD COLUMN certificate_threshold INTEGER DEFAULT 75"))
 
-    columns = {column["name"] for column in inspector.get_columns("players")}
-    if "roll_number" in columns:
-        return
+    if "certificate_template_path" not in columns:
+        conn.execute(text("ALTER TABLE game_sessions ADD COLUMN certificate_template_path VARCHAR(500)"))
 
-    with engine.begin() as conn:
+
+def _ensure_player_roll_number_column(conn, columns):
+    """
+    Add roll_number on players for direct join without affecting old rows/flows.
+    """
+    if "roll_number" not in columns:
         conn.execute(text("ALTER TABLE players ADD COLUMN roll_number VARCHAR(50)"))
 
 
-def _ensure_user_table():
+def _ensure_revision_columns(conn, columns_by_table):
     """
-    Ensure auth user table exists on legacy DBs.
+    Add revision counters used for ETag generation on legacy DBs.
     """
-    inspector = inspect(engine)
-    if "users" in inspector.get_table_names():
-        return
-
-    User.__table__.create(bind=engine, checkfirst=True)
+    for table_name in ("quizzes", "game_sessions"):
+        if "revision" not in columns_by_table[table_name]:
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN revision INTEGER NOT NULL DEFAULT 1"))
 
 
 def get_db():
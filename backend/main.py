@@ -1,6 +1,6 @@
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import socketio
@@ -9,8 +9,15 @@ import logging
 
 from config import settings
 from database import init_db
-from routes import quiz, game, export, auth
-from services.socket_manager import sio
+from routes import quiz, game, export, auth, admin
+from services.socket_manager import sio, restore_game_rooms, snapshot_game_rooms
+from services.search_service import ensure_search_index
+from services.similarity_service import ensure_similarity_index
+from services.trace_service import TraceMiddleware, start_trace, stop_trace
+from services.diagnostics_service import start_loop_watchdog, stop_loop_watchdog
+from services.timer_service import start_timers, stop_timers
+from services.journal_service import start_journal, stop_journal
+from services.metrics_service import HTTPMetricsMiddleware, render_metrics, PROMETHEUS_CONTENT_TYPE
 
 # Setup logging - essential for GenAI monitoring
 logging.basicConfig(level=logging.INFO)
@@ -22,10 +29,22 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Initializing application resources...")
     try:
         init_db() 
+        ensure_search_index()
+        ensure_similarity_index()
     except Exception as e:
         logger.error(f"❌ Database failed to initialize: {e}")
+    start_loop_watchdog()
+    start_journal()
+    await restore_game_rooms()
+    start_timers()
+    start_trace()
     
     yield
+    await stop_loop_watchdog()
+    await stop_timers()
+    await snapshot_game_rooms()
+    stop_journal()
+    stop_trace()
     # Shutdown: Clean up connections
     logger.info("🛑 Shutting down...")
 
@@ -40,7 +59,8 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     # Log the error internally regardless
     logger.error(f"Validation error at {request.url}: {exc.errors()}")
     
-    content = {"detail": exc.errors()}
+    # Errors raised by custom validators carry the exception in ctx; render it as text
+    content = {"detail": json.loads(json.dumps(exc.errors(), default=str))}
     
     # Only expose raw body in development mode
     if settings.DEBUG:
@@ -62,12 +82,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(HTTPMetricsMiddleware)
+if settings.TRACE_FILE:
+    app.add_middleware(TraceMiddleware)
 # Change these in main.py:
 # Remove the prefixes here because they are already inside the router files
 app.include_router(quiz.router) 
 app.include_router(game.router)
 app.include_router(export.router)
 app.include_router(auth.router)
+app.include_router(admin.router)
 
 @app.get("/health")
 async def health_check():
@@ -77,6 +101,11 @@ async def health_check():
         "environment": settings.ENV # Helpful for deployment debugging
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of HTTP and Socket.IO latency, load and fan-out."""
+    return Response(content=render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 socket_app = socketio.ASGIApp(
     sio,
     other_asgi_app=app,
@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+
+from config import settings
+from database import User
+from routes.auth import _require_admin
+from services.diagnostics_service import ProfilerBusy, recent_stalls, render_folded, sample_profile
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+
+@router.get("/diagnostics/stalls")
+async def get_loop_stalls(admin: User = Depends(_require_admin)):
+    """Most recent event-loop stalls caught by the watchdog, newest first, with the blocking stack."""
+    return {
+        "threshold_ms": settings.LOOP_STALL_THRESHOLD_SECONDS * 1000,
+        "stalls": recent_stalls()
+    }
+
+
+@router.post("/diagnostics/profile", response_class=PlainTextResponse)
+async def profile_process(
+    seconds: float = Query(10, gt=0),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    include_idle: bool = False,
+    admin: User = Depends(_require_admin)
+):
+    """
+    Sample all threads of the live process for `seconds` and return folded stacks
+    (`thread;outer;...;inner count`), loadable in speedscope or flamegraph.pl.
+    """
+    if seconds > settings.PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be at most {settings.PROFILE_MAX_SECONDS}")
+
+    try:
+        # The sampler runs in a worker thread so the loop it observes keeps serving games
+        profile = await run_in_threadpool(sample_profile, seconds, interval_ms / 1000, include_idle)
+    except ProfilerBusy:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    return PlainTextResponse(
+        render_folded(profile),
+        headers={
+            "X-Profile-Samples": str(profile["samples"]),
+            "Content-Disposition": "attachment; filename=profile.folded"
+        }
+    )
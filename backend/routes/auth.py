@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
+from config import settings
 from database import User, get_db
 from schemas import AuthTokenResponse, AuthUserResponse, LoginRequest, SignupRequest
 from services.auth_service import create_access_token, decode_access_token, hash_password
@@ -51,6 +52,13 @@ def _get_current_user(
     return user
 
 
+def _require_admin(current_user: User = Depends(_get_current_user)) -> User:
+    admin_emails = {f"{_normalize_email(host_id)}@host.local" for host_id in settings.ADMIN_HOST_IDS}
+    if current_user.email not in admin_emails:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+
 @router.post("/signup", response_model=AuthTokenResponse)
 async def signup(payload: SignupRequest, db: Session = Depends(get_db)):
     raise HTTPException(status_code=403, detail="Signup is disabled. Use your assigned credentials.")
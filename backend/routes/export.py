@@ -1,42 +1,127 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from database import get_db, GameSession, Player, Question, Answer
+from database import get_db, GameSession
 from services.export_service import (
-    generate_csv,
-    generate_excel,
-    generate_pdf,
-    prepare_game_data_for_export
+    stream_csv,
+    write_excel_file,
+    run_export_in_pool,
+    EXCEL_MEDIA_TYPE,
+    write_pdf_file,
+    run_render_in_pool,
+    ANALYTICS_FORMATS,
+    analytics_export_available,
+    write_analytics_file,
+    host_game_ids
 )
+from services.export_jobs import (
+    EXPORT_FORMATS,
+    JOB_DONE,
+    submit_export,
+    wait_for_export,
+    get_job,
+    job_status,
+    media_type_for,
+    download_filename
+)
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+import os
+import re
 
 router = APIRouter(prefix="/api/export", tags=["Export"])
 
 
-@router.get("/{pin}/csv")
-async def export_csv(pin: str, db: Session = Depends(get_db)):
-    """Export game results as CSV"""
-    
+def _get_game_or_404(db: Session, pin: str) -> GameSession:
     game_session = db.query(GameSession).filter(GameSession.pin == pin).first()
     
     if not game_session:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    # Get all related data
-    players = db.query(Player).filter(Player.game_session_id == game_session.id).all()
-    questions = db.query(Question).filter(Question.quiz_id == game_session.quiz_id).all()
+    return game_session
+
+
+def _artifact_response(job: dict) -> FileResponse:
+    if job["status"] != JOB_DONE:
+        raise HTTPException(status_code=500, detail=f"Export failed: {job['error']}")
+    if not os.path.exists(job["path"]):
+        raise HTTPException(status_code=410, detail="Export artifact is no longer available")
+    
+    return FileResponse(
+        job["path"],
+        media_type=media_type_for(job["format"]),
+        headers={
+            "Content-Disposition": f"attachment; filename={download_filename(job['pin'], job['format'])}"
+        }
+    )
+
+
+async def _finished_game_artifact(game_session: GameSession, fmt: str) -> FileResponse:
+    # Results of a finished game only change on a revision bump, so the stored artifact is reused
+    job = await wait_for_export(submit_export(game_session, fmt))
+    return _artifact_response(job)
+
+
+def _require_analytics(fmt: str):
+    if fmt in ANALYTICS_FORMATS and not analytics_export_available():
+        raise HTTPException(status_code=501, detail="Columnar exports need pyarrow installed on the server")
+
+
+@router.post("/{pin}/{fmt}/jobs", status_code=202)
+async def create_export_job(pin: str, fmt: str, db: Session = Depends(get_db)):
+    """Queue an export in the background; identical in-flight requests share one job"""
+    
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unknown export format '{fmt}'")
+    _require_analytics(fmt)
+    
+    game_session = _get_game_or_404(db, pin)
+    job = submit_export(game_session, fmt)
+    
+    return JSONResponse(
+        status_code=200 if job["status"] == JOB_DONE else 202,
+        content=job_status(job)
+    )
+
+
+@router.get("/jobs/{job_id}")
+async def get_export_job(job_id: str):
+    """Poll the status of an export job"""
+    
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    
+    return job_status(job)
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_export_job(job_id: str):
+    """Download the artifact of a finished export job"""
     
-    # Get all answers
-    player_ids = [p.id for p in players]
-    answers = db.query(Answer).filter(Answer.player_id.in_(player_ids)).all()
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if job["status"] != JOB_DONE and not job["error"]:
+        raise HTTPException(status_code=409, detail=f"Export job is {job['status']}")
+    
+    return _artifact_response(job)
+
+
+@router.get("/{pin}/csv")
+async def export_csv(pin: str, db: Session = Depends(get_db)):
+    """Export game results as CSV"""
     
-    # Prepare data
-    game_data = prepare_game_data_for_export(game_session, players, questions, answers)
+    game_session = _get_game_or_404(db, pin)
     
-    # Generate CSV
-    csv_buffer = generate_csv(game_data)
+    if game_session.status == "finished":
+        return await _finished_game_artifact(game_session, "csv")
     
+    # Rows are streamed from the database in batches, so memory stays flat for any game size
     return StreamingResponse(
-        csv_buffer,
+        stream_csv(game_session.id, game_session.quiz_id),
         media_type="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename=quiz_results_{pin}.csv"
@@ -48,31 +133,21 @@ async def export_csv(pin: str, db: Session = Depends(get_db)):
 async def export_excel(pin: str, db: Session = Depends(get_db)):
     """Export game results as Excel"""
     
-    game_session = db.query(GameSession).filter(GameSession.pin == pin).first()
-    
-    if not game_session:
-        raise HTTPException(status_code=404, detail="Game not found")
+    game_session = _get_game_or_404(db, pin)
     
-    # Get all related data
-    players = db.query(Player).filter(Player.game_session_id == game_session.id).all()
-    questions = db.query(Question).filter(Question.quiz_id == game_session.quiz_id).all()
+    if game_session.status == "finished":
+        return await _finished_game_artifact(game_session, "excel")
     
-    # Get all answers
-    player_ids = [p.id for p in players]
-    answers = db.query(Answer).filter(Answer.player_id.in_(player_ids)).all()
+    # Workbook is written to a temp file in the export pool, then streamed and removed
+    excel_path = await run_export_in_pool(write_excel_file, game_session.id)
     
-    # Prepare data
-    game_data = prepare_game_data_for_export(game_session, players, questions, answers)
-    
-    # Generate Excel
-    excel_buffer = generate_excel(game_data)
-    
-    return StreamingResponse(
-        excel_buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    return FileResponse(
+        excel_path,
+        media_type=EXCEL_MEDIA_TYPE,
         headers={
             "Content-Disposition": f"attachment; filename=quiz_results_{pin}.xlsx"
-        }
+        },
+        background=BackgroundTask(os.remove, excel_path)
     )
 
 
@@ -80,29 +155,90 @@ async def export_excel(pin: str, db: Session = Depends(get_db)):
 async def export_pdf(pin: str, db: Session = Depends(get_db)):
     """Export game results as PDF"""
     
-    game_session = db.query(GameSession).filter(GameSession.pin == pin).first()
+    game_session = _get_game_or_404(db, pin)
     
-    if not game_session:
-        raise HTTPException(status_code=404, detail="Game not found")
+    if game_session.status == "finished":
+        return await _finished_game_artifact(game_session, "pdf")
+    
+    # Report is laid out in the render process pool, then streamed and removed
+    pdf_path = await run_render_in_pool(write_pdf_file, game_session.id)
+    
+    return FileResponse(
+        pdf_path,
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename=quiz_results_{pin}.pdf"
+        },
+        background=BackgroundTask(os.remove, pdf_path)
+    )
+
+
+async def _export_analytics(pin: str, fmt: str, db: Session):
+    _require_analytics(fmt)
+    game_session = _get_game_or_404(db, pin)
     
-    # Get all related data
-    players = db.query(Player).filter(Player.game_session_id == game_session.id).all()
-    questions = db.query(Question).filter(Question.quiz_id == game_session.quiz_id).all()
+    if game_session.status == "finished":
+        return await _finished_game_artifact(game_session, fmt)
     
-    # Get all answers
-    player_ids = [p.id for p in players]
-    answers = db.query(Answer).filter(Answer.player_id.in_(player_ids)).all()
+    path = await run_export_in_pool(write_analytics_file, [game_session.id], fmt)
     
-    # Prepare data
-    game_data = prepare_game_data_for_export(game_session, players, questions, answers)
+    return FileResponse(
+        path,
+        media_type=media_type_for(fmt),
+        headers={
+            "Content-Disposition": f"attachment; filename={download_filename(pin, fmt)}"
+        },
+        background=BackgroundTask(os.remove, path)
+    )
+
+
+@router.get("/{pin}/parquet")
+async def export_parquet(pin: str, db: Session = Depends(get_db)):
+    """Export game answers as a Parquet file with typed, dictionary-encoded columns"""
+    return await _export_analytics(pin, "parquet", db)
+
+
+@router.get("/{pin}/arrow")
+async def export_arrow(pin: str, db: Session = Depends(get_db)):
+    """Export game answers as an Arrow IPC file with typed, dictionary-encoded columns"""
+    return await _export_analytics(pin, "arrow", db)
+
+
+@router.get("/host/{host_name}/{fmt}")
+async def export_host_games(
+    host_name: str,
+    fmt: str,
+    start: Optional[date] = Query(None, description="First day to include (YYYY-MM-DD)"),
+    end: Optional[date] = Query(None, description="Last day to include (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """Bulk columnar export of all of a host's games in a date range"""
+    
+    if fmt not in ANALYTICS_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Bulk export supports {', '.join(ANALYTICS_FORMATS)}")
+    _require_analytics(fmt)
+    
+    normalized_host = host_name.strip()
+    if not normalized_host:
+        raise HTTPException(status_code=400, detail="Host name is required")
+    
+    game_ids = host_game_ids(
+        db,
+        normalized_host,
+        datetime.combine(start, time.min) if start else None,
+        datetime.combine(end + timedelta(days=1), time.min) if end else None
+    )
+    if not game_ids:
+        raise HTTPException(status_code=404, detail="No games found for this host and date range")
     
-    # Generate PDF
-    pdf_buffer = generate_pdf(game_data)
+    path = await run_export_in_pool(write_analytics_file, game_ids, fmt)
+    safe_host = re.sub(r"[^\w-]+", "_", normalized_host)
     
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
+    return FileResponse(
+        path,
+        media_type=media_type_for(fmt),
         headers={
-            "Content-Disposition": f"attachment; filename=quiz_results_{pin}.pdf"
-        }
+            "Content-Disposition": f"attachment; filename=quiz_results_{safe_host}.{fmt}"
+        },
+        background=BackgroundTask(os.remove, path)
     )
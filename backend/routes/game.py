@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from database import get_db, GameSession, Player, Quiz, Question, Answer
@@ -6,6 +6,21 @@ from schemas import GameSessionCreate, GameSessionResponse, PlayerJoinRequest, P
 from utils.helpers import generate_game_pin, generate_qr_code
 from services.socket_manager import calculate_score
 from services.certificate_service import generate_certificate_pdf, calculate_certificate_eligibility
+from services.cache_service import (
+    bump_game_revision,
+    game_etag,
+    game_cache_control,
+    etag_matches,
+    not_modified_response,
+    render_json,
+    json_response,
+    get_cached_response,
+    store_cached_response,
+    invalidate_cached_responses
+)
+from services.export_jobs import discard_artifacts
+from services.journal_service import discard_journal
+from services.trace_service import tracing_enabled, record_game_created, record_final_scores
 from config import settings
 from typing import List
 from datetime import datetime
@@ -45,6 +60,10 @@ async def create_game_session(game_data: GameSessionCreate, db: Session = Depend
     db.commit()
     db.refresh(game_session)
     
+    if tracing_enabled():
+        questions = db.query(Question).filter(Question.quiz_id == quiz.id).order_by(Question.order).all()
+        record_game_created(game_session.pin, quiz, questions)
+    
     # Generate QR code and direct link for joining
     base_url = settings.FRONTEND_BASE_URL.rstrip("/")
     join_url = f"{base_url}/join?pin={pin}"
@@ -126,8 +145,12 @@ async def delete_host_history(
     if game_session.host_name != host_name.strip():
         raise HTTPException(status_code=403, detail="You can only delete your own hosted games")
 
+    pin = game_session.pin
     db.delete(game_session)
     db.commit()
+    invalidate_cached_responses(pin)
+    discard_artifacts(pin)
+    discard_journal(pin, session_id)
 
     return {"message": "Hosted game history deleted successfully"}
 
@@ -166,6 +189,7 @@ async def join_game(player_data: PlayerJoinRequest, db: Session = Depends(get_db
     )
     
     db.add(player)
+    bump_game_revision(db, game_session.id)
     db.commit()
     db.refresh(player)
     
@@ -220,6 +244,7 @@ async def start_game(pin: str, db: Session = Depends(get_db)):
     game_session.status = "active"
     game_session.started_at = datetime.utcnow()
     game_session.current_question_index = 0
+    game_session.revision = (game_session.revision or 1) + 1
     
     db.commit()
     
@@ -269,6 +294,7 @@ async def submit_answer(answer_data: SubmitAnswerRequest, db: Session = Depends(
     
     # Update player score
     player.score += points
+    bump_game_revision(db, player.game_session_id)
     
     db.commit()
     
@@ -359,7 +385,7 @@ async def get_question_results(pin: str, question_id: int, db: Session = Depends
 
 
 @router.get("/{pin}/leaderboard", response_model=List[LeaderboardEntry])
-async def get_leaderboard(pin: str, db: Session = Depends(get_db)):
+async def get_leaderboard(pin: str, request: Request, db: Session = Depends(get_db)):
     """Get current leaderboard"""
     
     game_session = db.query(GameSession).filter(GameSession.pin == pin).first()
@@ -367,6 +393,15 @@ async def get_leaderboard(pin: str, db: Session = Depends(get_db)):
     if not game_session:
         raise HTTPException(status_code=404, detail="Game not found")
     
+    etag = game_etag(game_session)
+    cache_control = game_cache_control(game_session)
+    if etag_matches(request, etag):
+        return not_modified_response(etag, cache_control)
+    
+    cached_body = get_cached_response("leaderboard", pin, etag)
+    if cached_body is not None:
+        return json_response(cached_body, etag, cache_control)
+    
     # Get all players with their answers
     players = db.query(Player).filter(Player.game_session_id == game_session.id).all()
     
@@ -390,7 +425,11 @@ async def get_leaderboard(pin: str, db: Session = Depends(get_db)):
     # Sort by score
     leaderboard.sort(key=lambda x: x.score, reverse=True)
     
-    return leaderboard
+    body = render_json(leaderboard)
+    if game_session.status == "finished":
+        store_cached_response("leaderboard", pin, etag, body)
+    
+    return json_response(body, etag, cache_control)
 
 
 @router.post("/{pin}/end")
@@ -404,14 +443,18 @@ async def end_game(pin: str, db: Session = Depends(get_db)):
     
     game_session.status = "finished"
     game_session.ended_at = datetime.utcnow()
+    game_session.revision = (game_session.revision or 1) + 1
     
     db.commit()
     
+    if tracing_enabled():
+        record_final_scores(pin, db.query(Player).filter(Player.game_session_id == game_session.id).all())
+    
     return {"message": "Game ended successfully"}
 
 
 @router.get("/{pin}/results")
-async def get_game_results(pin: str, db: Session = Depends(get_db)):
+async def get_game_results(pin: str, request: Request, db: Session = Depends(get_db)):
     """Get detailed game results"""
     
     game_session = db.query(GameSession).filter(GameSession.pin == pin).first()
@@ -419,6 +462,15 @@ async def get_game_results(pin: str, db: Session = Depends(get_db)):
     if not game_session:
         raise HTTPException(status_code=404, detail="Game not found")
     
+    etag = game_etag(game_session)
+    cache_control = game_cache_control(game_session)
+    if etag_matches(request, etag):
+        return not_modified_response(etag, cache_control)
+    
+    cached_body = get_cached_response("results", pin, etag)
+    if cached_body is not None:
+        return json_response(cached_body, etag, cache_control)
+    
     players = db.query(Player).filter(Player.game_session_id == game_session.id).all()
     questions = db.query(Question).filter(Question.quiz_id == game_session.quiz_id).order_by(Question.order).all()
     
@@ -451,7 +503,11 @@ async def get_game_results(pin: str, db: Session = Depends(get_db)):
     # Sort by score
     results["players"].sort(key=lambda x: x["score"], reverse=True)
     
-    return results
+    body = render_json(results)
+    if game_session.status == "finished":
+        store_cached_response("results", pin, etag, body)
+    
+    return json_response(body, etag, cache_control)
 
 
 @router.get("/{pin}/certificate/settings")
@@ -1,16 +1,69 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update, delete, or_
 from sqlalchemy.orm import Session
+from types import SimpleNamespace
 from typing import List, Optional
-from database import get_db, Quiz, Question
-from schemas import QuizCreateRequest, QuizResponse, AIGenerateRequest, AIGeneratedQuestions, QuestionResponse
+from database import get_db, Quiz, Question, GameSession
+from schemas import QuizCreateRequest, QuizResponse, AIGenerateRequest, AIGeneratedQuestions, QuestionResponse, DuplicateCheckRequest, QuestionBatchRequest, RegradeRequest
 from services.ai_service import generate_quiz_from_text, generate_quiz_from_topic
 from services.file_parser import parse_file
+from services.cache_service import (
+    bump_quiz_revision,
+    quiz_etag,
+    etag_matches,
+    not_modified_response,
+    render_json,
+    json_response,
+    get_cached_response,
+    store_cached_response,
+    item_analysis_etag
+)
+from services.search_service import (
+    SEARCH_SCOPES,
+    search,
+    index_quiz,
+    index_questions,
+    remove_questions,
+    remove_quiz
+)
+from services.similarity_service import (
+    find_duplicates,
+    find_batch_duplicates,
+    register_questions,
+    forget_questions
+)
+from services.regrade_service import regrade_questions, invalidate_regraded_games
+from services.socket_manager import active_games
+from services.journal_service import discard_journal
 from config import settings
 import json
 
 router = APIRouter(prefix="/api/quiz", tags=["Quiz"])
 
 
+def _reject_if_live(db: Session, quiz_id: int):
+    """
+    A game loads its quiz's questions once, when it starts, so changes made mid-game would
+    never reach its players. Refuse them while a game of the quiz is being played in memory;
+    a session still marked active in the database after its room is gone cannot receive them.
+    """
+    live = [(pin, game.game_session_id) for pin, game in active_games.items() if game.status == 'active']
+    if not live:
+        return
+    live_ids = [game_session_id for _, game_session_id in live if game_session_id is not None]
+    live_pins = [pin for pin, game_session_id in live if game_session_id is None]
+    live_game = db.query(GameSession.pin).filter(
+        GameSession.quiz_id == quiz_id,
+        or_(GameSession.id.in_(live_ids), GameSession.pin.in_(live_pins))
+    ).first()
+    if live_game:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Quiz is being played in game {live_game.pin}; change its questions after the game ends"
+        )
+
+
 @router.post("/create", response_model=QuizResponse)
 async def create_quiz(quiz_data: QuizCreateRequest, db: Session = Depends(get_db)):
     """Create a new quiz with questions"""
@@ -25,6 +78,7 @@ async def create_quiz(quiz_data: QuizCreateRequest, db: Session = Depends(get_db
         db.flush()
         
         # Add questions
+        questions = []
         for idx, q_data in enumerate(quiz_data.questions):
             question = Question(
                 quiz_id=quiz.id,
@@ -35,6 +89,24 @@ async def create_quiz(quiz_data: QuizCreateRequest, db: Session = Depends(get_db
                 order=idx
             )
             db.add(question)
+            questions.append(question)
+        
+        db.flush()
+        index_quiz(db, quiz)
+        index_questions(db, questions)
+        
+        # Flag near duplicates: against the existing bank, then within the submitted list
+        question_texts = [q.question_text for q in questions]
+        duplicates = find_duplicates(db, question_texts, exclude_quiz_id=quiz.id)
+        for idx, original_idx, similarity in find_batch_duplicates(question_texts):
+            duplicates.append({
+                "question_index": idx,
+                "question_id": questions[original_idx].id,
+                "quiz_id": quiz.id,
+                "question_text": questions[original_idx].question_text,
+                "similarity": similarity
+            })
+        register_questions(db, questions)
         
         db.commit()
         db.refresh(quiz)
@@ -45,7 +117,8 @@ async def create_quiz(quiz_data: QuizCreateRequest, db: Session = Depends(get_db
             description=quiz.description,
             created_by=quiz.created_by,
             created_at=quiz.created_at,
-            question_count=len(quiz_data.questions)
+            question_count=len(quiz_data.questions),
+            duplicates=duplicates
         )
     
     except Exception as e:
@@ -142,17 +215,62 @@ async def list_quizzes(
     ]
 
 
+@router.post("/duplicates/check")
+async def check_duplicates(request: DuplicateCheckRequest, db: Session = Depends(get_db)):
+    """Check question texts (e.g. an imported bank) against stored questions for near duplicates"""
+    return {
+        "duplicates": find_duplicates(db, request.questions, exclude_quiz_id=request.exclude_quiz_id)
+    }
+
+
+@router.get("/search")
+async def search_library(
+    q: str,
+    scope: str = "questions",
+    limit: int = 20,
+    offset: int = 0,
+    db: Session = Depends(get_db)
+):
+    """
+    Full-text search over existing quizzes or questions, ranked by relevance.
+
+    Only the newest 200 matches are ranked. "candidates" is how many were; when "truncated"
+    is true more matches exist, older ones are never returned and pages past the candidates
+    are empty, so refine the query rather than paging on.
+    """
+    if scope not in SEARCH_SCOPES:
+        raise HTTPException(status_code=400, detail=f"Scope must be one of: {', '.join(SEARCH_SCOPES)}")
+    
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query is required")
+    
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+    
+    return {
+        "query": q,
+        "scope": scope,
+        "limit": limit,
+        "offset": offset,
+        **search(db, q, scope=scope, limit=limit, offset=offset)
+    }
+
+
 @router.get("/{quiz_id}", response_model=dict)
-async def get_quiz(quiz_id: int, db: Session = Depends(get_db)):
+async def get_quiz(quiz_id: int, request: Request, db: Session = Depends(get_db)):
     """Get quiz details with all questions"""
     quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
     
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
     
+    etag = quiz_etag(quiz)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    
     questions = db.query(Question).filter(Question.quiz_id == quiz_id).order_by(Question.order).all()
     
-    return {
+    payload = {
         "id": quiz.id,
         "title": quiz.title,
         "description": quiz.description,
@@ -170,6 +288,133 @@ async def get_quiz(quiz_id: int, db: Session = Depends(get_db)):
             for q in questions
         ]
     }
+    
+    return json_response(render_json(payload), etag)
+
+
+@router.get("/{quiz_id}/analytics")
+async def get_quiz_analytics(quiz_id: int, request: Request, db: Session = Depends(get_db)):
+    """Item analysis of a quiz across all of its game sessions"""
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    etag = item_analysis_etag(db, quiz)
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+    
+    cached_body = get_cached_response("item_analysis", quiz_id, etag)
+    if cached_body is not None:
+        return json_response(cached_body, etag)
+    
+    # NumPy is imported on first use; the work runs in a worker thread so large quizzes don't stall the event loop
+    from services.analytics_service import analyze_quiz
+    analysis = await run_in_threadpool(analyze_quiz, quiz_id)
+    body = render_json({"revision": quiz.revision, **analysis})
+    store_cached_response("item_analysis", quiz_id, etag, body)
+    
+    return json_response(body, etag)
+
+
+@router.post("/{quiz_id}/questions/batch")
+async def batch_update_questions(quiz_id: int, batch: QuestionBatchRequest, db: Session = Depends(get_db)):
+    """Apply edits, inserts, deletes and a reorder to a quiz's questions in one transaction"""
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    _reject_if_live(db, quiz_id)
+    
+    questions = db.query(Question).filter(Question.quiz_id == quiz_id).order_by(Question.order, Question.id).all()
+    current_order = {q.id: q.order for q in questions}
+    
+    delete_ids = set(batch.deletes)
+    update_ids = [edit.id for edit in batch.updates]
+    unknown_ids = (delete_ids | set(update_ids)) - set(current_order)
+    if unknown_ids:
+        raise HTTPException(status_code=404, detail=f"Questions not found in this quiz: {sorted(unknown_ids)}")
+    if len(update_ids) != len(set(update_ids)):
+        raise HTTPException(status_code=400, detail="Each question can only be edited once per batch")
+    if delete_ids & set(update_ids):
+        raise HTTPException(status_code=400, detail="A question cannot be both edited and deleted")
+    
+    remaining_ids = [q.id for q in questions if q.id not in delete_ids]
+    if batch.order is not None:
+        if sorted(batch.order) != sorted(remaining_ids):
+            raise HTTPException(status_code=400, detail="Order must list every remaining question exactly once")
+        remaining_ids = list(batch.order)
+    
+    try:
+        # Field edits, grouped by SQLAlchemy into executemany UPDATEs by primary key
+        edits = [edit.model_dump(exclude_unset=True) for edit in batch.updates]
+        edits = [edit for edit in edits if len(edit) > 1]
+        if edits:
+            db.execute(update(Question), edits)
+        
+        if delete_ids:
+            # Index rows reference the questions, so they go first
+            remove_questions(db, delete_ids)
+            forget_questions(db, delete_ids)
+            db.execute(delete(Question).where(Question.id.in_(delete_ids)))
+        
+        new_questions = []
+        for insert in sorted(batch.inserts, key=lambda i: i.position if i.position is not None else len(remaining_ids) + 1):
+            question = Question(
+                quiz_id=quiz_id,
+                question_text=insert.question_text,
+                options=insert.options,
+                correct_answer=insert.correct_answer,
+                time_limit=insert.time_limit,
+                order=0
+            )
+            db.add(question)
+            new_questions.append((insert.position, question))
+        db.flush()
+        
+        final_ids = list(remaining_ids)
+        for position, question in new_questions:
+            final_ids.insert(position if position is not None else len(final_ids), question.id)
+        
+        reorders = [
+            {"id": question_id, "order": idx}
+            for idx, question_id in enumerate(final_ids)
+            if current_order.get(question_id) != idx
+        ]
+        if reorders:
+            db.execute(update(Question), reorders)
+        
+        # Keep the search and duplicate indexes in step with the changed text
+        changed_text = [
+            SimpleNamespace(id=edit["id"], question_text=edit["question_text"])
+            for edit in edits if "question_text" in edit
+        ] + [question for _, question in new_questions]
+        index_questions(db, changed_text)
+        register_questions(db, changed_text)
+        
+        # Answers already given to questions whose key or timing changed are re-scored
+        regrade = regrade_questions(db, [
+            edit["id"] for edit in edits if "correct_answer" in edit or "time_limit" in edit
+        ])
+        
+        bump_quiz_revision(db, quiz_id)
+        db.commit()
+    
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to update questions: {str(e)}")
+    
+    invalidate_regraded_games(regrade)
+    db.refresh(quiz)
+    
+    return {
+        "quiz_id": quiz_id,
+        "revision": quiz.revision,
+        "order": final_ids,
+        "inserted": [question.id for _, question in new_questions],
+        "deleted": sorted(delete_ids),
+        "regrade": regrade
+    }
 
 
 @router.put("/{quiz_id}/questions/{question_id}")
@@ -187,6 +432,7 @@ async def update_question(
     
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
+    _reject_if_live(db, quiz_id)
     
     # Update fields
     if "question_text" in question_data:
@@ -198,9 +444,52 @@ async def update_question(
     if "time_limit" in question_data:
         question.time_limit = question_data["time_limit"]
     
+    if "question_text" in question_data:
+        index_questions(db, [question])
+        register_questions(db, [question])
+    
+    regrade = None
+    if "correct_answer" in question_data or "time_limit" in question_data:
+        db.flush()
+        regrade = regrade_questions(db, [question_id])
+    
+    bump_quiz_revision(db, quiz_id)
     db.commit()
     
-    return {"message": "Question updated successfully"}
+    if regrade:
+        invalidate_regraded_games(regrade)
+    
+    return {"message": "Question updated successfully", "regrade": regrade}
+
+
+@router.post("/{quiz_id}/regrade")
+async def regrade_quiz(quiz_id: int, request: Optional[RegradeRequest] = None, db: Session = Depends(get_db)):
+    """Re-score stored answers (and player totals) for some or all questions of a quiz"""
+    quiz = db.query(Quiz).filter(Quiz.id == quiz_id).first()
+    
+    if not quiz:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    
+    quiz_question_ids = {
+        question_id for (question_id,) in db.query(Question.id).filter(Question.quiz_id == quiz_id).all()
+    }
+    question_ids = quiz_question_ids
+    if request and request.question_ids is not None:
+        unknown_ids = set(request.question_ids) - quiz_question_ids
+        if unknown_ids:
+            raise HTTPException(status_code=404, detail=f"Questions not found in this quiz: {sorted(unknown_ids)}")
+        question_ids = set(request.question_ids)
+    
+    try:
+        regrade = regrade_questions(db, question_ids)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to regrade quiz: {str(e)}")
+    
+    invalidate_regraded_games(regrade)
+    
+    return {"quiz_id": quiz_id, **regrade}
 
 
 @router.delete("/{quiz_id}/questions/{question_id}")
@@ -213,8 +502,12 @@ async def delete_question(quiz_id: int, question_id: int, db: Session = Depends(
     
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
+    _reject_if_live(db, quiz_id)
     
     db.delete(question)
+    remove_questions(db, [question.id])
+    forget_questions(db, [question.id])
+    bump_quiz_revision(db, quiz_id)
     db.commit()
     
     return {"message": "Question deleted successfully"}
@@ -227,8 +520,17 @@ async def delete_quiz(quiz_id: int, db: Session = Depends(get_db)):
     
     if not quiz:
         raise HTTPException(status_code=404, detail="Quiz not found")
+    _reject_if_live(db, quiz_id)
     
+    question_ids = [q.id for q in quiz.questions]
+    games = [(game.pin, game.id) for game in quiz.game_sessions]
+    remove_quiz(db, quiz.id, question_ids)
+    forget_questions(db, question_ids)
     db.delete(quiz)
     db.commit()
     
+    # Its game sessions went with it, so their journals go too
+    for pin, game_session_id in games:
+        discard_journal(pin, game_session_id)
+    
     return {"message": "Quiz deleted successfully"}
\ No newline at end of file
@@ -10,6 +10,36 @@ class QuestionSchema(BaseModel):
     time_limit: int = Field(default=30, ge=5, le=120)
 
 
+class QuestionEdit(BaseModel):
+    id: int
+    question_text: Optional[str] = Field(default=None, min_length=5)
+    options: Optional[List[str]] = Field(default=None, min_items=2, max_items=6)
+    correct_answer: Optional[str] = None
+    time_limit: Optional[int] = Field(default=None, ge=5, le=120)
+
+    @validator('question_text', 'options', 'correct_answer', 'time_limit')
+    def reject_null(cls, v):
+        # Omit a field to leave it unchanged; the columns themselves cannot be null
+        if v is None:
+            raise ValueError('may be omitted but not null')
+        return v
+
+
+class QuestionInsert(QuestionSchema):
+    position: Optional[int] = Field(default=None, ge=0)  # index in the final order, appended when omitted
+
+
+class QuestionBatchRequest(BaseModel):
+    updates: List[QuestionEdit] = []
+    inserts: List[QuestionInsert] = []
+    deletes: List[int] = []
+    order: Optional[List[int]] = None  # ids of the remaining existing questions, in their new order
+
+
+class RegradeRequest(BaseModel):
+    question_ids: Optional[List[int]] = None  # None regrades every question of the quiz
+
+
 class QuizCreateRequest(BaseModel):
     title: str = Field(..., min_length=3, max_length=255)
     description: Optional[str] = None
@@ -17,6 +47,14 @@ class QuizCreateRequest(BaseModel):
     questions: List[QuestionSchema]
 
 
+class DuplicateMatch(BaseModel):
+    question_index: int  # position in the submitted list
+    question_id: int
+    quiz_id: int
+    question_text: str
+    similarity: float
+
+
 class QuizResponse(BaseModel):
     id: int
     title: str
@@ -24,6 +62,7 @@ class QuizResponse(BaseModel):
     created_by: str
     created_at: datetime
     question_count: int
+    duplicates: List[DuplicateMatch] = []
 
     class Config:
         from_attributes = True
@@ -54,6 +93,11 @@ class AIGenerateRequest(BaseModel):
         return v
 
 
+class DuplicateCheckRequest(BaseModel):
+    questions: List[str] = Field(..., min_items=1, max_items=500)
+    exclude_quiz_id: Optional[int] = None
+
+
 class AIGeneratedQuestions(BaseModel):
     questions: List[QuestionSchema]
     metadata: Optional[dict] = None
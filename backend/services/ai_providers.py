@@ -0,0 +1,178 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Sequence
+
+from config import settings
+
+GEMINI_MODELS = [
+    "gemini-2.5-flash",
+    "gemini-2.0-flash",
+    "gemini-2.0-flash-001",
+    "gemini-2.5-pro",
+    "gemini-flash-latest"
+]
+
+
+class AIProviderError(Exception):
+    """Raised by a provider when a model call fails (quota, outage, bad response)."""
+
+
+class AIProvider(ABC):
+    """
+    Backend that turns a prompt into the raw JSON text of a quiz.
+    generate_with_fallback walks `models` in order and moves on when a call raises.
+    """
+    name = "base"
+    models: Sequence[str] = ()
+
+    @abstractmethod
+    def generate(self, model_name: str, prompt: str, num_questions: int) -> str:
+        """Raw JSON text of a quiz from one model; raises AIProviderError when the call fails."""
+
+
+class GeminiProvider(AIProvider):
+    name = "gemini"
+    models = GEMINI_MODELS
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or settings.GEMINI_API_KEY
+        self._genai = None
+        self._lock = threading.Lock()
+
+    def _client(self):
+        # Importing and configuring the SDK is deferred to the first real call.
+        if self._genai is None:
+            with self._lock:
+                if self._genai is None:
+                    if not self.api_key:
+                        raise AIProviderError("GEMINI_API_KEY is not configured")
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._genai = genai
+        return self._genai
+
+    def generate(self, model_name: str, prompt: str, num_questions: int) -> str:
+        genai = self._client()
+        model = genai.GenerativeModel(
+            model_name,
+            generation_config={"response_mime_type": "application/json"}
+        )
+        response = model.generate_content(prompt)
+        return response.text
+
+
+class OfflineProvider(AIProvider):
+    """
+    Deterministic, network-free provider for benchmarks and local development.
+
+    Without random failure injection the output depends only on (seed, model, prompt,
+    num_questions), so repeated runs are comparable. Latency, random failures, per-model outages, fenced/malformed output and
+    paraphrased duplicates can all be injected to exercise the fallback and parsing paths.
+    """
+    name = "offline"
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        failure_rate: float = 0.0,
+        failing_models: Optional[Sequence[str]] = None,
+        malformed_rate: float = 0.0,
+        fenced_rate: float = 0.0,
+        duplicate_rate: float = 0.0,
+        models: Optional[Sequence[str]] = None,
+        seed: int = 0
+    ):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.failing_models = set(failing_models or [])
+        self.malformed_rate = malformed_rate
+        self.fenced_rate = fenced_rate
+        self.duplicate_rate = duplicate_rate
+        self.models = list(models or GEMINI_MODELS)
+        self.seed = seed
+        self.calls = 0
+        self._call_lock = threading.Lock()
+
+    def _rng(self, model_name: str, prompt: str, num_questions: int, call_number: int) -> random.Random:
+        digest = hashlib.blake2b(
+            f"{self.seed}|{model_name}|{num_questions}|{call_number}|{prompt}".encode("utf-8"),
+            digest_size=8
+        ).digest()
+        return random.Random(int.from_bytes(digest, "little"))
+
+    def generate(self, model_name: str, prompt: str, num_questions: int) -> str:
+        with self._call_lock:
+            self.calls += 1
+            call_number = self.calls
+
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+        if model_name in self.failing_models:
+            raise AIProviderError(f"Simulated outage for model {model_name}")
+
+        rng = self._rng(model_name, prompt, num_questions, call_number if self.failure_rate else 0)
+        if rng.random() < self.failure_rate:
+            raise AIProviderError(f"Simulated failure for model {model_name}")
+
+        if rng.random() < self.malformed_rate:
+            return '{"questions": [{"question_text": "truncated'
+
+        payload = json.dumps({"questions": self._questions(rng, num_questions)})
+        if rng.random() < self.fenced_rate:
+            return f"```json\n{payload}\n```"
+        return payload
+
+    def _questions(self, rng: random.Random, num_questions: int) -> List[dict]:
+        questions = []
+        for idx in range(num_questions):
+            if questions and rng.random() < self.duplicate_rate:
+                original = rng.choice(questions)
+                questions.append({**original, "question_text": "Which is " + original["question_text"][8:]})
+                continue
+
+            subject = f"concept {rng.randrange(10**6):06d}"
+            options = [f"Definition {rng.randrange(10**4):04d}-{option}" for option in "ABCD"]
+            questions.append({
+                "question_text": f"What is {subject} in item {idx + 1}?",
+                "options": options,
+                "correct_answer": options[rng.randrange(len(options))],
+                "explanation": f"Generated offline for {subject}",
+                "time_limit": 30
+            })
+        return questions
+
+
+_provider: Optional[AIProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> AIProvider:
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = _build_provider(settings.AI_PROVIDER)
+    return _provider
+
+
+def set_provider(provider: Optional[AIProvider]):
+    """Swap the active provider (benchmarks, local runs). None resets to the configured one."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+def _build_provider(name: str) -> AIProvider:
+    if name == "offline":
+        return OfflineProvider(
+            latency_ms=settings.AI_OFFLINE_LATENCY_MS,
+            failure_rate=settings.AI_OFFLINE_FAILURE_RATE
+        )
+    if name == "gemini":
+        return GeminiProvider()
+    raise ValueError(f"Unknown AI provider: {name}")
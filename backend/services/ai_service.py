@@ -1,21 +1,12 @@
-import google.generativeai as genai
 import json
-from config import settings
+from typing import List
 from schemas import QuestionSchema, AIGeneratedQuestions
+from services.ai_providers import get_provider
+from services.similarity_service import dedupe_question_texts
 import logging
 
 logger = logging.getLogger("uvicorn")
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
-MODELS_TO_TRY = [
-    "gemini-2.5-flash",
-    "gemini-2.0-flash",
-    "gemini-2.0-flash-001",
-    "gemini-2.5-pro",
-    "gemini-flash-latest"
-]
-
 QUIZ_JSON_SCHEMA = """
 {
     "questions": [
@@ -30,37 +21,44 @@ QUIZ_JSON_SCHEMA = """
 }
 """
 
-def generate_with_fallback(prompt: str, difficulty: str, context_len: int = 0) -> AIGeneratedQuestions:
+
+def parse_quiz_response(text_response: str) -> List[QuestionSchema]:
+    """Strip optional markdown fences and validate the model's JSON against QuestionSchema."""
+    text_response = text_response.strip()
+
+    if text_response.startswith("```json"):
+        text_response = text_response[7:-3]
+    elif text_response.startswith("```"):
+        text_response = text_response[3:-3]
+
+    data = json.loads(text_response)
+    return [QuestionSchema(**q) for q in data["questions"]]
+
+
+def generate_with_fallback(prompt: str, difficulty: str, context_len: int = 0, num_questions: int = 10) -> AIGeneratedQuestions:
+    provider = get_provider()
     last_error = None
 
-    for model_name in MODELS_TO_TRY:
+    for model_name in provider.models:
         try:
             logger.info(f"🤖 Attempting to generate quiz using model: {model_name}")
             
-            model = genai.GenerativeModel(
-                model_name,
-                generation_config={"response_mime_type": "application/json"}
-            )
-            
-            response = model.generate_content(prompt)
-            text_response = response.text.strip()
-            
-            if text_response.startswith("```json"):
-                text_response = text_response[7:-3]
-            elif text_response.startswith("```"):
-                text_response = text_response[3:-3]
-
-            data = json.loads(text_response)
-            validated_questions = [QuestionSchema(**q) for q in data["questions"]]
+            text_response = provider.generate(model_name, prompt, num_questions)
+            validated_questions = parse_quiz_response(text_response)
+            keep = dedupe_question_texts([q.question_text for q in validated_questions])
+            duplicates_removed = len(validated_questions) - len(keep)
+            validated_questions = [validated_questions[idx] for idx in keep]
             
             logger.info(f"✅ Success with model: {model_name}")
             
             return AIGeneratedQuestions(
                 questions=validated_questions,
                 metadata={
+                    "provider": provider.name,
                     "model": model_name,
                     "difficulty": difficulty,
-                    "content_length": context_len
+                    "content_length": context_len,
+                    "duplicates_removed": duplicates_removed
                 }
             )
 
@@ -87,7 +85,7 @@ def generate_quiz_from_text(content: str, num_questions: int = 10, difficulty: s
     3. JSON Format:
     {QUIZ_JSON_SCHEMA}
     """
-    return generate_with_fallback(prompt, difficulty, len(content))
+    return generate_with_fallback(prompt, difficulty, len(content), num_questions)
 
 
 def generate_quiz_from_topic(topic: str, num_questions: int = 10, difficulty: str = "medium") -> AIGeneratedQuestions:
@@ -102,4 +100,4 @@ def generate_quiz_from_topic(topic: str, num_questions: int = 10, difficulty: st
     4. JSON Format:
     {QUIZ_JSON_SCHEMA}
     """
-    return generate_with_fallback(prompt, difficulty)
+    return generate_with_fallback(prompt, difficulty, num_questions=num_questions)
@@ -1,5 +1,4 @@
 from datetime import datetime, timedelta, timezone
-from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from config import settings
@@ -17,6 +16,9 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def create_access_token(subject: str, expires_minutes: int | None = None) -> str:
+    # python-jose loads the cryptography backend, so it is imported on first use rather than at startup
+    from jose import jwt
+
     expire_delta = timedelta(minutes=expires_minutes or settings.JWT_EXPIRE_MINUTES)
     expire = datetime.now(timezone.utc) + expire_delta
     payload = {
@@ -28,6 +30,8 @@ def create_access_token(subject: str, expires_minutes: int | None = None) -> str
 
 
 def decode_access_token(token: str) -> str | None:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[ALGORITHM])
         return payload.get("sub")
@@ -0,0 +1,154 @@
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import Quiz, GameSession
+
+NO_CACHE = "no-cache"
+PRIVATE_NO_CACHE = "private, no-cache"
+
+# (kind, pin) -> (etag, serialized body)
+_response_cache: "OrderedDict[Tuple[str, Hashable], Tuple[str, bytes]]" = OrderedDict()
+_response_cache_lock = Lock()
+
+
+def bump_quiz_revision(db: Session, quiz_id: int) -> None:
+    """Increment a quiz revision inside the caller's transaction."""
+    db.query(Quiz).filter(Quiz.id == quiz_id).update(
+        {Quiz.revision: Quiz.revision + 1},
+        synchronize_session=False
+    )
+
+
+def bump_game_revision(db: Session, game_session_id: int) -> None:
+    """Increment a game session revision inside the caller's transaction."""
+    db.query(GameSession).filter(GameSession.id == game_session_id).update(
+        {GameSession.revision: GameSession.revision + 1},
+        synchronize_session=False
+    )
+
+
+def bump_game_revisions(db: Session, game_session_ids) -> None:
+    """Increment several game session revisions with one UPDATE."""
+    game_session_ids = list(game_session_ids)
+    if not game_session_ids:
+        return
+    db.query(GameSession).filter(GameSession.id.in_(game_session_ids)).update(
+        {GameSession.revision: GameSession.revision + 1},
+        synchronize_session=False
+    )
+
+
+def quiz_etag(quiz: Quiz) -> str:
+    return f'W/"quiz-{quiz.id}-{quiz.revision or 1}"'
+
+
+def game_etag(game_session: GameSession) -> str:
+    """Game reads also depend on the quiz (question count, title), so both revisions are included."""
+    quiz_revision = game_session.quiz.revision if game_session.quiz else 0
+    return f'W/"game-{game_session.id}-{game_session.revision or 1}-{quiz_revision or 1}"'
+
+
+def item_analysis_etag(db: Session, quiz: Quiz) -> str:
+    """
+    Analysis depends on the questions (quiz revision) and on every answer of every game of
+    the quiz. Each answer bumps its game's revision, so the sum of game revisions moves too.
+    """
+    sessions, revisions = db.execute(
+        select(func.count(GameSession.id), func.coalesce(func.sum(GameSession.revision), 0))
+        .where(GameSession.quiz_id == quiz.id)
+    ).one()
+    return f'W/"analysis-{quiz.id}-{quiz.revision or 1}-{sessions}-{revisions}"'
+
+
+def game_cache_control(game_session: GameSession) -> str:
+    """
+    Game results are per-player and a regrade can still change a finished game, so they are
+    never shared and always revalidated (a 304 is cheap); an optional short freshness window
+    can be granted to finished games.
+    """
+    if game_session.status == "finished" and settings.FINISHED_GAME_CACHE_MAX_AGE > 0:
+        return f"private, max-age={settings.FINISHED_GAME_CACHE_MAX_AGE}, must-revalidate"
+    return PRIVATE_NO_CACHE
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of the If-None-Match header against the current ETag."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+def not_modified_response(etag: str, cache_control: str = NO_CACHE) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def render_json(payload: Any) -> bytes:
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def json_response(body: bytes, etag: str, cache_control: str = NO_CACHE) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+
+def get_cached_response(kind: str, key: Hashable, etag: str) -> Optional[bytes]:
+    """Return a serialized body only if it was stored for the same ETag."""
+    with _response_cache_lock:
+        entry = _response_cache.get((kind, key))
+        if entry is None:
+            return None
+        if entry[0] != etag:
+            del _response_cache[(kind, key)]
+            return None
+        _response_cache.move_to_end((kind, key))
+        return entry[1]
+
+
+def store_cached_response(kind: str, key: Hashable, etag: str, body: bytes) -> None:
+    with _response_cache_lock:
+        _response_cache[(kind, key)] = (etag, body)
+        _response_cache.move_to_end((kind, key))
+        while len(_response_cache) > settings.RESPONSE_CACHE_MAX_ENTRIES:
+            _response_cache.popitem(last=False)
+
+
+def invalidate_cached_responses(key: Hashable) -> None:
+    """Drop every cached body for a key (e.g. a game PIN) regardless of kind."""
+    with _response_cache_lock:
+        for cache_key in [k for k in _response_cache if k[1] == key]:
+            del _response_cache[cache_key]
+
+
+def response_cache_stats() -> Dict[str, int]:
+    with _response_cache_lock:
+        return {
+            "entries": len(_response_cache),
+            "bytes": sum(len(body) for _, body in _response_cache.values()),
+        }
@@ -2,13 +2,12 @@ import io
 from datetime import datetime
 from typing import Dict
 
-from PyPDF2 import PdfReader, PdfWriter
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.colors import HexColor
-
 
 def build_certificate_overlay_bytes(player_name: str) -> io.BytesIO:
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.colors import HexColor
+
     packet = io.BytesIO()
     cert_canvas = canvas.Canvas(packet, pagesize=letter)
 
@@ -28,6 +27,8 @@ def build_certificate_overlay_bytes(player_name: str) -> io.BytesIO:
 
 
 def generate_certificate_pdf(template_path: str, player_name: str) -> io.BytesIO:
+    from PyPDF2 import PdfReader, PdfWriter
+
     template_reader = PdfReader(template_path)
     overlay_reader = PdfReader(build_certificate_overlay_bytes(player_name))
     writer = PdfWriter()
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter as TallyCounter, deque
+from datetime import datetime
+from typing import Deque, List, Optional
+
+from config import settings
+from services.metrics_service import Counter, Histogram, describe_task, register_metric
+
+logger = logging.getLogger("uvicorn")
+
+LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STALL_STACK_DEPTH = 40
+
+loop_lag = Histogram("quiz_event_loop_lag_seconds", "Delay of the loop heartbeat beyond its interval", (), LAG_BUCKETS)
+loop_stalls = Counter("quiz_event_loop_stalls_total", "Loop stalls longer than the watchdog threshold", ("operation",))
+register_metric(loop_lag)
+register_metric(loop_stalls)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    # Folded-stack format uses ';' as the separator
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _format_stack(frame, limit: int = STALL_STACK_DEPTH) -> List[str]:
+    """Innermost-last list of 'file:line in function' for a live frame."""
+    lines = []
+    while frame is not None and len(lines) < limit:
+        lines.append(f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return lines[::-1]
+
+
+class LoopWatchdog:
+    """
+    Detects event-loop stalls. A heartbeat coroutine on the loop records lag; a watchdog
+    thread notices when the heartbeat is overdue and, while the loop is still blocked,
+    captures the loop thread's stack and the route or socket event its current task serves.
+    """
+
+    def __init__(self, interval: float, threshold: float, history: int):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: Deque[dict] = deque(maxlen=history)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._open_stall: Optional[dict] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat(), name="loop-watchdog-heartbeat")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"🐕 Loop watchdog started (threshold {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        self._stop.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            loop_lag.observe(lag)
+            stall = self._open_stall
+            if stall is not None:
+                # The watchdog saw this stall while it was happening; record how long it lasted
+                stall["duration_ms"] = round((now - self._last_beat - self.interval) * 1000, 1)
+                self._open_stall = None
+                logger.warning(f"🐢 Event loop blocked for {stall['duration_ms']:.0f} ms by {stall['operation']}")
+            self._last_beat = now
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            overdue = time.monotonic() - self._last_beat - self.interval
+            if overdue < self.threshold or self._open_stall is not None:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            operation = describe_task(asyncio.current_task(self._loop)) or "unknown"
+            stall = {
+                "detected_at": datetime.utcnow().isoformat(),
+                "operation": operation,
+                "duration_ms": None,
+                "stack": _format_stack(frame),
+            }
+            self._open_stall = stall
+            self.stalls.append(stall)
+            loop_stalls.add(1, operation)
+            logger.warning(
+                f"⚠️ Event loop stalled >{overdue * 1000:.0f} ms in {operation}; blocking call at {stall['stack'][-1]}"
+            )
+
+
+_watchdog: Optional[LoopWatchdog] = None
+
+
+def start_loop_watchdog():
+    global _watchdog
+    if not settings.LOOP_WATCHDOG_ENABLED or _watchdog is not None:
+        return
+    _watchdog = LoopWatchdog(
+        settings.LOOP_WATCHDOG_INTERVAL_SECONDS,
+        settings.LOOP_STALL_THRESHOLD_SECONDS,
+        settings.LOOP_STALL_HISTORY,
+    )
+    _watchdog.start()
+
+
+async def stop_loop_watchdog():
+    global _watchdog
+    if _watchdog is not None:
+        await _watchdog.stop()
+        _watchdog = None
+
+
+def recent_stalls() -> List[dict]:
+    return list(_watchdog.stalls)[::-1] if _watchdog is not None else []
+
+
+# --- Sampling profiler ---
+
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def sample_profile(seconds: float, interval: float, include_idle: bool = False) -> dict:
+    """
+    Sample every thread's Python stack for `seconds` and return folded stacks
+    ("thread;outer;...;inner count" lines), the input format of flamegraph.pl and speedscope.
+    Blocking: call it from a worker thread, never on the event loop.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy()
+    try:
+        own_thread = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        folded: TallyCounter = TallyCounter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if not include_idle and stack and _is_idle(stack[0]):
+                    continue
+                thread_name = names.get(thread_id) or f"thread-{thread_id}"
+                folded[";".join([thread_name.replace(";", ","), *reversed(stack)])] += 1
+            samples += 1
+            time.sleep(interval)
+        return {"samples": samples, "folded": folded}
+    finally:
+        _profile_lock.release()
+
+
+# Innermost frames of threads that are just waiting; dropped unless include_idle is set
+_IDLE_FRAMES = ("select (", "wait (", "_worker (", "poll (")
+
+
+def _is_idle(innermost: str) -> bool:
+    return innermost.startswith(_IDLE_FRAMES)
+
+
+def render_folded(profile: dict) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in profile["folded"].most_common())
@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import os
+import shutil
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from services.export_service import (
+    write_csv_file,
+    write_excel_file,
+    write_pdf_file,
+    write_parquet_file,
+    write_arrow_file,
+    run_export_in_pool,
+    run_render_in_pool,
+    EXCEL_MEDIA_TYPE,
+    PARQUET_MEDIA_TYPE,
+    ARROW_MEDIA_TYPE
+)
+
+logger = logging.getLogger("uvicorn")
+
+# format -> (writer, runner, file extension, media type)
+EXPORT_FORMATS = {
+    "csv": (write_csv_file, run_export_in_pool, "csv", "text/csv"),
+    "excel": (write_excel_file, run_export_in_pool, "xlsx", EXCEL_MEDIA_TYPE),
+    "pdf": (write_pdf_file, run_render_in_pool, "pdf", "application/pdf"),
+    "parquet": (write_parquet_file, run_export_in_pool, "parquet", PARQUET_MEDIA_TYPE),
+    "arrow": (write_arrow_file, run_export_in_pool, "arrow", ARROW_MEDIA_TYPE),
+}
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+ArtifactKey = Tuple[str, str, str]  # (pin, format, revision tag)
+
+_jobs: "OrderedDict[str, dict]" = OrderedDict()
+_inflight: Dict[ArtifactKey, str] = {}
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def revision_tag(game_session) -> str:
+    """Exports change when the game or its quiz changes, so both revisions go in the key."""
+    return f"{game_session.revision}.{game_session.quiz.revision}"
+
+
+def media_type_for(fmt: str) -> str:
+    return EXPORT_FORMATS[fmt][3]
+
+
+def download_filename(pin: str, fmt: str) -> str:
+    return f"quiz_results_{pin}.{EXPORT_FORMATS[fmt][2]}"
+
+
+def _pin_dir(pin: str) -> str:
+    return os.path.join(settings.EXPORT_ARTIFACT_DIR, pin)
+
+
+def artifact_path(key: ArtifactKey) -> str:
+    pin, fmt, revision = key
+    return os.path.join(_pin_dir(pin), f"{fmt}-{revision}.{EXPORT_FORMATS[fmt][2]}")
+
+
+def _get_slots() -> asyncio.Semaphore:
+    # Caps queued work across formats; the pools behind each format are bounded as well.
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.EXPORT_JOB_CONCURRENCY)
+    return _slots
+
+
+def _new_job(key: ArtifactKey, status: str) -> dict:
+    pin, fmt, revision = key
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "pin": pin,
+        "format": fmt,
+        "revision": revision,
+        "status": status,
+        "error": None,
+        "created_at": datetime.utcnow().isoformat(),
+        "finished_at": None,
+        "path": artifact_path(key),
+        "task": None,
+    }
+    _jobs[job["job_id"]] = job
+    while len(_jobs) > settings.EXPORT_JOB_HISTORY:
+        oldest_id, oldest = next(iter(_jobs.items()))
+        if oldest["status"] in (JOB_QUEUED, JOB_RUNNING):
+            break
+        _jobs.pop(oldest_id)
+    return job
+
+
+def _revision_order(revision: str) -> Tuple[int, ...]:
+    try:
+        return tuple(int(part) for part in revision.split("."))
+    except ValueError:
+        return ()
+
+
+def _remove_stale_artifacts(key: ArtifactKey):
+    """
+    Drop artifacts of the same pin and format built for older revisions. Jobs can finish
+    out of order, so an artifact for a newer revision than this job's is left alone.
+    """
+    pin, fmt, revision = key
+    prefix, extension = f"{fmt}-", f".{EXPORT_FORMATS[fmt][2]}"
+    current = _revision_order(revision)
+    try:
+        names = os.listdir(_pin_dir(pin))
+    except FileNotFoundError:
+        return
+    for name in names:
+        if not (name.startswith(prefix) and name.endswith(extension)):
+            continue
+        if _revision_order(name[len(prefix):-len(extension)]) < current:
+            try:
+                os.remove(os.path.join(_pin_dir(pin), name))
+            except FileNotFoundError:
+                pass
+
+
+def _prune_artifacts(keep: str):
+    """
+    Hold the artifact directory within EXPORT_ARTIFACT_MAX_AGE_HOURS and EXPORT_ARTIFACT_MAX_BYTES,
+    removing the least recently written artifacts first. A removed artifact is rebuilt by the
+    next export request for it.
+    """
+    artifacts = []
+    for root, _, names in os.walk(settings.EXPORT_ARTIFACT_DIR):
+        for name in names:
+            path = os.path.join(root, name)
+            if name.endswith(".part") or path == keep:
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            artifacts.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in artifacts)
+    if os.path.exists(keep):
+        total += os.path.getsize(keep)
+    cutoff = time.time() - settings.EXPORT_ARTIFACT_MAX_AGE_HOURS * 3600
+    removed = 0
+    for mtime, size, path in sorted(artifacts):
+        if mtime >= cutoff and total <= settings.EXPORT_ARTIFACT_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        total -= size
+        removed += 1
+
+    if removed:
+        logger.info(f"🧹 Pruned {removed} export artifacts ({total} bytes kept)")
+
+
+async def _run_job(job: dict, key: ArtifactKey, game_session_id: int):
+    writer, runner, _, _ = EXPORT_FORMATS[key[1]]
+    try:
+        async with _get_slots():
+            job["status"] = JOB_RUNNING
+            tmp_path = await runner(writer, game_session_id)
+            os.makedirs(_pin_dir(key[0]), exist_ok=True)
+            # Stage next to the artifact, then rename: readers never see a half-written file
+            staged_path = job["path"] + ".part"
+            shutil.move(tmp_path, staged_path)
+            os.replace(staged_path, job["path"])
+            _remove_stale_artifacts(key)
+        job["status"] = JOB_DONE
+    except Exception as e:
+        logger.error(f"❌ Export job {job['job_id']} ({key[1]} for {key[0]}) failed: {e}")
+        job["status"] = JOB_FAILED
+        job["error"] = str(e)
+    finally:
+        job["finished_at"] = datetime.utcnow().isoformat()
+        _inflight.pop(key, None)
+
+    if job["status"] == JOB_DONE:
+        try:
+            await run_in_threadpool(_prune_artifacts, job["path"])
+        except OSError as e:
+            logger.warning(f"⚠️ Could not prune export artifacts: {e}")
+
+
+def submit_export(game_session, fmt: str) -> dict:
+    """
+    Return the job for this game's export, starting one only when needed: an identical
+    in-flight job is shared, and an artifact already on disk for the current revision
+    is reported as done without recomputation.
+    """
+    key = (game_session.pin, fmt, revision_tag(game_session))
+
+    job_id = _inflight.get(key)
+    if job_id is not None:
+        return _jobs[job_id]
+
+    if os.path.exists(artifact_path(key)):
+        job = _new_job(key, JOB_DONE)
+        job["finished_at"] = job["created_at"]
+        return job
+
+    job = _new_job(key, JOB_QUEUED)
+    _inflight[key] = job["job_id"]
+    job["task"] = asyncio.create_task(_run_job(job, key, game_session.id))
+    return job
+
+
+async def wait_for_export(job: dict) -> dict:
+    task = job.get("task")
+    if task is not None and not task.done():
+        await asyncio.shield(task)
+    return job
+
+
+def get_job(job_id: str) -> Optional[dict]:
+    return _jobs.get(job_id)
+
+
+def job_status(job: dict) -> dict:
+    status = {k: v for k, v in job.items() if k not in ("task", "path")}
+    status["download_url"] = (
+        f"/api/export/jobs/{job['job_id']}/download" if job["status"] == JOB_DONE else None
+    )
+    return status
+
+
+def discard_artifacts(pin: str):
+    """Remove every stored artifact for a game (e.g. when its history is deleted)."""
+    shutil.rmtree(_pin_dir(pin), ignore_errors=True)
@@ -1,137 +1,254 @@
-import pandas as pd
-from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.units import inch
+import asyncio
+import csv
+import importlib.util
+import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
 from datetime import datetime
-from typing import List, Dict
+from xml.sax.saxutils import escape
+from typing import Iterator, List, Dict, Optional
+from sqlalchemy import select, func, case
+from config import settings
+from database import SessionLocal, Quiz, GameSession, Player, Question, Answer
 
+CSV_COLUMNS = [
+    'Player Name',
+    'Roll Number',
+    'Question',
+    'Player Answer',
+    'Correct Answer',
+    'Is Correct',
+    'Time Taken (s)',
+    'Points Earned'
+]
+CSV_BATCH_ROWS = 1000
+EXPORT_BATCH_ROWS = 1000
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
-def generate_csv(game_data: dict) -> BytesIO:
-    """Generate CSV export of game results"""
-    
-    # Prepare data for DataFrame
-    rows = []
-    for player in game_data['players']:
-        for answer in player.get('answers', []):
-            rows.append({
-                'Player Name': player['name'],
-                'Roll Number': player.get('roll_number') or '',
-                'Question': answer['question_text'],
-                'Player Answer': answer['answer'],
-                'Correct Answer': answer['correct_answer'],
-                'Is Correct': answer['is_correct'],
-                'Time Taken (s)': round(answer['time_taken'], 2),
-                'Points Earned': answer['points_earned']
-            })
-    
-    df = pd.DataFrame(rows)
-    
-    # Convert to CSV
-    buffer = BytesIO()
-    df.to_csv(buffer, index=False, encoding='utf-8')
-    buffer.seek(0)
+PDF_TABLE_CHUNK_ROWS = 500
+
+# Columnar exports: one Parquet row group / Arrow record batch per cursor partition
+ANALYTICS_BATCH_ROWS = 64 * 1024
+ANALYTICS_FORMATS = ("parquet", "arrow")
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.file"
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+_export_executor: Optional[ThreadPoolExecutor] = None
+_render_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_export_executor() -> ThreadPoolExecutor:
+    """Bounded pool for blocking export work, so file generation never runs on the event loop."""
+    global _export_executor
+    if _export_executor is None:
+        _export_executor = ThreadPoolExecutor(
+            max_workers=settings.EXPORT_WORKERS,
+            thread_name_prefix="export"
+        )
+    return _export_executor
+
+
+def get_render_executor() -> ProcessPoolExecutor:
+    """
+    Process pool for CPU-bound rendering (reportlab layout holds the GIL). Workers are spawned,
+    not forked, so they never inherit the event loop or open DB connections.
+    """
+    global _render_executor
+    if _render_executor is None:
+        _render_executor = ProcessPoolExecutor(
+            max_workers=settings.PDF_RENDER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _render_executor
+
+
+async def run_export_in_pool(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_export_executor(), partial(fn, *args))
+
+
+async def run_render_in_pool(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_render_executor(), partial(fn, *args))
+
+
+def _leaderboard_stmt(game_session_id: int):
+    """Players in rank order with their correct-answer counts."""
+    correct_answers = func.coalesce(func.sum(case((Answer.is_correct == True, 1), else_=0)), 0)
+    return (
+        select(Player.name, Player.roll_number, Player.score, correct_answers)
+        .outerjoin(Answer, Answer.player_id == Player.id)
+        .where(Player.game_session_id == game_session_id)
+        .group_by(Player.id, Player.name, Player.roll_number, Player.score)
+        .order_by(Player.score.desc(), Player.id)
+        .execution_options(yield_per=EXPORT_BATCH_ROWS)
+    )
+
+
+def _detailed_answers_stmt(game_session_id: int, quiz_id: int):
+    """Every answer of a game with its player and question, in leaderboard order."""
+    return (
+        select(
+            Player.name,
+            Player.roll_number,
+            Question.order,
+            Question.question_text,
+            Answer.answer,
+            Question.correct_answer,
+            Answer.is_correct,
+            Answer.time_taken,
+            Answer.points_earned
+        )
+        .join(Answer, Answer.player_id == Player.id)
+        .join(Question, Question.id == Answer.question_id)
+        .where(Player.game_session_id == game_session_id, Question.quiz_id == quiz_id)
+        .order_by(Player.score.desc(), Player.id, Answer.id)
+        .execution_options(yield_per=EXPORT_BATCH_ROWS)
+    )
+
+
+def stream_csv(game_session_id: int, quiz_id: int) -> Iterator[bytes]:
+    """
+    Stream CSV rows straight from the database in bounded batches.
+    Opens its own session because the response body is produced after the
+    request's dependencies have been torn down.
+    """
+    db = SessionLocal()
+    try:
+        text_buffer = io.StringIO()
+        writer = csv.writer(text_buffer, lineterminator='\n')
+        writer.writerow(CSV_COLUMNS)
+        
+        stmt = _detailed_answers_stmt(game_session_id, quiz_id).execution_options(yield_per=CSV_BATCH_ROWS)
+        
+        for partition in db.execute(stmt).partitions():
+            for name, roll_number, _, question_text, answer, correct_answer, is_correct, time_taken, points in partition:
+                writer.writerow([
+                    name,
+                    roll_number or '',
+                    question_text,
+                    answer,
+                    correct_answer,
+                    is_correct,
+                    round(time_taken, 2),
+                    points
+                ])
+            yield text_buffer.getvalue().encode('utf-8')
+            text_buffer.seek(0)
+            text_buffer.truncate(0)
+        
+        if text_buffer.tell():
+            yield text_buffer.getvalue().encode('utf-8')
+    finally:
+        db.close()
+
+
+def _header_row(sheet, columns):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
     
-    return buffer
+    cells = []
+    for column in columns:
+        cell = WriteOnlyCell(sheet, value=column)
+        cell.font = Font(bold=True)
+        cells.append(cell)
+    return cells
 
 
-def generate_excel(game_data: dict) -> BytesIO:
-    """Generate Excel export with multiple sheets"""
+def write_csv_file(game_session_id: int) -> str:
+    """Write the streamed CSV to a temporary file; the caller owns (and must delete) it."""
+    db = SessionLocal()
+    try:
+        quiz_id = db.get(GameSession, game_session_id).quiz_id
+    finally:
+        db.close()
     
-    buffer = BytesIO()
+    fd, path = tempfile.mkstemp(prefix="quiz_results_", suffix=".csv")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in stream_csv(game_session_id, quiz_id):
+                out.write(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def write_excel_file(game_session_id: int) -> str:
+    """
+    Write the three-sheet workbook with openpyxl's write-only mode, streaming leaderboard and
+    answer rows from the database. Memory stays bounded by one batch of rows; the caller owns
+    (and must delete) the returned temporary file.
+    """
+    from openpyxl import Workbook
     
-    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+    db = SessionLocal()
+    fd, path = tempfile.mkstemp(prefix="quiz_results_", suffix=".xlsx")
+    os.close(fd)
+    try:
+        game_session = db.get(GameSession, game_session_id)
+        total_questions = db.query(Question).filter(Question.quiz_id == game_session.quiz_id).count()
+        total_players = db.query(Player).filter(Player.game_session_id == game_session_id).count()
+        
+        workbook = Workbook(write_only=True)
+        
         # Summary sheet
-        summary_data = {
-            'Quiz Title': [game_data['quiz_title']],
-            'Game PIN': [game_data['pin']],
-            'Host': [game_data['host_name']],
-            'Date': [game_data['created_at']],
-            'Total Players': [len(game_data['players'])],
-            'Total Questions': [game_data['total_questions']]
-        }
-        pd.DataFrame(summary_data).to_excel(writer, sheet_name='Summary', index=False)
+        summary = workbook.create_sheet('Summary')
+        summary.append(_header_row(summary, ['Quiz Title', 'Game PIN', 'Host', 'Date', 'Total Players', 'Total Questions']))
+        summary.append([
+            game_session.quiz.title,
+            game_session.pin,
+            game_session.host_name,
+            game_session.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            total_players,
+            total_questions
+        ])
         
         # Leaderboard sheet
-        leaderboard = []
-        for idx, player in enumerate(game_data['players'], 1):
-            leaderboard.append({
-                'Rank': idx,
-                'Player Name': player['name'],
-                'Roll Number': player.get('roll_number') or '',
-                'Total Score': player['score'],
-                'Correct Answers': player['correct_count'],
-                'Accuracy %': round((player['correct_count'] / game_data['total_questions']) * 100, 2)
-            })
-        pd.DataFrame(leaderboard).to_excel(writer, sheet_name='Leaderboard', index=False)
+        leaderboard = workbook.create_sheet('Leaderboard')
+        leaderboard.append(_header_row(leaderboard, ['Rank', 'Player Name', 'Roll Number', 'Total Score', 'Correct Answers', 'Accuracy %']))
+        for rank, (name, roll_number, score, correct_count) in enumerate(db.execute(_leaderboard_stmt(game_session_id)), 1):
+            accuracy = round((correct_count / total_questions) * 100, 2) if total_questions else 0
+            leaderboard.append([rank, name, roll_number or '', score, correct_count, accuracy])
         
         # Detailed answers sheet
-        detailed = []
-        for player in game_data['players']:
-            for answer in player.get('answers', []):
-                detailed.append({
-                    'Player': player['name'],
-                    'Roll Number': player.get('roll_number') or '',
-                    'Question #': answer['question_number'],
-                    'Question': answer['question_text'],
-                    'Player Answer': answer['answer'],
-                    'Correct Answer': answer['correct_answer'],
-                    'Correct': answer['is_correct'],
-                    'Time (s)': round(answer['time_taken'], 2),
-                    'Points': answer['points_earned']
-                })
-        pd.DataFrame(detailed).to_excel(writer, sheet_name='Detailed Results', index=False)
-    
-    buffer.seek(0)
-    return buffer
+        detailed = workbook.create_sheet('Detailed Results')
+        detailed.append(_header_row(detailed, [
+            'Player', 'Roll Number', 'Question #', 'Question', 'Player Answer',
+            'Correct Answer', 'Correct', 'Time (s)', 'Points'
+        ]))
+        for name, roll_number, order, question_text, answer, correct_answer, is_correct, time_taken, points in db.execute(
+            _detailed_answers_stmt(game_session_id, game_session.quiz_id)
+        ):
+            detailed.append([
+                name,
+                roll_number or '',
+                order + 1,
+                question_text,
+                answer,
+                correct_answer,
+                is_correct,
+                round(time_taken, 2),
+                points
+            ])
+        
+        workbook.save(path)
+        return path
+    except Exception:
+        os.remove(path)
+        raise
+    finally:
+        db.close()
 
 
-def generate_pdf(game_data: dict) -> BytesIO:
-    """Generate PDF report of game results"""
-    
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Title
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=30
-    )
-    elements.append(Paragraph(f"Quiz Results: {game_data['quiz_title']}", title_style))
-    elements.append(Spacer(1, 0.2 * inch))
-    
-    # Game Info
-    info_style = styles['Normal']
-    elements.append(Paragraph(f"<b>Game PIN:</b> {game_data['pin']}", info_style))
-    elements.append(Paragraph(f"<b>Host:</b> {game_data['host_name']}", info_style))
-    elements.append(Paragraph(f"<b>Date:</b> {game_data['created_at']}", info_style))
-    elements.append(Paragraph(f"<b>Total Players:</b> {len(game_data['players'])}", info_style))
-    elements.append(Spacer(1, 0.3 * inch))
-    
-    # Leaderboard
-    elements.append(Paragraph("<b>Final Leaderboard</b>", styles['Heading2']))
-    elements.append(Spacer(1, 0.1 * inch))
+def _leaderboard_table_style():
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
     
-    leaderboard_data = [['Rank', 'Player Name', 'Score', 'Correct', 'Accuracy']]
-    for idx, player in enumerate(game_data['players'], 1):
-        accuracy = round((player['correct_count'] / game_data['total_questions']) * 100, 1)
-        leaderboard_data.append([
-            str(idx),
-            player['name'],
-            str(player['score']),
-            f"{player['correct_count']}/{game_data['total_questions']}",
-            f"{accuracy}%"
-        ])
-    
-    leaderboard_table = Table(leaderboard_data, colWidths=[0.8*inch, 2.5*inch, 1.2*inch, 1.2*inch, 1.2*inch])
-    leaderboard_table.setStyle(TableStyle([
+    return TableStyle([
         ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
         ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
         ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -140,56 +257,322 @@ def generate_pdf(game_data: dict) -> BytesIO:
         ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
         ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
         ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    elements.append(leaderboard_table)
+    ])
+
+
+def _question_stats_table_style():
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
     
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black)
+    ])
+
+
+def _question_statistics(db, game_session: GameSession) -> List[dict]:
+    """Per-question answer distribution for a game, from one grouped query."""
+    questions = (
+        db.query(Question)
+        .filter(Question.quiz_id == game_session.quiz_id)
+        .order_by(Question.order, Question.id)
+        .all()
+    )
+    stats = {
+        q.id: {
+            'number': idx,
+            'question_text': q.question_text,
+            'correct_answer': q.correct_answer,
+            'options': {option: 0 for option in (q.options or [])},
+            'answered': 0,
+            'correct': 0,
+            'time_total': 0.0
+        }
+        for idx, q in enumerate(questions, 1)
+    }
+    
+    rows = db.execute(
+        select(
+            Answer.question_id,
+            Answer.answer,
+            func.count(Answer.id),
+            func.sum(case((Answer.is_correct == True, 1), else_=0)),
+            func.sum(Answer.time_taken)
+        )
+        .join(Player, Player.id == Answer.player_id)
+        .where(Player.game_session_id == game_session.id)
+        .group_by(Answer.question_id, Answer.answer)
+    )
+    for question_id, answer, count, correct, time_total in rows:
+        entry = stats.get(question_id)
+        if entry is None:
+            continue
+        entry['options'][answer] = entry['options'].get(answer, 0) + count
+        entry['answered'] += count
+        entry['correct'] += correct or 0
+        entry['time_total'] += time_total or 0.0
     
-    return buffer
+    return list(stats.values())
 
 
-def prepare_game_data_for_export(game_session, players, questions, answers) -> dict:
-    """Prepare game data in a format suitable for export"""
+def write_pdf_file(game_session_id: int) -> str:
+    """
+    Render the full PDF report: game info, a paginated leaderboard and one statistics block per
+    question. The leaderboard is emitted as LongTables of PDF_TABLE_CHUNK_ROWS rows with a repeated
+    header, so reportlab splits them across pages cheaply however many players there are.
+    Intended to run in the render process pool; the caller owns the returned temporary file.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, LongTable, Paragraph, Spacer, PageBreak
     
-    # Organize answers by player
-    players_data = []
-    for player in players:
-        player_answers = [a for a in answers if a.player_id == player.id]
-        
-        correct_count = sum(1 for a in player_answers if a.is_correct)
-        
-        answers_detail = []
-        for answer in player_answers:
-            question = next((q for q in questions if q.id == answer.question_id), None)
-            if question:
-                answers_detail.append({
-                    'question_number': question.order + 1,
-                    'question_text': question.question_text,
-                    'answer': answer.answer,
-                    'correct_answer': question.correct_answer,
-                    'is_correct': answer.is_correct,
-                    'time_taken': answer.time_taken,
-                    'points_earned': answer.points_earned
-                })
-        
-        players_data.append({
-            'name': player.name,
-            'roll_number': player.roll_number,
-            'score': player.score,
-            'correct_count': correct_count,
-            'answers': answers_detail
-        })
+    db = SessionLocal()
+    fd, path = tempfile.mkstemp(prefix="quiz_results_", suffix=".pdf")
+    os.close(fd)
+    try:
+        game_session = db.get(GameSession, game_session_id)
+        total_questions = db.query(Question).filter(Question.quiz_id == game_session.quiz_id).count()
+        total_players = db.query(Player).filter(Player.game_session_id == game_session_id).count()
+        
+        doc = SimpleDocTemplate(path, pagesize=letter, title=f"Quiz Results {game_session.pin}")
+        elements = []
+        styles = getSampleStyleSheet()
+        leaderboard_style = _leaderboard_table_style()
+        question_stats_style = _question_stats_table_style()
+        
+        # Title
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            textColor=colors.HexColor('#1a1a1a'),
+            spaceAfter=30
+        )
+        elements.append(Paragraph(f"Quiz Results: {escape(game_session.quiz.title)}", title_style))
+        elements.append(Spacer(1, 0.2 * inch))
+        
+        # Game Info
+        info_style = styles['Normal']
+        elements.append(Paragraph(f"<b>Game PIN:</b> {game_session.pin}", info_style))
+        elements.append(Paragraph(f"<b>Host:</b> {escape(game_session.host_name)}", info_style))
+        elements.append(Paragraph(f"<b>Date:</b> {game_session.created_at.strftime('%Y-%m-%d %H:%M:%S')}", info_style))
+        elements.append(Paragraph(f"<b>Total Players:</b> {total_players}", info_style))
+        elements.append(Paragraph(f"<b>Total Questions:</b> {total_questions}", info_style))
+        elements.append(Spacer(1, 0.3 * inch))
+        
+        # Leaderboard
+        elements.append(Paragraph("<b>Final Leaderboard</b>", styles['Heading2']))
+        elements.append(Spacer(1, 0.1 * inch))
+        
+        header = ['Rank', 'Player Name', 'Score', 'Correct', 'Accuracy']
+        col_widths = [0.8*inch, 2.5*inch, 1.2*inch, 1.2*inch, 1.2*inch]
+        chunk = [header]
+        for rank, (name, _, score, correct_count) in enumerate(db.execute(_leaderboard_stmt(game_session_id)), 1):
+            accuracy = round((correct_count / total_questions) * 100, 1) if total_questions else 0
+            chunk.append([str(rank), name, str(score), f"{correct_count}/{total_questions}", f"{accuracy}%"])
+            if len(chunk) > PDF_TABLE_CHUNK_ROWS:
+                elements.append(LongTable(chunk, colWidths=col_widths, repeatRows=1, style=leaderboard_style))
+                chunk = [header]
+        if len(chunk) > 1 or total_players == 0:
+            elements.append(LongTable(chunk, colWidths=col_widths, repeatRows=1, style=leaderboard_style))
+        
+        # Per-question statistics
+        question_stats = _question_statistics(db, game_session)
+        if question_stats:
+            elements.append(PageBreak())
+            elements.append(Paragraph("<b>Question Statistics</b>", styles['Heading2']))
+        
+        for stat in question_stats:
+            answered = stat['answered']
+            correct_pct = round(stat['correct'] / answered * 100, 1) if answered else 0
+            avg_time = round(stat['time_total'] / answered, 2) if answered else 0
+            
+            elements.append(Spacer(1, 0.2 * inch))
+            elements.append(Paragraph(f"<b>Q{stat['number']}.</b> {escape(stat['question_text'])}", styles['Heading4']))
+            elements.append(Paragraph(
+                f"Correct answer: <b>{escape(stat['correct_answer'])}</b> &nbsp; "
+                f"Answered: {answered}/{total_players} &nbsp; Correct: {correct_pct}% &nbsp; Avg time: {avg_time}s",
+                info_style
+            ))
+            
+            option_rows = [['Option', 'Responses', 'Share']]
+            for option, count in stat['options'].items():
+                share = round(count / answered * 100, 1) if answered else 0
+                label = f"{option} (correct)" if option == stat['correct_answer'] else option
+                option_rows.append([Paragraph(escape(label), info_style), str(count), f"{share}%"])
+            elements.append(LongTable(option_rows, colWidths=[4.3*inch, 1.1*inch, 1.1*inch], repeatRows=1, style=question_stats_style))
+        
+        doc.build(elements)
+        return path
+    except Exception:
+        os.remove(path)
+        raise
+    finally:
+        db.close()
+
+
+def analytics_export_available() -> bool:
+    """pyarrow is only needed for the columnar formats, so it is optional at import time."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _analytics_schema():
+    import pyarrow as pa
     
-    # Sort by score
-    players_data.sort(key=lambda x: x['score'], reverse=True)
+    text_dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ("game_pin", text_dictionary),
+        ("quiz_title", text_dictionary),
+        ("played_at", pa.timestamp("ms")),
+        ("player_name", pa.string()),
+        ("roll_number", pa.string()),
+        ("player_score", pa.int32()),
+        ("question_number", pa.int16()),
+        ("question_text", text_dictionary),
+        ("player_answer", text_dictionary),
+        ("correct_answer", text_dictionary),
+        ("is_correct", pa.bool_()),
+        ("time_taken", pa.float32()),
+        ("points_earned", pa.int32()),
+    ])
+
+
+class _GrowingDictionary:
+    """
+    Dictionary encoder whose dictionary only ever grows, so every batch after the first is
+    a strict extension. Arrow IPC files accept that as a delta; a fresh per-batch dictionary
+    would be a replacement, which the file format rejects.
+    """
     
-    return {
-        'quiz_title': game_session.quiz.title,
-        'pin': game_session.pin,
-        'host_name': game_session.host_name,
-        'created_at': game_session.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-        'total_questions': len(questions),
-        'players': players_data
-    }
+    def __init__(self):
+        self.values: List[str] = []
+        self.index: Dict[str, int] = {}
+    
+    def encode(self, column):
+        import pyarrow as pa
+        
+        indices = []
+        for value in column:
+            if value is None:
+                indices.append(None)
+                continue
+            position = self.index.get(value)
+            if position is None:
+                position = self.index[value] = len(self.values)
+                self.values.append(value)
+            indices.append(position)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()),
+            pa.array(self.values, type=pa.string())
+        )
+
+
+def _analytics_answers_stmt(game_session_ids: List[int]):
+    """Every answer of the given games, game by game in play order, then in leaderboard order."""
+    return (
+        select(
+            GameSession.pin,
+            Quiz.title,
+            GameSession.created_at,
+            Player.name,
+            Player.roll_number,
+            Player.score,
+            Question.order,
+            Question.question_text,
+            Answer.answer,
+            Question.correct_answer,
+            Answer.is_correct,
+            Answer.time_taken,
+            Answer.points_earned
+        )
+        .join(GameSession, GameSession.id == Player.game_session_id)
+        .join(Quiz, Quiz.id == GameSession.quiz_id)
+        .join(Answer, Answer.player_id == Player.id)
+        .join(Question, (Question.id == Answer.question_id) & (Question.quiz_id == GameSession.quiz_id))
+        .where(GameSession.id.in_(game_session_ids))
+        .order_by(GameSession.created_at, GameSession.id, Player.score.desc(), Player.id, Answer.id)
+        .execution_options(yield_per=ANALYTICS_BATCH_ROWS)
+    )
+
+
+def _analytics_batches(db, game_session_ids: List[int], schema):
+    import pyarrow as pa
+    
+    dictionaries = {name: _GrowingDictionary() for name in
+                    ("game_pin", "quiz_title", "question_text", "player_answer", "correct_answer")}
+    
+    for partition in db.execute(_analytics_answers_stmt(game_session_ids)).partitions():
+        (pins, titles, played_at, names, roll_numbers, scores, orders, question_texts,
+         answers, correct_answers, is_correct, time_taken, points) = zip(*partition)
+        yield pa.record_batch([
+            dictionaries["game_pin"].encode(pins),
+            dictionaries["quiz_title"].encode(titles),
+            pa.array(played_at, type=pa.timestamp("ms")),
+            pa.array(names, type=pa.string()),
+            pa.array(roll_numbers, type=pa.string()),
+            pa.array(scores, type=pa.int32()),
+            pa.array([order + 1 for order in orders], type=pa.int16()),
+            dictionaries["question_text"].encode(question_texts),
+            dictionaries["player_answer"].encode(answers),
+            dictionaries["correct_answer"].encode(correct_answers),
+            pa.array(is_correct, type=pa.bool_()),
+            pa.array(time_taken, type=pa.float32()),
+            pa.array(points, type=pa.int32()),
+        ], schema=schema)
+
+
+def write_analytics_file(game_session_ids: List[int], fmt: str) -> str:
+    """
+    Write answers of one or more games as Parquet or an Arrow IPC file, batch by batch from
+    the database cursor. Text that repeats per answer (pins, titles, questions, options) is
+    dictionary-encoded. The caller owns (and must delete) the returned temporary file.
+    """
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+    
+    if fmt not in ANALYTICS_FORMATS:
+        raise ValueError(f"Unknown analytics format: {fmt}")
+    
+    schema = _analytics_schema()
+    db = SessionLocal()
+    fd, path = tempfile.mkstemp(prefix="quiz_results_", suffix=".parquet" if fmt == "parquet" else ".arrow")
+    os.close(fd)
+    try:
+        if fmt == "parquet":
+            with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+                for batch in _analytics_batches(db, game_session_ids, schema):
+                    writer.write_batch(batch, row_group_size=ANALYTICS_BATCH_ROWS)
+        else:
+            options = ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            with ipc.new_file(path, schema, options=options) as writer:
+                for batch in _analytics_batches(db, game_session_ids, schema):
+                    writer.write_batch(batch)
+    except Exception:
+        os.remove(path)
+        raise
+    finally:
+        db.close()
+    return path
+
+
+def write_parquet_file(game_session_id: int) -> str:
+    return write_analytics_file([game_session_id], "parquet")
+
+
+def write_arrow_file(game_session_id: int) -> str:
+    return write_analytics_file([game_session_id], "arrow")
+
+
+def host_game_ids(db, host_name: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[int]:
+    """Ids of a host's games created in [start, end)."""
+    stmt = select(GameSession.id).where(GameSession.host_name == host_name)
+    if start is not None:
+        stmt = stmt.where(GameSession.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(GameSession.created_at < end)
+    return list(db.execute(stmt.order_by(GameSession.created_at, GameSession.id)).scalars())
@@ -1,14 +1,14 @@
 import io
-import PyPDF2
-from pptx import Presentation
-from PIL import Image
-import pytesseract
-from docx import Document
 from typing import Optional
 
+# Parser libraries are imported inside each parser: together they take most of a second
+# to import and only one of them is needed per upload.
+
 
 def parse_pdf(file_bytes: bytes) -> str:
     """Extract text from PDF file."""
+    import PyPDF2
+    
     try:
         pdf_file = io.BytesIO(file_bytes)
         pdf_reader = PyPDF2.PdfReader(pdf_file)
@@ -46,6 +46,8 @@ def parse_text(file_bytes: bytes) -> str:
 
 def parse_pptx(file_bytes: bytes) -> str:
     """Extract text from PowerPoint file."""
+    from pptx import Presentation
+    
     try:
         pptx_file = io.BytesIO(file_bytes)
         presentation = Presentation(pptx_file)
@@ -67,6 +69,8 @@ def parse_pptx(file_bytes: bytes) -> str:
 
 def parse_docx(file_bytes: bytes) -> str:
     """Extract text from Word document."""
+    from docx import Document
+    
     try:
         docx_file = io.BytesIO(file_bytes)
         doc = Document(docx_file)
@@ -86,6 +90,9 @@ def parse_docx(file_bytes: bytes) -> str:
 
 def parse_image(file_bytes: bytes) -> str:
     """Extract text from image using OCR."""
+    import pytesseract
+    from PIL import Image
+    
     try:
         image = Image.open(io.BytesIO(file_bytes))
         text = pytesseract.image_to_string(image)
@@ -0,0 +1,186 @@
+import json as _json
+import secrets
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+
+class JSONFragment:
+    """
+    Already-serialized JSON that socket payloads can embed as-is. Broadcast payloads that
+    only change on membership or question changes are encoded once and reused, instead of
+    being rebuilt as dicts and re-encoded on every emit.
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @classmethod
+    def encode(cls, value) -> "JSONFragment":
+        return cls(_json.dumps(value, separators=(",", ":")))
+
+    def decode(self):
+        return _json.loads(self.text)
+
+
+# Key of players restored from a snapshot until their client reconnects under a new sid
+RESTORED_SID_PREFIX = "restored:"
+
+# Placeholder emitted for each fragment during encoding; the nonce keeps user strings from matching it
+_FRAGMENT_MARK = f"\x00fragment-{secrets.token_hex(8)}-"
+
+
+class FragmentJSON:
+    """json module for socketio.AsyncServer(json=...) that splices JSONFragment values in verbatim."""
+
+    loads = staticmethod(_json.loads)
+
+    @staticmethod
+    def dumps(obj, **kwargs) -> str:
+        fragments: List[str] = []
+
+        def default(value):
+            if isinstance(value, JSONFragment):
+                fragments.append(value.text)
+                return f"{_FRAGMENT_MARK}{len(fragments) - 1}"
+            raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+        text = _json.dumps(obj, default=default, **kwargs)
+        for index, fragment in enumerate(fragments):
+            text = text.replace(_json.dumps(f"{_FRAGMENT_MARK}{index}"), fragment, 1)
+        return text
+
+
+@dataclass(slots=True)
+class PlayerState:
+    name: str
+    player_id: Optional[Union[int, str]]
+    score: int = 0
+
+
+@dataclass(slots=True)
+class StagedQuestion:
+    """A question pushed ahead of time in encrypted form; opening it only needs the key."""
+
+    index: int
+    key: bytes
+    # question_staged body: {index, iv, data}, sent to prefetching clients (and late joiners)
+    payload: JSONFragment
+
+
+@dataclass(slots=True)
+class GameRoom:
+    """In-memory state of one game, keyed by PIN in socket_manager.active_games."""
+
+    players: Dict[str, PlayerState] = field(default_factory=dict)
+    host_sid: Optional[str] = None
+    # The GameSession this room plays; PINs are reused after a game is deleted, session ids are not
+    game_session_id: Optional[int] = None
+    status: str = "waiting"
+    current_question: int = 0
+    # Player-facing view of the current question, sent again to anyone who (re)joins mid-game
+    current_question_data: Optional[JSONFragment] = None
+    # The quiz's player-facing questions in play order, encoded once when the game starts
+    questions: List[JSONFragment] = field(default_factory=list, repr=False)
+    # Why the room is counting down to eviction (finished, hostless, abandoned); None while live
+    expiry_reason: Optional[str] = field(default=None, init=False)
+    # Sequence of the last journal event reflected in this state (0 when journaling is off)
+    journal_seq: int = field(default=0, init=False)
+    # Next question already pushed to prefetching clients, until it is opened or skipped
+    staged: Optional[StagedQuestion] = field(default=None, init=False, repr=False)
+    # Wall-clock time (s) the current question was opened, for time-to-visible reports
+    question_opened_at: float = field(default=0.0, init=False)
+    _lobby_payload: Optional[JSONFragment] = field(default=None, init=False, repr=False)
+
+    def add_player(self, sid: str, player: PlayerState):
+        self.players[sid] = player
+        self._lobby_payload = None
+
+    def remove_player(self, sid: str) -> Optional[PlayerState]:
+        player = self.players.pop(sid, None)
+        if player is not None:
+            self._lobby_payload = None
+        return player
+
+    def find_player(self, name: str, player_id) -> Optional[str]:
+        for sid, player in self.players.items():
+            if player.name == name and player.player_id == player_id:
+                return sid
+        return None
+
+    def rebind_player(self, old_sid: str, new_sid: str) -> PlayerState:
+        """Move a player to a reconnected socket; the lobby is unchanged, so its cached payload stays valid."""
+        player = self.players.pop(old_sid)
+        self.players[new_sid] = player
+        return player
+
+    def lobby_payload(self) -> JSONFragment:
+        """lobby_updated body, encoded once per membership change and shared by every broadcast until the next."""
+        if self._lobby_payload is None:
+            self._lobby_payload = JSONFragment.encode({
+                "players": [{"name": player.name, "player_id": player.player_id} for player in self.players.values()],
+                "count": len(self.players),
+            })
+        return self._lobby_payload
+
+    def estimated_size(self) -> int:
+        """Approximate bytes held by this room (objects, keys and cached payloads), for eviction metrics."""
+        size = sys.getsizeof(self) + sys.getsizeof(self.players)
+        for sid, player in self.players.items():
+            size += sys.getsizeof(sid) + sys.getsizeof(player) + sys.getsizeof(player.name)
+        staged = self.staged.payload if self.staged is not None else None
+        for fragment in (self.current_question_data, self._lobby_payload, staged, *self.questions):
+            if fragment is not None:
+                size += sys.getsizeof(fragment) + sys.getsizeof(fragment.text)
+        return size
+
+    def to_snapshot(self) -> dict:
+        """Restart-safe state: sids do not survive a restart, so players are stored by identity only."""
+        return {
+            "status": self.status,
+            "current_question": self.current_question,
+            "current_question_data": self.current_question_data.text if self.current_question_data else None,
+            "players": [[player.name, player.player_id, player.score] for player in self.players.values()],
+            "journal_seq": self.journal_seq,
+            "game_session_id": self.game_session_id,
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "GameRoom":
+        room = cls(
+            status=snapshot["status"],
+            current_question=snapshot["current_question"],
+            game_session_id=snapshot.get("game_session_id")
+        )
+        if snapshot.get("current_question_data") is not None:
+            room.current_question_data = JSONFragment(snapshot["current_question_data"])
+        for index, (name, player_id, score) in enumerate(snapshot["players"]):
+            room.players[f"{RESTORED_SID_PREFIX}{index}"] = PlayerState(name, player_id, score)
+        room.journal_seq = snapshot.get("journal_seq", 0)
+        return room
+
+    def apply_event(self, seq: int, kind: str, data: Optional[dict]):
+        """Replay one journaled event, mirroring what the socket handler did to the live room."""
+        if kind == "join":
+            for sid in [
+                sid for sid, player in self.players.items()
+                if (data["player_id"] is not None and player.player_id == data["player_id"]) or player.name == data["name"]
+            ]:
+                self.remove_player(sid)
+            self.add_player(f"{RESTORED_SID_PREFIX}{seq}", PlayerState(data["name"], data["player_id"]))
+        elif kind == "leave":
+            sid = self.find_player(data["name"], data["player_id"])
+            if sid is not None:
+                self.remove_player(sid)
+        elif kind == "start":
+            self.status = "active"
+            self.current_question = 0
+            self.current_question_data = None
+        elif kind == "question":
+            self.current_question = data["index"]
+            self.current_question_data = JSONFragment.encode(data)
+        elif kind == "end":
+            self.status = "finished"
+        self.journal_seq = seq
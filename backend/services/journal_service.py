@@ -0,0 +1,361 @@
+import json
+import logging
+import os
+import queue
+import shutil
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from config import settings
+from database import SessionLocal, GameSession
+from services.game_state import FragmentJSON, GameRoom
+from services.metrics_service import Counter, Histogram, LATENCY_BUCKETS, FANOUT_BUCKETS, register_metric
+
+logger = logging.getLogger("uvicorn")
+
+# Record = header + JSON body. Header: body length, CRC32 of the body, sequence, wall-clock
+# time in ms and a one-byte event kind, all little-endian.
+RECORD_HEADER = struct.Struct("<IIQdB")
+EVENT_KINDS = ("join", "leave", "start", "question", "answer", "reveal", "end")
+_KIND_CODES = {kind: code for code, kind in enumerate(EVENT_KINDS, start=1)}
+SEGMENT_SUFFIX = ".seg"
+COMPACTED_SEGMENT = "compacted" + SEGMENT_SUFFIX
+
+# A journal belongs to one game session: PINs are reused once a game is deleted, and a new
+# game must not replay the players of the old one
+JournalKey = Tuple[str, int]  # (pin, game session id)
+
+journal_records = register_metric(Counter("quiz_journal_records_total", "Events appended to the game journal"))
+journal_fsync_duration = register_metric(
+    Histogram("quiz_journal_fsync_seconds", "Time to flush and fsync one group of journal writes", (), LATENCY_BUCKETS)
+)
+journal_group_size = register_metric(
+    Histogram("quiz_journal_group_records", "Journal records made durable by one group fsync", (), FANOUT_BUCKETS)
+)
+
+
+class JournalRecord(NamedTuple):
+    seq: int
+    ts: float  # ms since the epoch
+    kind: str
+    data: Optional[dict]
+
+
+def _is_journal_pin(pin) -> bool:
+    # PINs come from clients and name directories: never let one escape JOURNAL_DIR
+    return isinstance(pin, str) and 0 < len(pin) <= 64 and pin.isalnum()
+
+
+def _game_dir(key: JournalKey) -> str:
+    pin, game_session_id = key
+    return os.path.join(settings.JOURNAL_DIR, pin, str(game_session_id))
+
+
+def _segment_paths(key: JournalKey) -> List[str]:
+    directory = _game_dir(key)
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    # The compacted segment holds the oldest records; live segments are named by first sequence
+    names = sorted(name for name in names if name.endswith(SEGMENT_SUFFIX) and name != COMPACTED_SEGMENT)
+    if os.path.exists(os.path.join(directory, COMPACTED_SEGMENT)):
+        names.insert(0, COMPACTED_SEGMENT)
+    return [os.path.join(directory, name) for name in names]
+
+
+def _encode(seq: int, ts: float, kind: str, data) -> bytes:
+    # Cached payload fragments (e.g. the current question) are written as-is
+    body = FragmentJSON.dumps(data, separators=(",", ":")).encode("utf-8")
+    return RECORD_HEADER.pack(len(body), zlib.crc32(body), seq, ts, _KIND_CODES[kind]) + body
+
+
+def _read_segment(path: str) -> Iterator[JournalRecord]:
+    """Records of one segment up to the first torn or corrupt one (a crash mid-write)."""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            length, crc, seq, ts, code = RECORD_HEADER.unpack(header)
+            body = f.read(length)
+            if len(body) < length or zlib.crc32(body) != crc or not 1 <= code <= len(EVENT_KINDS):
+                logger.warning(f"⚠️ Journal segment {path} ends in a damaged record at seq {seq}")
+                return
+            yield JournalRecord(seq, ts, EVENT_KINDS[code - 1], json.loads(body))
+
+
+def read_journal(key: JournalKey, after_seq: int = 0) -> Iterator[JournalRecord]:
+    """A game's events in order. Records repeated by an interrupted compaction are skipped."""
+    last_seq = after_seq
+    for path in _segment_paths(key):
+        for record in _read_segment(path):
+            if record.seq > last_seq:
+                last_seq = record.seq
+                yield record
+
+
+class JournalWriter:
+    """
+    Appends length-prefixed records to per-game segment files from a background thread. Every
+    record queued while the previous fsync ran is written and made durable by one fsync per
+    touched file (group commit), so the cost per event falls as the event rate rises.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int, max_open_files: int):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_open_files = max_open_files
+        self._queue: "queue.SimpleQueue[Optional[tuple]]" = queue.SimpleQueue()
+        self._files: "OrderedDict[str, object]" = OrderedDict()
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+
+    def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread.start()
+
+    def next_seq(self) -> int:
+        # Time-based so sequences keep increasing across restarts and across games sharing a PIN
+        with self._seq_lock:
+            self._seq = max(self._seq + 1, time.time_ns() // 1000)
+            return self._seq
+
+    def append(self, key: JournalKey, kind: str, data) -> int:
+        seq = self.next_seq()
+        self._queue.put(("append", key, seq, time.time() * 1000, kind, data))
+        return seq
+
+    def compact(self, key: JournalKey):
+        self._queue.put(("compact", key))
+
+    def discard(self, key: JournalKey):
+        self._queue.put(("discard", key))
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=30)
+
+    def _file_for(self, key: JournalKey, seq: int):
+        f = self._files.get(key)
+        if f is not None and f.tell() >= self.segment_bytes:
+            self._close_file(key)
+            f = None
+        if f is None:
+            if len(self._files) >= self.max_open_files:
+                self._close_file(next(iter(self._files)))
+            directory = _game_dir(key)
+            os.makedirs(directory, exist_ok=True)
+            f = open(os.path.join(directory, f"{seq:020d}{SEGMENT_SUFFIX}"), "ab")
+            self._files[key] = f
+        self._files.move_to_end(key)
+        return f
+
+    def _close_file(self, key: JournalKey):
+        f = self._files.pop(key, None)
+        if f is not None:
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            touched = {}
+            stop = False
+            for item in batch:
+                if item is None:
+                    stop = True
+                    continue
+                try:
+                    if item[0] == "append":
+                        _, key, seq, ts, kind, data = item
+                        f = self._file_for(key, seq)
+                        f.write(_encode(seq, ts, kind, data))
+                        touched[key] = f
+                    else:
+                        touched.pop(item[1], None)
+                        self._close_file(item[1])
+                        if item[0] == "compact":
+                            self._compact(item[1])
+                        else:
+                            _remove_journal(item[1])
+                except Exception:
+                    logger.exception(f"❌ Journal {item[0]} for game {item[1][0]} failed")
+            if touched:
+                started = time.perf_counter()
+                for key, f in touched.items():
+                    if f.closed:
+                        continue
+                    try:
+                        f.flush()
+                        os.fsync(f.fileno())
+                    except OSError as e:
+                        logger.error(f"❌ Journal fsync for game {key[0]} failed: {e}")
+                journal_fsync_duration.observe(time.perf_counter() - started)
+                appended = sum(1 for item in batch if item is not None and item[0] == "append")
+                journal_group_size.observe(appended)
+                journal_records.add(appended)
+            if stop:
+                for pin in list(self._files):
+                    self._close_file(pin)
+                return
+
+    def _compact(self, key: JournalKey):
+        """
+        Merge a game's segments into one, dropping damaged tails. The merged file is fsynced and
+        renamed into place before the old segments are deleted; a crash in between leaves
+        duplicates, which read_journal skips by sequence.
+        """
+        paths = _segment_paths(key)
+        compacted = os.path.join(_game_dir(key), COMPACTED_SEGMENT)
+        # A lone live segment is still rewritten, so a compacted journal never looks live on restart
+        if not paths or paths == [compacted]:
+            return
+        staged = compacted + ".part"
+        with open(staged, "wb") as out:
+            for record in read_journal(key):
+                out.write(_encode(record.seq, record.ts, record.kind, record.data))
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(staged, compacted)
+        for path in paths:
+            if path != compacted:
+                os.remove(path)
+
+
+def _remove_journal(key: JournalKey):
+    shutil.rmtree(_game_dir(key), ignore_errors=True)
+    try:
+        os.rmdir(os.path.join(settings.JOURNAL_DIR, key[0]))
+    except OSError:
+        pass  # another game session of this PIN still has a journal
+
+
+_writer: Optional[JournalWriter] = None
+
+
+def journal_enabled() -> bool:
+    return _writer is not None
+
+
+def start_journal():
+    global _writer
+    if not settings.JOURNAL_ENABLED or _writer is not None:
+        return
+    _writer = JournalWriter(settings.JOURNAL_DIR, settings.JOURNAL_SEGMENT_BYTES, settings.JOURNAL_MAX_OPEN_FILES)
+    _writer.start()
+    logger.info(f"📒 Journaling game events to {settings.JOURNAL_DIR}")
+
+
+def stop_journal():
+    global _writer
+    if _writer is None:
+        return
+    _writer.close()
+    _writer = None
+
+
+def append_event(pin: str, game_session_id: Optional[int], kind: str, data=None) -> Optional[int]:
+    """
+    Queue an event for the game's journal; returns its sequence number, or None when journaling
+    is off or the room has no game session to journal for.
+    """
+    if _writer is None or game_session_id is None or not _is_journal_pin(pin):
+        return None
+    return _writer.append((pin, game_session_id), kind, data)
+
+
+def compact_journal(pin: str, game_session_id: Optional[int]):
+    if _writer is not None and game_session_id is not None and _is_journal_pin(pin):
+        _writer.compact((pin, game_session_id))
+
+
+def discard_journal(pin: str, game_session_id: Optional[int]):
+    """Delete a game's journal once the game itself is deleted; evicted rooms keep theirs."""
+    if _writer is not None and game_session_id is not None and _is_journal_pin(pin):
+        _writer.discard((pin, game_session_id))
+
+
+def _journal_keys() -> List[JournalKey]:
+    try:
+        pins = os.listdir(settings.JOURNAL_DIR)
+    except FileNotFoundError:
+        return []
+    keys = []
+    for pin in filter(_is_journal_pin, pins):
+        try:
+            sessions = os.listdir(os.path.join(settings.JOURNAL_DIR, pin))
+        except NotADirectoryError:
+            continue
+        keys.extend((pin, int(session)) for session in sessions if session.isdigit())
+    return keys
+
+
+def _is_live(key: JournalKey, cutoff: float) -> bool:
+    """Uncompacted segments written recently, i.e. a room that was live at shutdown."""
+    paths = [path for path in _segment_paths(key) if not path.endswith(COMPACTED_SEGMENT)]
+    return bool(paths) and max(os.path.getmtime(path) for path in paths) >= cutoff
+
+
+def _is_expired(key: JournalKey, cutoff: float) -> bool:
+    paths = _segment_paths(key)
+    return not paths or max(os.path.getmtime(path) for path in paths) < cutoff
+
+
+def _current_game_sessions(pins: Set[str]) -> Dict[str, int]:
+    if not pins:
+        return {}
+    with SessionLocal() as db:
+        return dict(db.query(GameSession.pin, GameSession.id).filter(GameSession.pin.in_(list(pins))).all())
+
+
+def replay_journals(rooms: Dict[str, GameRoom]) -> int:
+    """
+    Bring restored rooms up to date with events journaled after their snapshot, and rebuild
+    rooms that were never snapshotted. Journals of game sessions that no longer own their PIN
+    are deleted, as are restored rooms of such sessions, and so are journals older than
+    JOURNAL_RETENTION_DAYS when it is set. Blocking: run it off the event loop.
+    Returns the number of events applied.
+    """
+    keys = _journal_keys()
+    current = _current_game_sessions(set(rooms) | {pin for pin, _ in keys})
+
+    for pin in list(rooms):
+        room = rooms[pin]
+        if room.game_session_id is None:
+            room.game_session_id = current.get(pin)  # snapshotted before rooms recorded it
+        if room.game_session_id is None or room.game_session_id != current.get(pin):
+            logger.warning(f"⚠️ Dropping restored room {pin}: its game session no longer exists")
+            del rooms[pin]
+
+    cutoff = time.time() - settings.ROOM_HOSTLESS_TTL_SECONDS
+    retention_cutoff = time.time() - settings.JOURNAL_RETENTION_DAYS * 86400
+    live = set()
+    for key in keys:
+        if current.get(key[0]) != key[1]:
+            _remove_journal(key)
+        elif _is_live(key, cutoff):
+            live.add(key[0])
+        elif settings.JOURNAL_RETENTION_DAYS > 0 and key[0] not in rooms and _is_expired(key, retention_cutoff):
+            _remove_journal(key)
+
+    applied = 0
+    for pin in set(rooms) | live:
+        room = rooms.get(pin) or GameRoom(game_session_id=current[pin])
+        for record in read_journal((pin, room.game_session_id), room.journal_seq):
+            room.apply_event(record.seq, record.kind, record.data)
+            applied += 1
+        if room.journal_seq or pin in rooms:
+            rooms[pin] = room
+    return applied
@@ -0,0 +1,238 @@
+import asyncio
+import functools
+import logging
+import time
+import weakref
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger("uvicorn")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FANOUT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends the charset
+
+_lock = Lock()
+
+
+class Histogram:
+    """Fixed-bucket histogram keyed by label values, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *label_values: str):
+        with _lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with _lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+        for label_values, bucket_counts, total, count in sorted(snapshot):
+            labels = _format_labels(self.label_names, label_values)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names + ("le",), label_values + (le,))} {cumulative}')
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Gauge:
+    """Gauge that is either incremented/decremented in place or read from a callback at scrape time."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (), callback: Callable[[], float] = None):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.callback = callback
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def add(self, amount: float, *label_values: str):
+        with _lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        if self.callback is not None:
+            try:
+                lines.append(f"{self.name} {self.callback()}")
+            except Exception as e:
+                logger.warning(f"⚠️ Metric {self.name} could not be collected: {e}")
+            return lines
+        with _lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(f"{self.name}{_format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+
+class Counter(Gauge):
+    """Monotonic counter; same storage as Gauge, exposed with the counter type."""
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} counter"
+        return lines
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)) + "}"
+
+
+http_request_duration = Histogram(
+    "quiz_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status"), LATENCY_BUCKETS
+)
+http_in_flight = Gauge("quiz_http_requests_in_flight", "HTTP requests currently being served")
+socket_event_duration = Histogram(
+    "quiz_socket_event_duration_seconds", "Socket.IO event handler latency",
+    ("event", "outcome"), LATENCY_BUCKETS
+)
+socket_events_in_flight = Gauge("quiz_socket_events_in_flight", "Socket.IO handlers currently running", ("event",))
+socket_emit_recipients = Histogram(
+    "quiz_socket_emit_recipients", "Sockets addressed by each emit (fan-out size)",
+    ("event",), FANOUT_BUCKETS
+)
+
+_metrics: List = [http_request_duration, http_in_flight, socket_event_duration, socket_events_in_flight, socket_emit_recipients]
+
+
+def register_metric(metric):
+    _metrics.append(metric)
+    return metric
+
+
+def register_gauge_callback(name: str, help_text: str, callback: Callable[[], float]):
+    """Expose a value computed at scrape time (e.g. connected sockets)."""
+    _metrics.append(Gauge(name, help_text, callback=callback))
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Callables (event, args, started, duration, outcome) run after every instrumented handler
+_socket_event_observers: List[Callable] = []
+
+
+def add_socket_event_observer(observer: Callable):
+    _socket_event_observers.append(observer)
+
+
+def remove_socket_event_observer(observer: Callable):
+    if observer in _socket_event_observers:
+        _socket_event_observers.remove(observer)
+
+
+def instrument_socket_event(handler):
+    """
+    Wrap a Socket.IO handler to record latency, in-flight count and failures. Place it
+    under @sio.event; functools.wraps keeps the name sio uses as the event name.
+    """
+    event = handler.__name__
+
+    @functools.wraps(handler)
+    async def wrapper(*args, **kwargs):
+        tag_current_task(f"socket {event}")
+        socket_events_in_flight.add(1, event)
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            return await handler(*args, **kwargs)
+        except Exception:
+            outcome = "error"
+            logger.exception(f"❌ Socket event '{event}' failed")
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            socket_event_duration.observe(duration, event, outcome)
+            socket_events_in_flight.add(-1, event)
+            for observer in _socket_event_observers:
+                observer(event, args, started, duration, outcome)
+
+    return wrapper
+
+
+class HTTPMetricsMiddleware:
+    """
+    Pure ASGI middleware recording per-route latency. Routes are labelled by template
+    (/api/game/{pin}/...) to keep cardinality bounded. Unlike @app.middleware("http") it
+    runs the endpoint in the request's own task, which is what tag_current_task relies on.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        tag_current_task(scope)
+        http_in_flight.add(1)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_duration.observe(time.perf_counter() - started, scope["method"], _route_label(scope), str(status))
+            http_in_flight.add(-1)
+
+
+def _route_label(scope: dict) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+# Task -> what it is serving (an ASGI scope or a socket event name), read by the loop watchdog
+_task_operations: "weakref.WeakKeyDictionary[asyncio.Task, object]" = weakref.WeakKeyDictionary()
+
+
+def tag_current_task(operation):
+    task = asyncio.current_task()
+    if task is not None:
+        _task_operations[task] = operation
+
+
+def describe_task(task: Optional[asyncio.Task]) -> Optional[str]:
+    """Human-readable label for what a task is doing; the route template is resolved lazily."""
+    if task is None:
+        return None
+    operation = _task_operations.get(task)
+    if operation is None:
+        return task.get_name()
+    if isinstance(operation, dict):
+        return f"HTTP {operation['method']} {getattr(operation.get('route'), 'path', None) or operation['path']}"
+    return str(operation)
@@ -0,0 +1,70 @@
+import base64
+import os
+import time
+
+from services.game_state import JSONFragment, StagedQuestion
+from services.metrics_service import Histogram, LATENCY_BUCKETS, register_metric
+
+# Socket.IO sub-rooms of a game: players who prefetch questions, and everyone else
+STAGED_ROOM_SUFFIX = ":staged"
+LIVE_ROOM_SUFFIX = ":live"
+
+# Longest time-to-visible report accepted; later acks come from a client that was suspended
+MAX_VISIBLE_SECONDS = 60.0
+
+question_visible_seconds = register_metric(
+    Histogram(
+        "quiz_question_visible_seconds",
+        "Time from opening a question until a client reported it on screen (server clock, includes the ack's trip)",
+        ("mode",), LATENCY_BUCKETS
+    )
+)
+question_render_seconds = register_metric(
+    Histogram(
+        "quiz_question_render_seconds",
+        "Client-measured time from receiving a question (or its key) to painting it",
+        ("mode",), LATENCY_BUCKETS
+    )
+)
+
+
+def staged_room(pin: str) -> str:
+    return f"{pin}{STAGED_ROOM_SUFFIX}"
+
+
+def live_room(pin: str) -> str:
+    return f"{pin}{LIVE_ROOM_SUFFIX}"
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def stage_question(index: int, question: JSONFragment) -> StagedQuestion:
+    """
+    Encrypt a player-facing question under a fresh 128-bit key. The ciphertext can be pushed
+    early without letting anyone read ahead; question_reveal later carries just the key.
+    """
+    # Prefetch is opt-in, so the crypto library is loaded by the first staged question, not at startup
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    key = AESGCM.generate_key(bit_length=128)
+    iv = os.urandom(12)
+    data = AESGCM(key).encrypt(iv, question.text.encode("utf-8"), None)
+    return StagedQuestion(index, key, JSONFragment.encode({"index": index, "iv": _b64(iv), "data": _b64(data)}))
+
+
+def reveal_payload(staged: StagedQuestion, opened_at: float) -> dict:
+    """question_reveal body: which staged question to open, its key, and the server time (ms) it opened."""
+    return {"index": staged.index, "key": _b64(staged.key), "server_ts": round(opened_at * 1000)}
+
+
+def record_visible(mode: str, opened_at: float, render_ms) -> bool:
+    """Record one client's time-to-visible for the current question; False if the report is implausible."""
+    elapsed = time.time() - opened_at
+    if not opened_at or not 0 <= elapsed <= MAX_VISIBLE_SECONDS:
+        return False
+    question_visible_seconds.observe(elapsed, mode)
+    if isinstance(render_ms, (int, float)) and 0 <= render_ms <= MAX_VISIBLE_SECONDS * 1000:
+        question_render_seconds.observe(render_ms / 1000, mode)
+    return True
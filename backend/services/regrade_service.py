@@ -0,0 +1,104 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from database import GameSession, Player, Question, Answer
+from services.cache_service import bump_game_revisions, invalidate_cached_responses
+from services.socket_manager import calculate_score
+
+REGRADE_BATCH_ROWS = 10000
+_SQL_IN_CHUNK = 500
+
+
+def regrade_questions(db: Session, question_ids: Iterable[int]) -> dict:
+    """
+    Re-score every stored answer to the given questions against their current
+    correct_answer and time_limit, across all game sessions, and move player totals by
+    the difference. Runs inside the caller's transaction; only rows whose score
+    actually changed are written, each table in one executemany UPDATE.
+    """
+    question_ids = sorted(set(question_ids))
+    answer_updates: List[dict] = []
+    score_deltas: Dict[int, int] = defaultdict(int)
+    player_games: Dict[int, int] = {}
+    checked = 0
+
+    for start in range(0, len(question_ids), _SQL_IN_CHUNK):
+        stmt = (
+            select(
+                Answer.id,
+                Answer.player_id,
+                Answer.answer,
+                Answer.is_correct,
+                Answer.time_taken,
+                Answer.points_earned,
+                Question.correct_answer,
+                Question.time_limit,
+                Player.game_session_id
+            )
+            .join(Question, Question.id == Answer.question_id)
+            .join(Player, Player.id == Answer.player_id)
+            .where(
+                Answer.question_id.in_(question_ids[start:start + _SQL_IN_CHUNK]),
+                # Answers that are wrong, stay wrong and hold no points can't change; skip them in SQL
+                or_(
+                    Answer.answer == Question.correct_answer,
+                    Answer.is_correct == True,
+                    func.coalesce(Answer.points_earned, 0) != 0
+                )
+            )
+            .execution_options(yield_per=REGRADE_BATCH_ROWS)
+        )
+        for partition in db.execute(stmt).partitions():
+            for answer_id, player_id, answer, was_correct, time_taken, old_points, correct_answer, time_limit, game_id in partition:
+                checked += 1
+                is_correct = answer == correct_answer
+                points = calculate_score(is_correct, time_taken, time_limit)
+                old_points = old_points or 0
+                if is_correct == bool(was_correct) and points == old_points:
+                    continue
+
+                answer_updates.append({"answer_id": answer_id, "new_is_correct": is_correct, "new_points": points})
+                if points != old_points:
+                    score_deltas[player_id] += points - old_points
+                player_games[player_id] = game_id
+
+    # Core executemany by primary key: ~2x faster than the ORM bulk update path at 100k+ rows
+    if answer_updates:
+        answers = Answer.__table__
+        db.execute(
+            update(answers)
+            .where(answers.c.id == bindparam("answer_id"))
+            .values(is_correct=bindparam("new_is_correct"), points_earned=bindparam("new_points")),
+            answer_updates
+        )
+
+    score_updates = [{"player_id": pid, "delta": delta} for pid, delta in score_deltas.items() if delta]
+    if score_updates:
+        players = Player.__table__
+        db.execute(
+            update(players)
+            .where(players.c.id == bindparam("player_id"))
+            .values(score=players.c.score + bindparam("delta")),
+            score_updates
+        )
+
+    game_ids = sorted(set(player_games.values()))
+    bump_game_revisions(db, game_ids)
+    pins = list(db.execute(select(GameSession.pin).where(GameSession.id.in_(game_ids))).scalars()) if game_ids else []
+
+    return {
+        "questions": len(question_ids),
+        "answers_checked": checked,
+        "answers_changed": len(answer_updates),
+        "players_updated": len(score_updates),
+        "games": sorted(pins),
+    }
+
+
+def invalidate_regraded_games(summary: dict):
+    """Drop cached leaderboards and results of regraded games; call after the commit."""
+    for pin in summary["games"]:
+        invalidate_cached_responses(pin)
@@ -0,0 +1,417 @@
+import json
+import logging
+import re
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, or_, text
+from sqlalchemy.orm import Session
+
+from database import engine, IndexBackfill, Quiz, Question
+
+logger = logging.getLogger("uvicorn")
+
+SEARCH_SCOPES = ("questions", "quizzes")
+MAX_QUERY_TERMS = 8
+MIN_PREFIX_LENGTH = 3  # shorter prefixes expand to most of the vocabulary and defeat the index
+# Broad queries rank only the newest matches, so their cost does not grow with the table
+MAX_RANKED_CANDIDATES = 200
+BM25_K1 = 1.2
+BM25_B = 0.75
+BACKFILL_BATCH_SIZE = 5000
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# "fts5" (SQLite), "tsvector" (Postgres) or None when only the LIKE fallback is available
+_backend: Optional[str] = None
+
+# Prefix lengths with their own index; longer prefixes merge the doclist of every matching term
+FTS5_OPTIONS = "tokenize='porter unicode61 remove_diacritics 2', prefix='3 4 5 6'"
+
+POSTGRES_DDL = [
+    """
+    ALTER TABLE quizzes ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_quizzes_search_vector ON quizzes USING GIN (search_vector)",
+    """
+    ALTER TABLE questions ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(question_text, ''))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_questions_search_vector ON questions USING GIN (search_vector)",
+]
+
+
+def ensure_search_index():
+    """
+    Create the full-text index for the current database and backfill it on first run.
+    SQLite uses standalone FTS5 tables kept in sync from the quiz routes; Postgres uses
+    generated tsvector columns, which the database keeps in sync by itself.
+    """
+    global _backend
+
+    try:
+        if engine.dialect.name == "sqlite":
+            _ensure_sqlite_index()
+            _backend = "fts5"
+        elif engine.dialect.name == "postgresql":
+            with engine.begin() as conn:
+                for statement in POSTGRES_DDL:
+                    conn.execute(text(statement))
+            _backend = "tsvector"
+        else:
+            _backend = None
+    except Exception as e:
+        logger.warning(f"⚠️ Full-text search index unavailable, falling back to LIKE search: {e}")
+        _backend = None
+
+
+# FTS5 table -> (source table, indexed columns as "source expression AS column")
+_FTS5_TABLES = {
+    "quiz_search": ("quizzes", "title, description", "title, COALESCE(description, '')"),
+    "question_search": ("questions", "question_text", "question_text"),
+}
+
+
+def _ensure_sqlite_index():
+    with engine.begin() as conn:
+        for fts_table, (_, columns, _) in _FTS5_TABLES.items():
+            ddl = conn.execute(
+                text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts_table}
+            ).scalar()
+            if ddl is not None and FTS5_OPTIONS not in ddl:
+                # Tokenizer or prefix settings changed: drop the table and let the backfill rebuild it
+                logger.info(f"🔎 Rebuilding {fts_table} with new index options")
+                conn.execute(text(f"DROP TABLE {fts_table}"))
+                conn.execute(delete(IndexBackfill).where(IndexBackfill.name == fts_table))
+                ddl = None
+            if ddl is None:
+                conn.execute(text(f"CREATE VIRTUAL TABLE {fts_table} USING fts5({columns}, {FTS5_OPTIONS})"))
+
+    for fts_table in _FTS5_TABLES:
+        _backfill_fts5(fts_table)
+
+
+def _backfill_fts5(fts_table: str):
+    """
+    Index rows that predate the FTS table, in id order. Progress is committed with each batch,
+    so a backfill interrupted by a crash or deploy resumes on the next start.
+    """
+    source, columns, expressions = _FTS5_TABLES[fts_table]
+    with Session(engine) as db:
+        progress = db.get(IndexBackfill, fts_table)
+        if progress is None:
+            progress = IndexBackfill(name=fts_table, last_id=0)
+            db.add(progress)
+            db.commit()
+        if progress.completed_at is not None:
+            return
+
+        total = 0
+        while True:
+            ids = db.execute(
+                text(f"SELECT id FROM {source} WHERE id > :last_id ORDER BY id LIMIT :batch"),
+                {"last_id": progress.last_id, "batch": BACKFILL_BATCH_SIZE}
+            ).scalars().all()
+            if not ids:
+                break
+
+            # Rows saved while the backfill runs are already indexed; replace them, don't duplicate
+            window = {"first": ids[0], "last": ids[-1]}
+            db.execute(text(f"DELETE FROM {fts_table} WHERE rowid BETWEEN :first AND :last"), window)
+            db.execute(text(
+                f"INSERT INTO {fts_table}(rowid, {columns}) "
+                f"SELECT id, {expressions} FROM {source} WHERE id BETWEEN :first AND :last"
+            ), window)
+            progress.last_id = ids[-1]
+            db.commit()
+            total += len(ids)
+
+        progress.completed_at = datetime.utcnow()
+        db.commit()
+        if total:
+            logger.info(f"🔎 Indexed {total} existing {source} for full-text search")
+
+
+def index_quiz(db: Session, quiz: Quiz):
+    """Insert or refresh a quiz row in the index (part of the caller's transaction)."""
+    if _backend != "fts5":
+        return
+
+    db.execute(text("DELETE FROM quiz_search WHERE rowid = :id"), {"id": quiz.id})
+    db.execute(
+        text("INSERT INTO quiz_search(rowid, title, description) VALUES (:id, :title, :description)"),
+        {"id": quiz.id, "title": quiz.title, "description": quiz.description or ""}
+    )
+
+
+def index_questions(db: Session, questions: Iterable[Question]):
+    """Insert or refresh question rows in the index. Questions must already be flushed."""
+    if _backend != "fts5":
+        return
+
+    params = [{"id": q.id, "question_text": q.question_text} for q in questions]
+    if not params:
+        return
+
+    db.execute(text("DELETE FROM question_search WHERE rowid = :id"), params)
+    db.execute(text("INSERT INTO question_search(rowid, question_text) VALUES (:id, :question_text)"), params)
+
+
+def remove_questions(db: Session, question_ids: Iterable[int]):
+    if _backend != "fts5":
+        return
+
+    params = [{"id": question_id} for question_id in question_ids]
+    if params:
+        db.execute(text("DELETE FROM question_search WHERE rowid = :id"), params)
+
+
+def remove_quiz(db: Session, quiz_id: int, question_ids: Iterable[int]):
+    if _backend != "fts5":
+        return
+
+    db.execute(text("DELETE FROM quiz_search WHERE rowid = :id"), {"id": quiz_id})
+    remove_questions(db, question_ids)
+
+
+def _tokenize(query: str) -> List[str]:
+    return _TOKEN_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+
+
+def _fts5_match_expression(tokens: List[str], prefix: bool = True) -> str:
+    # Quote every token so user input can never be parsed as FTS5 syntax.
+    terms = [f'"{token}"' for token in tokens]
+    if prefix and len(tokens[-1]) >= MIN_PREFIX_LENGTH:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _fts5_candidates(db: Session, fts_table: str, source: str, text_expression: str, tokens: List[str]):
+    """
+    (id, text) of the newest MAX_RANKED_CANDIDATES matches. FTS5 walks an exact term's doclist
+    lazily from the newest row, but merges a prefix term's in full first, so the prefix form is
+    only used when the exact terms alone do not fill the candidate list.
+    """
+    newest = f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH :match ORDER BY rowid DESC LIMIT :candidates"
+    match = _fts5_match_expression(tokens)
+    exact = _fts5_match_expression(tokens, prefix=False)
+    if match != exact:
+        found = db.execute(
+            text(f"SELECT count(*) FROM ({newest})"), {"match": exact, "candidates": MAX_RANKED_CANDIDATES}
+        ).scalar()
+        if found >= MAX_RANKED_CANDIDATES:
+            match = exact
+
+    return db.execute(
+        text(f"SELECT t.id, {text_expression} FROM ({newest}) AS s JOIN {source} AS t ON t.id = s.rowid"),
+        {"match": match, "candidates": MAX_RANKED_CANDIDATES}
+    ).all()
+
+
+def _rank_candidates(rows, tokens: List[str], limit: int, offset: int) -> List[tuple]:
+    """
+    BM25 over the candidate rows, best first, as (id, score). FTS5's own bm25() first counts
+    every document matching each term, which costs as much as the broad query being bounded,
+    so the IDF factor is left out and terms weigh the same. A word counts towards a term when
+    it starts with it; a row matched only through stemming still counts once.
+    """
+    if not rows:
+        return []
+    patterns = [re.compile(r"\b" + re.escape(token)) for token in tokens]
+    documents = [(row_id, (body or "").lower()) for row_id, body in rows]
+    lengths = [len(_TOKEN_RE.findall(body)) for _, body in documents]
+    average_length = sum(lengths) / len(lengths) or 1.0
+
+    scored = []
+    for (row_id, body), length in zip(documents, lengths):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+        score = 0.0
+        for pattern in patterns:
+            frequency = max(1, len(pattern.findall(body)))
+            score += frequency * (BM25_K1 + 1) / (frequency + norm)
+        scored.append((row_id, score))
+
+    scored.sort(key=lambda item: (-item[1], -item[0]))
+    return scored[offset:offset + limit]
+
+
+def _load_options(options):
+    if isinstance(options, str):
+        try:
+            return json.loads(options)
+        except ValueError:
+            return []
+    return options
+
+
+def search(db: Session, query: str, scope: str = "questions", limit: int = 20, offset: int = 0) -> dict:
+    """
+    Ranked full-text search over quizzes or questions, best match first. Only the newest
+    MAX_RANKED_CANDIDATES matches are ranked, so very broad queries cost the same as narrow ones.
+
+    Returns the page of results, how many matches were ranked ("candidates", None for the
+    unranked LIKE fallback, which pages through every match) and whether the cap was hit
+    ("truncated"): older matches then exist but are never returned, and pages past the
+    candidates are empty.
+    """
+    tokens = _tokenize(query)
+    if not tokens:
+        return {"results": [], "candidates": 0, "truncated": False}
+
+    if scope == "quizzes":
+        results, candidates = _search_quizzes(db, query, tokens, limit, offset)
+    else:
+        results, candidates = _search_questions(db, query, tokens, limit, offset)
+    return {
+        "results": results,
+        "candidates": candidates,
+        "truncated": candidates is not None and candidates >= MAX_RANKED_CANDIDATES
+    }
+
+
+def _count_tsvector_candidates(db: Session, table: str, query: str) -> int:
+    return db.execute(text(
+        f"SELECT count(*) FROM (SELECT 1 FROM {table} "
+        "WHERE search_vector @@ websearch_to_tsquery('english', :query) LIMIT :candidates) AS c"
+    ), {"query": query, "candidates": MAX_RANKED_CANDIDATES}).scalar()
+
+
+def _search_questions(
+    db: Session, query: str, tokens: List[str], limit: int, offset: int
+) -> Tuple[List[dict], Optional[int]]:
+    page = {"limit": limit, "offset": offset, "candidates": MAX_RANKED_CANDIDATES}
+
+    if _backend == "fts5":
+        candidates = _fts5_candidates(db, "question_search", "questions", "t.question_text", tokens)
+        ranked = _rank_candidates(candidates, tokens, limit, offset)
+        candidate_count = len(candidates)
+        scores = dict(ranked)
+        questions = {q.id: q for q in db.query(Question).filter(Question.id.in_(list(scores)))} if scores else {}
+        rows = [
+            {
+                "id": q.id,
+                "quiz_id": q.quiz_id,
+                "question_text": q.question_text,
+                "options": q.options,
+                "correct_answer": q.correct_answer,
+                "time_limit": q.time_limit,
+                "score": scores[q.id]
+            }
+            for q in (questions.get(question_id) for question_id, _ in ranked) if q is not None
+        ]
+    elif _backend == "tsvector":
+        rows = db.execute(text(
+            "SELECT q.id, q.quiz_id, q.question_text, q.options, q.correct_answer, q.time_limit, "
+            "ts_rank_cd(q.search_vector, query) AS score "
+            "FROM (SELECT * FROM questions WHERE search_vector @@ websearch_to_tsquery('english', :query) "
+            "      ORDER BY id DESC LIMIT :candidates) AS q, websearch_to_tsquery('english', :query) AS query "
+            "ORDER BY score DESC, q.id LIMIT :limit OFFSET :offset"
+        ), {"query": query, **page}).mappings().all()
+        candidate_count = _count_tsvector_candidates(db, "questions", query)
+    else:
+        candidate_count = None
+        questions = (
+            db.query(Question)
+            .filter(*[Question.question_text.ilike(f"%{token}%") for token in tokens])
+            .order_by(Question.id.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        rows = [
+            {
+                "id": q.id,
+                "quiz_id": q.quiz_id,
+                "question_text": q.question_text,
+                "options": q.options,
+                "correct_answer": q.correct_answer,
+                "time_limit": q.time_limit,
+                "score": 0.0
+            }
+            for q in questions
+        ]
+
+    return [
+        {
+            "id": row["id"],
+            "quiz_id": row["quiz_id"],
+            "question_text": row["question_text"],
+            "options": _load_options(row["options"]),
+            "correct_answer": row["correct_answer"],
+            "time_limit": row["time_limit"],
+            "score": round(float(row["score"] or 0), 4)
+        }
+        for row in rows
+    ], candidate_count
+
+
+def _search_quizzes(
+    db: Session, query: str, tokens: List[str], limit: int, offset: int
+) -> Tuple[List[dict], Optional[int]]:
+    page = {"limit": limit, "offset": offset, "candidates": MAX_RANKED_CANDIDATES}
+
+    if _backend == "fts5":
+        candidates = _fts5_candidates(
+            db, "quiz_search", "quizzes", "t.title || ' ' || COALESCE(t.description, '')", tokens
+        )
+        ranked = _rank_candidates(candidates, tokens, limit, offset)
+        candidate_count = len(candidates)
+        scores = dict(ranked)
+        quizzes = {z.id: z for z in db.query(Quiz).filter(Quiz.id.in_(list(scores)))} if scores else {}
+        rows = [
+            {
+                "id": z.id,
+                "title": z.title,
+                "description": z.description,
+                "created_by": z.created_by,
+                "created_at": z.created_at,
+                "score": scores[z.id]
+            }
+            for z in (quizzes.get(quiz_id) for quiz_id, _ in ranked) if z is not None
+        ]
+    elif _backend == "tsvector":
+        rows = db.execute(text(
+            "SELECT z.id, z.title, z.description, z.created_by, z.created_at, "
+            "ts_rank_cd(z.search_vector, query) AS score "
+            "FROM (SELECT * FROM quizzes WHERE search_vector @@ websearch_to_tsquery('english', :query) "
+            "      ORDER BY id DESC LIMIT :candidates) AS z, websearch_to_tsquery('english', :query) AS query "
+            "ORDER BY score DESC, z.id LIMIT :limit OFFSET :offset"
+        ), {"query": query, **page}).mappings().all()
+        candidate_count = _count_tsvector_candidates(db, "quizzes", query)
+    else:
+        candidate_count = None
+        quizzes = (
+            db.query(Quiz)
+            .filter(*[or_(Quiz.title.ilike(f"%{token}%"), Quiz.description.ilike(f"%{token}%")) for token in tokens])
+            .order_by(Quiz.created_at.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        rows = [
+            {
+                "id": q.id,
+                "title": q.title,
+                "description": q.description,
+                "created_by": q.created_by,
+                "created_at": q.created_at,
+                "score": 0.0
+            }
+            for q in quizzes
+        ]
+
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["description"],
+            "created_by": row["created_by"],
+            "created_at": row["created_at"],
+            "score": round(float(row["score"] or 0), 4)
+        }
+        for row in rows
+    ], candidate_count
@@ -0,0 +1,257 @@
+import hashlib
+import logging
+import random
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal, IndexBackfill, Question, QuestionLSHBucket
+
+logger = logging.getLogger("uvicorn")
+
+# MinHash signature split into LSH bands: two texts become candidates when any band
+# matches exactly. 12 bands x 4 rows finds ~93% of pairs at Jaccard 0.67 and ~9% at 0.3.
+NUM_PERMUTATIONS = 48
+LSH_BANDS = 12
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+MAX_CANDIDATES_PER_TEXT = 200
+BACKFILL_BATCH_SIZE = 2000
+BACKFILL_NAME = "question_lsh_buckets"
+_SQL_IN_CHUNK = 500
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: bucket hashes are persisted, so the permutations must never change between runs.
+_rng = random.Random(0x51A1)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be by can did do does for from how in is it its of on or that the this to
+was were what when where which who whom whose why will with
+""".split())
+
+
+def normalize_tokens(question_text: str) -> Set[str]:
+    """Lowercased content words with a crude plural strip, so light paraphrases share tokens."""
+    tokens = set()
+    for token in _TOKEN_RE.findall(question_text.lower()):
+        if len(token) < 2 or token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.add(token)
+    return tokens
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def minhash_signature(tokens: Set[str]) -> List[int]:
+    hashed = [_token_hash(token) for token in tokens]
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashed)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def lsh_buckets(tokens: Set[str]) -> List[int]:
+    """One signed 63-bit bucket id per band (band index is mixed in so bands never collide)."""
+    if not tokens:
+        return []
+
+    signature = minhash_signature(tokens)
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        payload = band.to_bytes(2, "little") + b"".join(row.to_bytes(4, "little") for row in rows)
+        digest = hashlib.blake2b(payload, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, "little") & ((1 << 63) - 1))
+    return buckets
+
+
+def find_batch_duplicates(texts: Sequence[str], threshold: Optional[float] = None) -> List[Tuple[int, int, float]]:
+    """
+    Scan a list in order and return (index, duplicate_of_index, similarity) for every text that
+    is a near duplicate of an earlier kept one. Uses the same LSH banding as the table index.
+    """
+    threshold = settings.DUPLICATE_SIMILARITY_THRESHOLD if threshold is None else threshold
+    duplicates: List[Tuple[int, int, float]] = []
+    kept_tokens: Dict[int, Set[str]] = {}
+    bucket_members: Dict[int, List[int]] = {}
+
+    for idx, text in enumerate(texts):
+        tokens = normalize_tokens(text)
+        buckets = lsh_buckets(tokens)
+
+        candidates = sorted({member for bucket in buckets for member in bucket_members.get(bucket, [])})
+        best = max(((jaccard(tokens, kept_tokens[member]), member) for member in candidates), default=None)
+        if best is not None and best[0] >= threshold:
+            duplicates.append((idx, best[1], round(best[0], 3)))
+            continue
+
+        kept_tokens[idx] = tokens
+        for bucket in buckets:
+            bucket_members.setdefault(bucket, []).append(idx)
+
+    return duplicates
+
+
+def dedupe_question_texts(texts: Sequence[str], threshold: Optional[float] = None) -> List[int]:
+    """Return the indexes of texts to keep, dropping near duplicates of earlier texts."""
+    dropped = {idx for idx, _, _ in find_batch_duplicates(texts, threshold)}
+    return [idx for idx in range(len(texts)) if idx not in dropped]
+
+
+def find_duplicates(
+    db: Session,
+    texts: Sequence[str],
+    exclude_quiz_id: Optional[int] = None,
+    threshold: Optional[float] = None
+) -> List[dict]:
+    """
+    Look up stored questions that are near duplicates of the given texts. Only rows that
+    share an LSH bucket are loaded, so the cost depends on matches, not on table size.
+    """
+    threshold = settings.DUPLICATE_SIMILARITY_THRESHOLD if threshold is None else threshold
+    token_sets = [normalize_tokens(text) for text in texts]
+
+    text_indexes_by_bucket: Dict[int, List[int]] = {}
+    for idx, tokens in enumerate(token_sets):
+        for bucket in lsh_buckets(tokens):
+            text_indexes_by_bucket.setdefault(bucket, []).append(idx)
+
+    if not text_indexes_by_bucket:
+        return []
+
+    # Band hits per stored question; more shared bands means a higher expected similarity
+    hits_by_text: Dict[int, Counter] = {}
+    all_buckets = list(text_indexes_by_bucket)
+    for start in range(0, len(all_buckets), _SQL_IN_CHUNK):
+        chunk = all_buckets[start:start + _SQL_IN_CHUNK]
+        rows = db.execute(
+            select(QuestionLSHBucket.bucket, QuestionLSHBucket.question_id)
+            .where(QuestionLSHBucket.bucket.in_(chunk))
+        ).all()
+        for bucket, question_id in rows:
+            for idx in text_indexes_by_bucket[bucket]:
+                hits_by_text.setdefault(idx, Counter())[question_id] += 1
+
+    # Only the best-matching candidates are compared, so a hot bucket cannot crowd them out
+    candidates_by_text: Dict[int, Set[int]] = {
+        idx: {question_id for question_id, _ in hits.most_common(MAX_CANDIDATES_PER_TEXT)}
+        for idx, hits in hits_by_text.items()
+    }
+
+    candidate_ids = list(set().union(*candidates_by_text.values())) if candidates_by_text else []
+    candidate_rows = {}
+    for start in range(0, len(candidate_ids), _SQL_IN_CHUNK):
+        chunk = candidate_ids[start:start + _SQL_IN_CHUNK]
+        for row in db.execute(
+            select(Question.id, Question.quiz_id, Question.question_text).where(Question.id.in_(chunk))
+        ).all():
+            candidate_rows[row.id] = row
+
+    matches = []
+    for idx, candidates in sorted(candidates_by_text.items()):
+        for question_id in candidates:
+            row = candidate_rows.get(question_id)
+            if row is None or (exclude_quiz_id is not None and row.quiz_id == exclude_quiz_id):
+                continue
+            similarity = jaccard(token_sets[idx], normalize_tokens(row.question_text))
+            if similarity >= threshold:
+                matches.append({
+                    "question_index": idx,
+                    "question_id": row.id,
+                    "quiz_id": row.quiz_id,
+                    "question_text": row.question_text,
+                    "similarity": round(similarity, 3)
+                })
+
+    matches.sort(key=lambda m: (m["question_index"], -m["similarity"]))
+    return matches
+
+
+def register_questions(db: Session, questions: Iterable[Question]):
+    """Insert or refresh LSH buckets for flushed questions (part of the caller's transaction)."""
+    questions = list(questions)
+    if not questions:
+        return
+
+    forget_questions(db, [q.id for q in questions])
+    rows = [
+        {"bucket": bucket, "question_id": q.id}
+        for q in questions
+        for bucket in lsh_buckets(normalize_tokens(q.question_text))
+    ]
+    if rows:
+        db.execute(QuestionLSHBucket.__table__.insert(), rows)
+
+
+def forget_questions(db: Session, question_ids: Iterable[int]):
+    question_ids = list(question_ids)
+    for start in range(0, len(question_ids), _SQL_IN_CHUNK):
+        db.execute(
+            delete(QuestionLSHBucket).where(QuestionLSHBucket.question_id.in_(question_ids[start:start + _SQL_IN_CHUNK]))
+        )
+
+
+def ensure_similarity_index():
+    """
+    Backfill buckets for questions created before the index existed. Progress is committed with
+    each batch, so a backfill cut short by a crash or deploy resumes on the next start.
+    """
+    with SessionLocal() as db:
+        progress = db.get(IndexBackfill, BACKFILL_NAME)
+        if progress is None:
+            progress = IndexBackfill(name=BACKFILL_NAME, last_id=0)
+            db.add(progress)
+            db.commit()
+        if progress.completed_at is not None:
+            return
+
+        total = 0
+        while True:
+            batch = db.execute(
+                select(Question.id, Question.question_text)
+                .where(Question.id > progress.last_id)
+                .order_by(Question.id)
+                .limit(BACKFILL_BATCH_SIZE)
+            ).all()
+            if not batch:
+                break
+
+            # Questions saved while the backfill runs are already indexed; replace, don't duplicate
+            forget_questions(db, [row.id for row in batch])
+            rows = [
+                {"bucket": bucket, "question_id": row.id}
+                for row in batch
+                for bucket in lsh_buckets(normalize_tokens(row.question_text))
+            ]
+            if rows:
+                db.execute(QuestionLSHBucket.__table__.insert(), rows)
+            progress.last_id = batch[-1].id
+            db.commit()
+
+            total += len(batch)
+
+        progress.completed_at = datetime.utcnow()
+        db.commit()
+        if total:
+            logger.info(f"🔎 Indexed {total} existing questions for duplicate detection")
@@ -0,0 +1,86 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from database import SessionLocal, GameRoomSnapshot
+from services.game_state import GameRoom
+from services.metrics_service import Counter, Histogram, LATENCY_BUCKETS, register_metric
+
+logger = logging.getLogger("uvicorn")
+
+MAX_SNAPSHOT_PIN_LENGTH = 64
+
+snapshot_duration = register_metric(
+    Histogram("quiz_room_snapshot_seconds", "Time to write one batch of room snapshots", (), LATENCY_BUCKETS)
+)
+snapshot_rooms_written = register_metric(
+    Counter("quiz_room_snapshots_written_total", "Room snapshots upserted or deleted")
+)
+
+# PINs whose room changed (or was evicted) since the last snapshot
+_dirty: Set[str] = set()
+
+
+def mark_room_dirty(pin: str):
+    _dirty.add(pin)
+
+
+def _write_snapshots(states: Dict[str, Optional[str]]):
+    now = datetime.utcnow()
+    with SessionLocal() as db:
+        gone = [pin for pin, state in states.items() if state is None]
+        if gone:
+            db.query(GameRoomSnapshot).filter(GameRoomSnapshot.pin.in_(gone)).delete(synchronize_session=False)
+        for pin, state in states.items():
+            if state is not None:
+                db.merge(GameRoomSnapshot(pin=pin, state=state, updated_at=now))
+        db.commit()
+
+
+async def snapshot_rooms(rooms: Dict[str, GameRoom]):
+    """
+    Persist only rooms that changed since the last call. States are encoded on the loop (each
+    dirty room once, however often it changed) and written in one transaction off the loop.
+    """
+    global _dirty
+    if not _dirty:
+        return
+    pins, _dirty = _dirty, set()
+    states = {
+        pin: json.dumps(rooms[pin].to_snapshot(), separators=(",", ":")) if pin in rooms else None
+        for pin in pins
+        if isinstance(pin, str) and len(pin) <= MAX_SNAPSHOT_PIN_LENGTH
+    }
+    started = time.perf_counter()
+    try:
+        await run_in_threadpool(_write_snapshots, states)
+    except Exception as e:
+        logger.error(f"❌ Could not write {len(states)} room snapshots: {e}")
+        _dirty |= pins
+        return
+    snapshot_duration.observe(time.perf_counter() - started)
+    snapshot_rooms_written.add(len(states))
+
+
+def _load_snapshots() -> Dict[str, str]:
+    # Anything older than the hostless TTL would already have been evicted
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.ROOM_HOSTLESS_TTL_SECONDS)
+    with SessionLocal() as db:
+        db.query(GameRoomSnapshot).filter(GameRoomSnapshot.updated_at < cutoff).delete(synchronize_session=False)
+        db.commit()
+        return {row.pin: row.state for row in db.query(GameRoomSnapshot).all()}
+
+
+async def restore_rooms() -> Dict[str, GameRoom]:
+    rooms: Dict[str, GameRoom] = {}
+    for pin, state in (await run_in_threadpool(_load_snapshots)).items():
+        try:
+            rooms[pin] = GameRoom.from_snapshot(json.loads(state))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"⚠️ Skipping unreadable snapshot for game {pin}: {e}")
+    return rooms
@@ -1,53 +1,345 @@
 import socketio
-import asyncio
-from typing import Dict, List
-from database import get_db, GameSession, Player, Question, Answer
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from database import get_db, SessionLocal, GameSession, Player, Question, Answer
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from config import settings
 from datetime import datetime
-
-# Create Socket.IO server
-sio = socketio.AsyncServer(
+from services.metrics_service import (
+    Counter,
+    instrument_socket_event,
+    register_gauge_callback,
+    register_metric,
+    socket_emit_recipients
+)
+from services.game_state import FragmentJSON, GameRoom, JSONFragment, PlayerState
+from services.timer_service import timers
+from services.snapshot_service import mark_room_dirty, restore_rooms, snapshot_rooms
+from services.journal_service import append_event, compact_journal, replay_journals
+from services.prefetch_service import live_room, record_visible, reveal_payload, stage_question, staged_room
+
+
+class InstrumentedAsyncServer(socketio.AsyncServer):
+    """AsyncServer that records how many sockets each emit is addressed to."""
+
+    def _room_members(self, room, namespace: str) -> dict:
+        return self.manager.rooms.get(namespace, {}).get(room, {})
+
+    async def emit(self, event, data=None, to=None, room=None, skip_sid=None, namespace=None, **kwargs):
+        target = to if to is not None else room
+        members = self._room_members(target, namespace or '/')
+        recipients = len(members)
+        if skip_sid is not None:
+            skipped = skip_sid if isinstance(skip_sid, list) else [skip_sid]
+            recipients -= sum(1 for s in skipped if s in members)
+        socket_emit_recipients.observe(recipients, event)
+        return await super().emit(event, data, to=to, room=room, skip_sid=skip_sid, namespace=namespace, **kwargs)
+
+    def connected_count(self, namespace: str = '/') -> int:
+        # Every connected sid is a member of the None room
+        return len(self._room_members(None, namespace))
+
+    def room_count(self, namespace: str = '/') -> int:
+        # Named rooms only: skip the None room and each socket's personal sid room
+        rooms = self.manager.rooms.get(namespace, {})
+        connected = rooms.get(None, {})
+        return sum(1 for room in rooms if room is not None and room not in connected)
+
+
+# Create Socket.IO server; per-packet logging is synchronous and expensive, so it is opt-in.
+# FragmentJSON lets broadcasts embed payloads that were serialized once (see game_state).
+sio = InstrumentedAsyncServer(
     async_mode='asgi',
     cors_allowed_origins="*",
-    logger=True,
-    engineio_logger=True
+    json=FragmentJSON,
+    logger=settings.SOCKETIO_LOGGING,
+    engineio_logger=settings.SOCKETIO_LOGGING
 )
 
 
 # In-memory store for active game rooms
-active_games: Dict[str, dict] = {}
-pending_player_disconnects: Dict[str, asyncio.Task] = {}
+active_games: Dict[str, GameRoom] = {}
 PLAYER_DISCONNECT_GRACE_SECONDS = 8
+# Timer kind for a disconnected player's grace period, keyed by sid with the game PIN as payload
+PLAYER_GRACE_TIMER = "player_grace"
+# Timer kind for evicting a room from active_games, keyed by PIN with the expiry reason as payload
+ROOM_EXPIRY_TIMER = "room_expiry"
+# Timer kind for the periodic snapshot of changed rooms
+ROOM_SNAPSHOT_TIMER = "room_snapshot"
+# Timer kind for pushing the next question once the current one's answer window closes,
+# keyed by PIN with the index to stage as payload
+QUESTION_STAGE_TIMER = "question_stage"
+ROOM_TTL_SECONDS = {
+    'finished': settings.ROOM_FINISHED_TTL_SECONDS,
+    'hostless': settings.ROOM_HOSTLESS_TTL_SECONDS,
+    'abandoned': settings.ROOM_ABANDONED_TTL_SECONDS,
+}
+
+logger = logging.getLogger("uvicorn")
+
+register_gauge_callback("quiz_socket_connected", "Connected Socket.IO clients", sio.connected_count)
+register_gauge_callback("quiz_socket_rooms", "Socket.IO rooms with at least one member", sio.room_count)
+register_gauge_callback("quiz_active_games", "Games held in server memory", lambda: len(active_games))
+register_gauge_callback(
+    "quiz_active_players", "Players across all in-memory games",
+    lambda: sum(len(game.players) for game in list(active_games.values()))
+)
+rooms_evicted = register_metric(
+    Counter("quiz_rooms_evicted_total", "Games evicted from server memory", ("reason",))
+)
+room_bytes_reclaimed = register_metric(
+    Counter("quiz_room_reclaimed_bytes_total", "Estimated bytes freed by evicting games", ("reason",))
+)
+
+
+def _room_expiry_reason(game: GameRoom) -> Optional[str]:
+    if game.status == 'finished':
+        return 'finished'
+    if game.host_sid is None:
+        return 'abandoned' if not game.players else 'hostless'
+    return None
+
+
+def _refresh_room_expiry(pin: str, game: GameRoom):
+    """
+    Start, switch or cancel the room's eviction countdown after a state change. The clock
+    only restarts when the reason changes, so players trickling into a hostless lobby do not
+    keep it alive forever.
+    """
+    reason = _room_expiry_reason(game)
+    if reason == game.expiry_reason:
+        return
+    game.expiry_reason = reason
+    if reason is None:
+        timers.cancel(ROOM_EXPIRY_TIMER, pin)
+    else:
+        timers.schedule(ROOM_EXPIRY_TIMER, pin, ROOM_TTL_SECONDS[reason], reason)
+
+
+def _room_changed(pin: str, game: GameRoom):
+    mark_room_dirty(pin)
+    _refresh_room_expiry(pin, game)
+
+
+def _journal(pin: str, game: GameRoom, kind: str, data: Optional[dict] = None):
+    seq = append_event(pin, game.game_session_id, kind, data)
+    if seq is not None:
+        game.journal_seq = seq
 
 
-async def _remove_player_after_grace(pin: str, sid: str):
-    """Remove player only if they did not reconnect quickly."""
+def _find_game_session_id(pin: str) -> Optional[int]:
+    with SessionLocal() as db:
+        return db.query(GameSession.id).filter(GameSession.pin == pin).scalar()
+
+
+async def _create_room(pin: str) -> GameRoom:
+    """A room for a PIN that has none, tied to the game session that currently owns the PIN."""
     try:
-        await asyncio.sleep(PLAYER_DISCONNECT_GRACE_SECONDS)
-        game_data = active_games.get(pin)
-        if not game_data:
-            return
-        if sid not in game_data.get('players', {}):
-            return
-
-        player_name = game_data['players'][sid]['name']
-        del game_data['players'][sid]
-        await sio.emit('player_left', {'player_name': player_name}, room=pin)
-
-        players_list = [
-            {'name': p['name'], 'player_id': p['player_id']}
-            for p in game_data['players'].values()
+        game_session_id = await run_in_threadpool(_find_game_session_id, pin)
+    except Exception as e:
+        logger.error(f"❌ Could not look up the game session for {pin}: {e}")
+        game_session_id = None
+    # Another handler may have created the room while the lookup ran
+    game = active_games.get(pin)
+    if game is None:
+        game = active_games[pin] = GameRoom(game_session_id=game_session_id)
+    return game
+
+
+def _load_player_questions(pin: str) -> List[JSONFragment]:
+    """The game's questions as players see them, in play order; correct answers stay on the server."""
+    with SessionLocal() as db:
+        game_session = db.query(GameSession).filter(GameSession.pin == pin).first()
+        if game_session is None:
+            return []
+        questions = db.query(Question).filter(Question.quiz_id == game_session.quiz_id).order_by(Question.order).all()
+        return [
+            JSONFragment.encode({
+                'index': index,
+                'question_id': question.id,
+                'question_text': question.question_text,
+                'options': question.options,
+                'time_limit': question.time_limit or 30
+            })
+            for index, question in enumerate(questions)
         ]
-        await sio.emit('lobby_updated', {
-            'players': players_list,
-            'count': len(players_list)
-        }, room=pin)
-    finally:
-        pending_player_disconnects.pop(sid, None)
+
+
+async def _ensure_questions(pin: str, game: GameRoom) -> List[JSONFragment]:
+    # Rooms restored after a restart reload their questions on first use
+    if not game.questions:
+        try:
+            game.questions = await run_in_threadpool(_load_player_questions, pin)
+        except Exception as e:
+            logger.error(f"❌ Could not load questions for game {pin}: {e}")
+    return game.questions
+
+
+def _is_prefetching(sid: str, pin: str) -> bool:
+    return sid in sio._room_members(staged_room(pin), '/')
+
+
+async def _enter_question_room(sid: str, pin: str, game: GameRoom, prefetch):
+    """
+    With prefetch on, put a player in the game's staged or live sub-room depending on what
+    the client asked for, and hand a prefetching latecomer the question already staged.
+    """
+    if not settings.QUESTION_PREFETCH_ENABLED:
+        return
+    if prefetch is True:
+        await sio.leave_room(sid, live_room(pin))
+        await sio.enter_room(sid, staged_room(pin))
+        if game.staged is not None:
+            await sio.emit('question_staged', game.staged.payload, room=sid)
+    else:
+        await sio.leave_room(sid, staged_room(pin))
+        await sio.enter_room(sid, live_room(pin))
+
+
+async def _stage_next_question(pin: str, game: GameRoom):
+    """Push the question after the current one, encrypted, to prefetching players."""
+    timers.cancel(QUESTION_STAGE_TIMER, pin)
+    index = game.current_question + 1
+    if not settings.QUESTION_PREFETCH_ENABLED or game.status != 'active' or index >= len(game.questions):
+        return
+    if game.staged is not None and game.staged.index == index:
+        return
+    game.staged = stage_question(index, game.questions[index])
+    await sio.emit('question_staged', game.staged.payload, room=staged_room(pin))
+
+
+def _close_evicted_sessions(evicted: Dict[str, GameRoom]):
+    """
+    Persist what only lived in memory before the rooms are dropped: the question each game
+    reached, and, for games evicted mid-play, their closure, since they can no longer continue.
+    Lobbies that never started are not passed in: host_join/join_lobby rebuild them for free.
+    """
+    # By session id, not PIN: a PIN freed by a deleted game may already belong to a newer one
+    by_session = {game.game_session_id: game for game in evicted.values() if game.game_session_id is not None}
+    with SessionLocal() as db:
+        sessions = db.query(GameSession).filter(GameSession.id.in_(list(by_session))).all()
+        for game_session in sessions:
+            game = by_session[game_session.id]
+            game_session.current_question_index = game.current_question
+            if game.status == 'active' and game_session.status != 'finished':
+                game_session.status = 'finished'
+                game_session.ended_at = datetime.utcnow()
+            game_session.revision = (game_session.revision or 1) + 1
+        db.commit()
+
+
+async def _evict_rooms(expired):
+    evicted: Dict[str, GameRoom] = {}
+    for pin, reason in expired:
+        game = active_games.get(pin)
+        # A room can change state between the tick and now; only evict if the reason still holds
+        if game is not None and _room_expiry_reason(game) == reason:
+            evicted[pin] = game
+    if not evicted:
+        return
+
+    try:
+        played = {pin: game for pin, game in evicted.items() if game.status != 'waiting'}
+        if played:
+            await run_in_threadpool(_close_evicted_sessions, played)
+    except Exception as e:
+        # Keep the rooms and retry later rather than lose state that never reached the database
+        logger.error(f"❌ Could not persist {len(evicted)} rooms before eviction: {e}")
+        for pin, game in evicted.items():
+            timers.schedule(ROOM_EXPIRY_TIMER, pin, ROOM_TTL_SECONDS[game.expiry_reason], game.expiry_reason)
+        return
+
+    for pin, game in evicted.items():
+        if active_games.get(pin) is not game:
+            continue
+        reclaimed = game.estimated_size()
+        del active_games[pin]
+        mark_room_dirty(pin)
+        # The journal outlives the room as the game's event record; it goes when the game is deleted
+        compact_journal(pin, game.game_session_id)
+        timers.cancel(QUESTION_STAGE_TIMER, pin)
+        for room in (pin, staged_room(pin), live_room(pin)):
+            await sio.close_room(room)
+        rooms_evicted.add(1, game.expiry_reason)
+        room_bytes_reclaimed.add(reclaimed, game.expiry_reason)
+    logger.info(f"🧹 Evicted {len(evicted)} idle games from memory")
+
+
+async def _remove_players_after_grace(expired):
+    """Remove players who did not reconnect in time; one lobby_updated per room for the whole batch."""
+    left_by_pin: Dict[str, List[str]] = defaultdict(list)
+    for sid, pin in expired:
+        game_data = active_games.get(pin)
+        player = game_data.remove_player(sid) if game_data else None
+        if player is not None:
+            left_by_pin[pin].append(player.name)
+            _journal(pin, game_data, 'leave', {'name': player.name, 'player_id': player.player_id})
+
+    for pin, player_names in left_by_pin.items():
+        for player_name in player_names:
+            await sio.emit('player_left', {'player_name': player_name}, room=pin)
+        game_data = active_games.get(pin)
+        if game_data is not None:
+            await sio.emit('lobby_updated', game_data.lobby_payload(), room=pin)
+            _room_changed(pin, game_data)
+
+
+async def _stage_questions(expired):
+    for pin, index in expired:
+        game = active_games.get(pin)
+        # Skip games that moved on (or ended) before the answer window closed
+        if game is not None and game.current_question + 1 == index:
+            await _stage_next_question(pin, game)
+
+
+async def _snapshot_game_rooms(_):
+    await snapshot_rooms(active_games)
+    timers.schedule(ROOM_SNAPSHOT_TIMER, None, settings.ROOM_SNAPSHOT_INTERVAL_SECONDS)
+
+
+timers.register(PLAYER_GRACE_TIMER, _remove_players_after_grace)
+timers.register(ROOM_EXPIRY_TIMER, _evict_rooms)
+timers.register(ROOM_SNAPSHOT_TIMER, _snapshot_game_rooms)
+timers.register(QUESTION_STAGE_TIMER, _stage_questions)
+
+
+async def restore_game_rooms():
+    """
+    Reload rooms snapshotted before a restart and start the periodic snapshots. Restored players
+    keep their seat (and score) for ROOM_RESTORE_GRACE_SECONDS while their clients reconnect.
+    """
+    try:
+        restored = await restore_rooms()
+        if settings.JOURNAL_ENABLED:
+            # Events after each room's snapshot, and rooms that crashed before their first one
+            applied = await run_in_threadpool(replay_journals, restored)
+            if applied:
+                logger.info(f"📒 Replayed {applied} journaled events")
+    except Exception as e:
+        logger.error(f"❌ Could not restore game rooms: {e}")
+        restored = {}
+    for pin, game in restored.items():
+        if pin in active_games:
+            continue
+        active_games[pin] = game
+        for sid in game.players:
+            timers.schedule(PLAYER_GRACE_TIMER, sid, settings.ROOM_RESTORE_GRACE_SECONDS, pin)
+        _refresh_room_expiry(pin, game)
+    if restored:
+        logger.info(f"♻️ Restored {len(restored)} games from snapshots")
+    timers.schedule(ROOM_SNAPSHOT_TIMER, None, settings.ROOM_SNAPSHOT_INTERVAL_SECONDS)
+
+
+async def snapshot_game_rooms():
+    """Write any changes not yet snapshotted; called on shutdown."""
+    await snapshot_rooms(active_games)
 
 
 @sio.event
+@instrument_socket_event
 async def connect(sid, environ):
     """Handle client connection"""
     print(f"Client connected: {sid}")
@@ -55,24 +347,24 @@ async def connect(sid, environ):
 
 
 @sio.event
+@instrument_socket_event
 async def disconnect(sid):
     """Handle client disconnection"""
     print(f"Client disconnected: {sid}")
     
     # Remove from active games
-    for pin, game_data in active_games.items():
-        if sid == game_data.get('host_sid'):
-            game_data['host_sid'] = None
+    for pin, game_data in list(active_games.items()):
+        if sid == game_data.host_sid:
+            game_data.host_sid = None
             await sio.emit('host_disconnected', {'message': 'Host disconnected'}, room=pin)
+            _room_changed(pin, game_data)
 
-        if sid in game_data.get('players', {}):
-            previous_task = pending_player_disconnects.pop(sid, None)
-            if previous_task:
-                previous_task.cancel()
-            pending_player_disconnects[sid] = asyncio.create_task(_remove_player_after_grace(pin, sid))
+        if sid in game_data.players:
+            timers.schedule(PLAYER_GRACE_TIMER, sid, PLAYER_DISCONNECT_GRACE_SECONDS, pin)
 
 
 @sio.event
+@instrument_socket_event
 async def join_lobby(sid, data):
     """Player joins a game lobby"""
     pin = data.get('pin')
@@ -83,70 +375,82 @@ async def join_lobby(sid, data):
         await sio.emit('error', {'message': 'Invalid data'}, room=sid)
         return
 
-    reconnect_task = pending_player_disconnects.pop(sid, None)
-    if reconnect_task:
-        reconnect_task.cancel()
+    timers.cancel(PLAYER_GRACE_TIMER, sid)
     
     # Join the room
     await sio.enter_room(sid, pin)
     
     # Initialize game data if not exists
-    if pin not in active_games:
-        active_games[pin] = {
-            'players': {},
-            'host_sid': None,
-            'status': 'waiting',
-            'current_question': 0,
-            'current_question_data': None
-        }
+    game = active_games.get(pin)
+    if game is None:
+        game = await _create_room(pin)
 
     # If this player reconnects, remove stale socket entries for same player_id/name.
     stale_sids = [
         existing_sid
-        for existing_sid, existing_player in active_games[pin]['players'].items()
+        for existing_sid, existing_player in game.players.items()
         if existing_sid != sid and (
-            (player_id is not None and existing_player.get('player_id') == player_id) or
-            existing_player.get('name') == player_name
+            (player_id is not None and existing_player.player_id == player_id) or
+            existing_player.name == player_name
         )
     ]
     for stale_sid in stale_sids:
-        stale_task = pending_player_disconnects.pop(stale_sid, None)
-        if stale_task:
-            stale_task.cancel()
-        del active_games[pin]['players'][stale_sid]
+        timers.cancel(PLAYER_GRACE_TIMER, stale_sid)
+        game.remove_player(stale_sid)
     
     # Add player to game
-    active_games[pin]['players'][sid] = {
-        'name': player_name,
-        'player_id': player_id,
-        'score': 0
-    }
+    game.add_player(sid, PlayerState(player_name, player_id))
+    await _enter_question_room(sid, pin, game, data.get('prefetch'))
+    _journal(pin, game, 'join', {'name': player_name, 'player_id': player_id})
+    _room_changed(pin, game)
     
     # Notify all players in the lobby
-    players_list = [
-        {'name': p['name'], 'player_id': p['player_id']}
-        for p in active_games[pin]['players'].values()
-    ]
-    
-    await sio.emit('lobby_updated', {
-        'players': players_list,
-        'count': len(players_list)
-    }, room=pin)
+    await sio.emit('lobby_updated', game.lobby_payload(), room=pin)
 
     # If player joins/reconnects while game is active, sync active state immediately.
-    if active_games[pin]['status'] == 'active':
+    if game.status == 'active':
         await sio.emit('game_started', {
             'message': 'Game is starting!',
-            'current_question': active_games[pin]['current_question']
+            'current_question': game.current_question
         }, room=sid)
 
-        if active_games[pin]['current_question_data'] is not None:
-            await sio.emit('question_update', active_games[pin]['current_question_data'], room=sid)
+        if game.current_question_data is not None:
+            await sio.emit('question_update', game.current_question_data, room=sid)
     
     print(f"Player {player_name} joined lobby {pin}")
 
 
 @sio.event
+@instrument_socket_event
+async def resume(sid, data):
+    """
+    Reconnecting player takes back their seat under the new sid. Only this socket gets the room
+    state; membership is unchanged, so unlike join_lobby nothing is broadcast to the room.
+    """
+    pin = data.get('pin')
+    game = active_games.get(pin) if pin else None
+    old_sid = game.find_player(data.get('name'), data.get('player_id')) if game is not None else None
+
+    if old_sid is None:
+        await sio.emit('resume_failed', {'message': 'Player not found in this game'}, room=sid)
+        return
+
+    timers.cancel(PLAYER_GRACE_TIMER, old_sid)
+    player = game.rebind_player(old_sid, sid) if old_sid != sid else game.players[sid]
+    await sio.enter_room(sid, pin)
+    await _enter_question_room(sid, pin, game, data.get('prefetch'))
+
+    await sio.emit('resume_state', {
+        'status': game.status,
+        'current_question': game.current_question,
+        'question': game.current_question_data,
+        'score': player.score,
+        'count': len(game.players)
+    }, room=sid)
+
+
+@sio.event
+@instrument_socket_event
 async def host_join(sid, data):
     """Host joins their game room"""
     pin = data.get('pin')
@@ -158,21 +462,17 @@ async def host_join(sid, data):
     await sio.enter_room(sid, pin)
     
     # Initialize or update game data
-    if pin not in active_games:
-        active_games[pin] = {
-            'players': {},
-            'host_sid': sid,
-            'status': 'waiting',
-            'current_question': 0,
-            'current_question_data': None
-        }
-    else:
-        active_games[pin]['host_sid'] = sid
+    game = active_games.get(pin)
+    if game is None:
+        game = await _create_room(pin)
+    game.host_sid = sid
+    _room_changed(pin, game)
     
     print(f"Host joined game {pin}")
 
 
 @sio.event
+@instrument_socket_event
 async def start_game(sid, data):
     """Host starts the game"""
     pin = data.get('pin')
@@ -181,13 +481,19 @@ async def start_game(sid, data):
         await sio.emit('error', {'message': 'Game not found'}, room=sid)
         return
     
-    if active_games[pin]['host_sid'] != sid:
+    if active_games[pin].host_sid != sid:
         await sio.emit('error', {'message': 'Only host can start the game'}, room=sid)
         return
     
-    active_games[pin]['status'] = 'active'
-    active_games[pin]['current_question'] = 0
-    active_games[pin]['current_question_data'] = None
+    # Load the question set now so the first next_question does not wait on the database
+    await _ensure_questions(pin, active_games[pin])
+
+    active_games[pin].status = 'active'
+    active_games[pin].current_question = 0
+    active_games[pin].current_question_data = None
+    active_games[pin].staged = None
+    _journal(pin, active_games[pin], 'start')
+    mark_room_dirty(pin)
     
     # Notify all players
     await sio.emit('game_started', {
@@ -199,38 +505,51 @@ async def start_game(sid, data):
 
 
 @sio.event
+@instrument_socket_event
 async def next_question(sid, data):
-    """Host moves to next question"""
+    """Host moves to next question; only the index comes from the client, the question from the server"""
     pin = data.get('pin')
     question_index = data.get('question_index')
-    question_data = data.get('question_data')
     
     if not pin or pin not in active_games:
         await sio.emit('error', {'message': 'Game not found'}, room=sid)
         return
     
-    if active_games[pin]['host_sid'] != sid:
+    if active_games[pin].host_sid != sid:
         await sio.emit('error', {'message': 'Only host can control questions'}, room=sid)
         return
-    
-    active_games[pin]['current_question'] = question_index
-    
-    # Send question to all players (without correct answer)
-    player_question = {
-        'index': question_index,
-        'question_id': question_data.get('id') or question_data.get('question_id'),
-        'question_text': question_data['question_text'],
-        'options': question_data['options'],
-        'time_limit': question_data['time_limit']
-    }
 
-    active_games[pin]['current_question_data'] = player_question
+    questions = await _ensure_questions(pin, active_games[pin])
+    if not isinstance(question_index, int) or not 0 <= question_index < len(questions):
+        await sio.emit('error', {'message': 'Question not found'}, room=sid)
+        return
     
-    await sio.emit('question_update', player_question, room=pin)
+    active_games[pin].current_question = question_index
+
+    # Encoded when the game started (without the correct answer); every broadcast and
+    # mid-game (re)join reuses the same JSON
+    active_games[pin].current_question_data = questions[question_index]
+    active_games[pin].question_opened_at = opened_at = time.time()
+    _journal(pin, active_games[pin], 'question', questions[question_index])
+    mark_room_dirty(pin)
+
+    staged, active_games[pin].staged = active_games[pin].staged, None
+    if staged is not None and staged.index == question_index:
+        # Prefetching players already hold the ciphertext: they only need the key
+        await sio.emit('question_update', active_games[pin].current_question_data, room=live_room(pin))
+        await sio.emit('question_reveal', reveal_payload(staged, opened_at), room=staged_room(pin))
+    else:
+        await sio.emit('question_update', active_games[pin].current_question_data, room=pin)
+
+    if settings.QUESTION_PREFETCH_ENABLED and question_index + 1 < len(questions):
+        # Stage the next question while this one's results are on screen
+        time_limit = questions[question_index].decode().get('time_limit') or 30
+        timers.schedule(QUESTION_STAGE_TIMER, pin, time_limit, question_index + 1)
     print(f"Game {pin} moved to question {question_index}")
 
 
 @sio.event
+@instrument_socket_event
 async def submit_answer(sid, data):
     """Player submits an answer"""
     pin = data.get('pin')
@@ -250,14 +569,25 @@ async def submit_answer(sid, data):
     }, room=sid)
     
     # Optionally notify host
-    if pin in active_games and active_games[pin]['host_sid'] and sid in active_games[pin]['players']:
+    game = active_games.get(pin)
+    player = game.players.get(sid) if game is not None else None
+    if game is not None:
+        _journal(pin, game, 'answer', {
+            'name': player.name if player is not None else None,
+            'player_id': player_id,
+            'question_id': question_id,
+            'answer': answer,
+            'time_taken': time_taken
+        })
+    if game is not None and game.host_sid and player is not None:
         await sio.emit('player_answered', {
-            'player_name': active_games[pin]['players'][sid]['name'],
+            'player_name': player.name,
             'time_taken': time_taken
-        }, room=active_games[pin]['host_sid'])
+        }, room=game.host_sid)
 
 
 @sio.event
+@instrument_socket_event
 async def show_results(sid, data):
     """Host shows question results"""
     pin = data.get('pin')
@@ -266,13 +596,16 @@ async def show_results(sid, data):
     if not pin or pin not in active_games:
         return
     
-    if active_games[pin]['host_sid'] != sid:
+    if active_games[pin].host_sid != sid:
         return
     
+    _journal(pin, active_games[pin], 'reveal', {'results': results})
     await sio.emit('results_update', results, room=pin)
+    await _stage_next_question(pin, active_games[pin])
 
 
 @sio.event
+@instrument_socket_event
 async def end_game(sid, data):
     """Host ends the game"""
     pin = data.get('pin')
@@ -281,10 +614,15 @@ async def end_game(sid, data):
     if not pin or pin not in active_games:
         return
     
-    if active_games[pin]['host_sid'] != sid:
+    if active_games[pin].host_sid != sid:
         return
     
-    active_games[pin]['status'] = 'finished'
+    active_games[pin].status = 'finished'
+    active_games[pin].staged = None
+    timers.cancel(QUESTION_STAGE_TIMER, pin)
+    _journal(pin, active_games[pin], 'end', {'results': final_results})
+    compact_journal(pin, active_games[pin].game_session_id)
+    _room_changed(pin, active_games[pin])
     
     await sio.emit('game_ended', {
         'message': 'Game has ended!',
@@ -295,6 +633,21 @@ async def end_game(sid, data):
 
 
 @sio.event
+@instrument_socket_event
+async def question_visible(sid, data):
+    """Player reports the current question on screen; feeds the time-to-visible histograms"""
+    pin = data.get('pin')
+    game = active_games.get(pin) if pin else None
+
+    if game is None or sid not in game.players or data.get('index') != game.current_question:
+        return
+
+    mode = 'prefetch' if _is_prefetching(sid, pin) else 'live'
+    record_visible(mode, game.question_opened_at, data.get('render_ms'))
+
+
+@sio.event
+@instrument_socket_event
 async def request_leaderboard(sid, data):
     """Send current leaderboard to client"""
     pin = data.get('pin')
@@ -306,11 +659,11 @@ async def request_leaderboard(sid, data):
     # This is a simplified version
     players_scores = [
         {
-            'name': p['name'],
-            'score': p['score'],
-            'player_id': p['player_id']
+            'name': p.name,
+            'score': p.score,
+            'player_id': p.player_id
         }
-        for p in active_games[pin]['players'].values()
+        for p in active_games[pin].players.values()
     ]
     
     # Sort by score
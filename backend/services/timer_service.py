@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import math
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from config import settings
+from services.metrics_service import register_gauge_callback
+
+logger = logging.getLogger("uvicorn")
+
+# Handler for one kind of timer: receives every (key, payload) that expired on the same tick
+ExpiryHandler = Callable[[List[Tuple[Hashable, object]]], Awaitable[None]]
+
+
+class _Timer:
+    __slots__ = ("kind", "key", "payload", "slot", "rounds")
+
+    def __init__(self, kind: str, key: Hashable, payload, slot: int, rounds: int):
+        self.kind = kind
+        self.key = key
+        self.payload = payload
+        self.slot = slot
+        self.rounds = rounds
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel driven by one background task. Scheduling and cancelling are O(1)
+    dict operations, so a mass disconnect costs one entry per socket instead of one sleeping
+    task each. Timers that expire on the same tick are handed to their kind's handler as
+    one batch, letting it coalesce the resulting broadcasts per room.
+    """
+
+    def __init__(self, tick: float, slots: int):
+        self.tick = tick
+        self._slots: List[Dict[Tuple[str, Hashable], _Timer]] = [{} for _ in range(slots)]
+        self._timers: Dict[Tuple[str, Hashable], _Timer] = {}
+        self._handlers: Dict[str, ExpiryHandler] = {}
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def register(self, kind: str, handler: ExpiryHandler):
+        self._handlers[kind] = handler
+
+    def schedule(self, kind: str, key: Hashable, delay: float, payload=None):
+        """Fire `kind` for `key` after `delay` seconds (rounded up to the tick), replacing any pending one."""
+        self.cancel(kind, key)
+        ticks = max(1, math.ceil(delay / self.tick - 1e-9))
+        slot = (self._cursor + ticks) % len(self._slots)
+        timer = _Timer(kind, key, payload, slot, (ticks - 1) // len(self._slots))
+        self._slots[slot][(kind, key)] = timer
+        self._timers[(kind, key)] = timer
+
+    def cancel(self, kind: str, key: Hashable) -> bool:
+        timer = self._timers.pop((kind, key), None)
+        if timer is None:
+            return False
+        del self._slots[timer.slot][(kind, key)]
+        return True
+
+    def pending(self, kind: str, key: Hashable) -> bool:
+        return (kind, key) in self._timers
+
+    def _advance(self, expired: Dict[str, List[Tuple[Hashable, object]]]):
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        bucket = self._slots[self._cursor]
+        for timer_key, timer in list(bucket.items()):
+            if timer.rounds:
+                timer.rounds -= 1
+                continue
+            del bucket[timer_key]
+            del self._timers[timer_key]
+            expired[timer.kind].append((timer.key, timer.payload))
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            expired: Dict[str, List[Tuple[Hashable, object]]] = defaultdict(list)
+            # Catch up on ticks missed while the loop was busy, then dispatch them together
+            now = loop.time()
+            while next_tick <= now:
+                self._advance(expired)
+                next_tick += self.tick
+            for kind, batch in expired.items():
+                handler = self._handlers.get(kind)
+                if handler is None:
+                    logger.warning(f"⚠️ No handler for {len(batch)} expired '{kind}' timers")
+                    continue
+                try:
+                    await handler(batch)
+                except Exception:
+                    logger.exception(f"❌ Timer handler for '{kind}' failed")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="timer-wheel")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+timers = TimerWheel(settings.TIMER_WHEEL_TICK_SECONDS, settings.TIMER_WHEEL_SLOTS)
+
+register_gauge_callback("quiz_timers_pending", "Timers scheduled on the timer wheel", lambda: len(timers))
+
+
+def start_timers():
+    timers.start()
+
+
+async def stop_timers():
+    await timers.stop()
@@ -0,0 +1,183 @@
+import gzip
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from config import settings
+from services.metrics_service import add_socket_event_observer, remove_socket_event_observer
+
+logger = logging.getLogger("uvicorn")
+
+TRACE_VERSION = 1
+TRACED_HTTP_PREFIX = "/api/game"
+# Responses whose ids the replayer needs to map recorded games onto a fresh instance
+TRACED_RESPONSE_ROUTES = {("POST", "/api/game/create"), ("POST", "/api/game/join")}
+MAX_TRACED_BODY_BYTES = 64 * 1024
+
+_writer: Optional["TraceWriter"] = None
+
+
+class TraceWriter:
+    """
+    Append-only JSON Lines trace (gzip when the path ends in .gz; gzip members append
+    cleanly). Records are queued from the event loop and encoded and written by a
+    background thread, so capture never blocks a game room on disk I/O.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.perf_counter()
+        self._queue: "queue.SimpleQueue[Optional[dict]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self.write({"k": "start", "v": TRACE_VERSION, "wall": datetime.utcnow().isoformat()})
+
+    def elapsed_ms(self, started: Optional[float] = None) -> float:
+        return round(((started or time.perf_counter()) - self.started) * 1000, 3)
+
+    def write(self, record: dict):
+        self._queue.put(record)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+
+    def _run(self):
+        opener = gzip.open if self.path.endswith(".gz") else open
+        with opener(self.path, "at", encoding="utf-8") as f:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    return
+                f.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+                # Flush whenever the queue drains so a crash loses at most the current burst
+                if self._queue.empty():
+                    f.flush()
+
+
+def tracing_enabled() -> bool:
+    return _writer is not None
+
+
+def _observe_socket_event(event: str, args: tuple, started: float, duration: float, outcome: str):
+    data = args[1] if len(args) > 1 and event not in ("connect", "disconnect") else None
+    _writer.write({
+        "k": "ev", "t": _writer.elapsed_ms(started), "sid": args[0] if args else None,
+        "e": event, "d": data, "dur": round(duration * 1000, 3), "ok": outcome == "ok"
+    })
+
+
+def start_trace():
+    global _writer
+    if not settings.TRACE_FILE or _writer is not None:
+        return
+    _writer = TraceWriter(settings.TRACE_FILE)
+    _writer.start()
+    add_socket_event_observer(_observe_socket_event)
+    logger.info(f"🎞️ Recording game traffic to {settings.TRACE_FILE}")
+
+
+def stop_trace():
+    global _writer
+    if _writer is None:
+        return
+    remove_socket_event_observer(_observe_socket_event)
+    _writer.close()
+    _writer = None
+
+
+def record_game_created(pin: str, quiz, questions):
+    """Snapshot the quiz a game plays, so a replay can recreate it on an empty instance."""
+    if _writer is None:
+        return
+    _writer.write({
+        "k": "quiz", "t": _writer.elapsed_ms(), "pin": pin, "title": quiz.title,
+        "questions": [
+            {
+                "id": q.id, "order": q.order, "question_text": q.question_text, "options": q.options,
+                "correct_answer": q.correct_answer, "time_limit": q.time_limit
+            }
+            for q in questions
+        ]
+    })
+
+
+def record_final_scores(pin: str, players):
+    if _writer is None:
+        return
+    _writer.write({"k": "final", "t": _writer.elapsed_ms(), "pin": pin, "scores": {p.name: p.score for p in players}})
+
+
+class TraceMiddleware:
+    """Records game-related HTTP requests (body, status, route template, duration) to the trace."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if _writer is None or scope["type"] != "http" or not scope["path"].startswith(TRACED_HTTP_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_body = bytearray()
+        response_body = bytearray()
+        status = 500
+        capture_response = (scope["method"], scope["path"]) in TRACED_RESPONSE_ROUTES
+
+        async def receive_wrapper():
+            message = await receive()
+            if message["type"] == "http.request" and len(request_body) <= MAX_TRACED_BODY_BYTES:
+                request_body.extend(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body" and capture_response:
+                response_body.extend(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            if _writer is not None:
+                route = scope.get("route")
+                _writer.write({
+                    "k": "http", "t": _writer.elapsed_ms(started), "m": scope["method"], "p": scope["path"],
+                    "rt": getattr(route, "path", None), "q": scope.get("query_string", b"").decode("latin-1"),
+                    "b": _decode_json(request_body), "s": status,
+                    "dur": round((time.perf_counter() - started) * 1000, 3),
+                    "r": _decode_json(response_body) if capture_response else None
+                })
+
+
+def _decode_json(body: bytes):
+    # Multipart uploads (certificate templates) and oversized bodies are not replayable
+    if not body or len(body) > MAX_TRACED_BODY_BYTES:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return None
+
+
+def read_trace(path: str):
+    """Yield trace records; a truncated last line (crash mid-write) is skipped."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+        except EOFError:
+            return
@@ -0,0 +1,67 @@
+"""
+Shared fixtures. Settings are read when config is first imported, so the throwaway database,
+journal and export directories are set in the environment before any app module loads.
+
+    cd backend
+    python -m pytest -q
+"""
+import itertools
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+_TMP_DIR = tempfile.mkdtemp(prefix="quiz_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_TMP_DIR}/test.db"
+os.environ["JOURNAL_DIR"] = f"{_TMP_DIR}/journal"
+os.environ["EXPORT_ARTIFACT_DIR"] = f"{_TMP_DIR}/exports"
+
+from database import init_db, SessionLocal, Quiz, Question, GameSession  # noqa: E402
+
+init_db()
+
+_pins = itertools.count(100000)
+
+
+@pytest.fixture
+def db():
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def client():
+    # Routes only; the lifespan (journal, room restore, timers) is not started
+    from fastapi.testclient import TestClient
+    from main import app
+    return TestClient(app)
+
+
+@pytest.fixture
+def quiz(db):
+    quiz = Quiz(title="Capitals of Europe", created_by="tests")
+    db.add(quiz)
+    db.flush()
+    db.add_all([
+        Question(quiz_id=quiz.id, question_text="Capital of France?", options=["Paris", "Rome"],
+                 correct_answer="Paris", time_limit=20, order=0),
+        Question(quiz_id=quiz.id, question_text="Capital of Italy?", options=["Paris", "Rome"],
+                 correct_answer="Rome", time_limit=20, order=1),
+    ])
+    db.commit()
+    return quiz
+
+
+@pytest.fixture
+def make_game(db, quiz):
+    """Create a game session of the quiz under a PIN no other test uses."""
+    def make(status: str = "waiting") -> GameSession:
+        game_session = GameSession(quiz_id=quiz.id, pin=str(next(_pins)), host_name="tests", status=status)
+        db.add(game_session)
+        db.commit()
+        return game_session
+    return make
@@ -0,0 +1,60 @@
+from database import Player
+
+
+def test_quiz_revalidates_with_304_until_it_changes(client, db, quiz):
+    first = client.get(f"/api/quiz/{quiz.id}")
+    etag = first.headers["etag"]
+
+    unchanged = client.get(f"/api/quiz/{quiz.id}", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304 and unchanged.content == b""
+    assert unchanged.headers["etag"] == etag
+
+    question_id = first.json()["questions"][0]["id"]
+    client.put(f"/api/quiz/{quiz.id}/questions/{question_id}", json={"question_text": "Capital city of France?"})
+
+    changed = client.get(f"/api/quiz/{quiz.id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.json()["questions"][0]["question_text"] == "Capital city of France?"
+
+
+def test_if_none_match_lists_and_wildcards(client, quiz):
+    etag = client.get(f"/api/quiz/{quiz.id}").headers["etag"]
+    strong = etag.removeprefix("W/")
+
+    def status(header):
+        return client.get(f"/api/quiz/{quiz.id}", headers={"If-None-Match": header}).status_code
+
+    assert status(f'"stale", {strong}') == 304  # weak comparison ignores the W/ prefix
+    assert status("*") == 304
+    assert status('W/"quiz-0-1"') == 200
+
+
+def test_game_results_change_etag_when_the_game_does(client, db, make_game):
+    game_session = make_game(status="active")
+    db.add(Player(game_session_id=game_session.id, name="Ann", score=500))
+    db.commit()
+    url = f"/api/game/{game_session.pin}/leaderboard"
+
+    live = client.get(url)
+    assert live.headers["cache-control"] == "private, no-cache"
+    assert client.get(url, headers={"If-None-Match": live.headers["etag"]}).status_code == 304
+
+    client.post(f"/api/game/{game_session.pin}/end")
+
+    finished = client.get(url, headers={"If-None-Match": live.headers["etag"]})
+    assert finished.status_code == 200 and finished.headers["etag"] != live.headers["etag"]
+    assert [entry["score"] for entry in finished.json()] == [500]
+
+
+def test_quiz_edits_invalidate_game_etags(client, db, quiz, make_game):
+    game_session = make_game(status="finished")
+    url = f"/api/game/{game_session.pin}/results"
+    etag = client.get(url).headers["etag"]
+
+    client.post(f"/api/quiz/{quiz.id}/questions/batch", json={"inserts": [
+        {"question_text": "Capital of Spain?", "options": ["Madrid", "Rome"], "correct_answer": "Madrid"}
+    ]})
+
+    refreshed = client.get(url, headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["total_questions"] == 3
@@ -0,0 +1,52 @@
+import asyncio
+
+from database import GameSession
+from services.game_state import GameRoom
+from services.socket_manager import _evict_rooms, _room_expiry_reason, active_games
+
+
+def _abandoned(game_session_id: int, **state) -> GameRoom:
+    room = GameRoom(game_session_id=game_session_id, **state)
+    room.expiry_reason = _room_expiry_reason(room)
+    assert room.expiry_reason == "abandoned"
+    return room
+
+
+def test_eviction_finalizes_active_games_only(db, make_game):
+    lobby, playing = make_game(), make_game(status="active")
+    active_games[lobby.pin] = _abandoned(lobby.id)
+    active_games[playing.pin] = _abandoned(playing.id, status="active", current_question=1)
+
+    asyncio.run(_evict_rooms([(lobby.pin, "abandoned"), (playing.pin, "abandoned")]))
+
+    assert lobby.pin not in active_games and playing.pin not in active_games
+    db.expire_all()
+    assert db.get(GameSession, lobby.id).status == "waiting"
+    finished = db.get(GameSession, playing.id)
+    assert finished.status == "finished" and finished.ended_at is not None
+    assert finished.current_question_index == 1
+
+
+def test_eviction_skips_rooms_whose_reason_changed(make_game):
+    game_session = make_game()
+    room = _abandoned(game_session.id)
+    active_games[game_session.pin] = room
+    room.host_sid = "host-sid"  # the host came back after the timer was set
+
+    asyncio.run(_evict_rooms([(game_session.pin, "abandoned")]))
+
+    assert active_games.pop(game_session.pin) is room
+
+
+def test_eviction_leaves_a_newer_game_on_the_same_pin_alone(db, make_game):
+    newer = make_game(status="active")
+    newer.current_question_index = 4
+    db.commit()
+    # A room still held for an earlier game whose PIN was freed and handed to `newer`
+    active_games[newer.pin] = _abandoned(newer.id + 1000, status="active", current_question=1)
+
+    asyncio.run(_evict_rooms([(newer.pin, "abandoned")]))
+
+    db.expire_all()
+    untouched = db.get(GameSession, newer.id)
+    assert untouched.status == "active" and untouched.current_question_index == 4
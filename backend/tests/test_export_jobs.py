@@ -0,0 +1,89 @@
+import asyncio
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from config import settings
+from services import export_jobs
+from services.export_jobs import JOB_DONE, artifact_path, submit_export, wait_for_export
+
+
+def _game(pin: str, revision: int = 1):
+    return SimpleNamespace(id=1, pin=pin, revision=revision, quiz=SimpleNamespace(revision=1))
+
+
+def _fake_csv_writer(monkeypatch):
+    calls = []
+
+    def write(game_session_id):
+        calls.append(game_session_id)
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w") as f:
+            f.write("name,score\n")
+        return path
+
+    async def run_inline(fn, *args):
+        await asyncio.sleep(0)  # let a second request arrive while the job is in flight
+        return fn(*args)
+
+    monkeypatch.setitem(export_jobs.EXPORT_FORMATS, "csv", (write, run_inline, "csv", "text/csv"))
+    return calls
+
+
+def _touch(path: str, size: int = 1, age_hours: float = 0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+    mtime = time.time() - age_hours * 3600
+    os.utime(path, (mtime, mtime))
+
+
+def test_identical_requests_share_one_job_and_reuse_the_artifact(monkeypatch):
+    calls = _fake_csv_writer(monkeypatch)
+
+    async def scenario():
+        first = submit_export(_game("700001"), "csv")
+        second = submit_export(_game("700001"), "csv")
+        await wait_for_export(first)
+        again = submit_export(_game("700001"), "csv")
+        changed = submit_export(_game("700001", revision=2), "csv")
+        await wait_for_export(changed)
+        return first, second, again, changed
+
+    first, second, again, changed = asyncio.run(scenario())
+
+    assert second is first and first["status"] == JOB_DONE
+    assert again is not first and again["status"] == JOB_DONE and again["task"] is None
+    assert changed["revision"] == "2.1" and changed["status"] == JOB_DONE
+    assert calls == [1, 1]  # one build per revision
+    assert not os.path.exists(artifact_path(("700001", "csv", "1.1")))  # superseded by 2.1
+
+
+def test_only_older_revisions_are_removed():
+    pin = "700002"
+    for revision in ("1.1", "2.1", "10.1"):
+        _touch(artifact_path((pin, "csv", revision)))
+    _touch(artifact_path((pin, "pdf", "1.1")))
+
+    export_jobs._remove_stale_artifacts((pin, "csv", "2.1"))
+
+    remaining = sorted(os.listdir(os.path.join(settings.EXPORT_ARTIFACT_DIR, pin)))
+    assert remaining == ["csv-10.1.csv", "csv-2.1.csv", "pdf-1.1.pdf"]
+
+
+def test_pruning_enforces_age_and_size_oldest_first(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_ARTIFACT_DIR", tempfile.mkdtemp(prefix="quiz_tests_prune_"))
+    monkeypatch.setattr(settings, "EXPORT_ARTIFACT_MAX_AGE_HOURS", 72)
+    monkeypatch.setattr(settings, "EXPORT_ARTIFACT_MAX_BYTES", 250)
+    expired = artifact_path(("700003", "csv", "1.1"))
+    oldest, newer = artifact_path(("700004", "csv", "1.1")), artifact_path(("700005", "csv", "1.1"))
+    kept = artifact_path(("700006", "csv", "1.1"))
+    _touch(expired, size=10, age_hours=100)
+    _touch(oldest, size=100, age_hours=3)
+    _touch(newer, size=100, age_hours=2)
+    _touch(kept, size=100, age_hours=200)  # the artifact just built is never pruned
+
+    export_jobs._prune_artifacts(kept)
+
+    assert [os.path.exists(path) for path in (expired, oldest, newer, kept)] == [False, False, True, True]
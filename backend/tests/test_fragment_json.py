@@ -0,0 +1,35 @@
+import json
+
+import pytest
+from socketio import packet
+
+from services.game_state import FragmentJSON, JSONFragment
+from services.socket_manager import sio
+
+
+def test_fragments_are_spliced_in_verbatim():
+    fragment = JSONFragment('{"index":2,"options":["a","b"]}')
+
+    text = FragmentJSON.dumps({"question": fragment, "list": [fragment, 1]}, separators=(",", ":"))
+
+    assert text.count('{"index":2,"options":["a","b"]}') == 2
+    assert json.loads(text) == {"question": {"index": 2, "options": ["a", "b"]}, "list": [fragment.decode(), 1]}
+
+
+def test_strings_that_look_like_placeholders_are_left_alone():
+    text = FragmentJSON.dumps({"name": "\x00fragment-0", "q": JSONFragment("[1]")})
+
+    assert json.loads(text) == {"name": "\x00fragment-0", "q": [1]}
+
+
+def test_other_objects_still_fail_to_encode():
+    with pytest.raises(TypeError):
+        FragmentJSON.dumps({"value": object()})
+
+
+def test_socketio_packets_embed_cached_payloads():
+    payload = JSONFragment.encode({"question_text": "Capital of France?"})
+
+    encoded = sio.packet_class(packet.EVENT, data=["question_update", payload], namespace="/").encode()
+
+    assert '["question_update",{"question_text":"Capital of France?"}]' in encoded
@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from database import Answer, Player, Question
+from services.analytics_service import analyze_quiz, compute_item_analysis
+
+
+def _matrix(scores):
+    scores = np.array(scores, dtype=np.int8)
+    participants, num_questions = scores.shape
+    return {
+        "questions": [
+            SimpleNamespace(id=n + 1, order=n, question_text=f"Q{n}", options=[], correct_answer="a")
+            for n in range(num_questions)
+        ],
+        "sessions": 1,
+        "answers": scores.size,
+        "scores": scores,
+        "answered": np.ones(scores.shape, dtype=bool),
+        "times": np.full(scores.shape, np.nan, dtype=np.float32),
+        "answer_columns": np.zeros(0, dtype=np.int64),
+        "answer_texts": np.zeros(0, dtype=str),
+    }
+
+
+def test_classical_statistics_match_hand_computed_values():
+    analysis = compute_item_analysis(_matrix([
+        [1, 1, 1],
+        [1, 1, 0],
+        [1, 0, 0],
+        [0, 0, 0],
+    ]))
+
+    items = analysis["questions"]
+    assert [item["difficulty"] for item in items] == [0.75, 0.5, 0.25]
+    # One participant per 27% group: the top scorer against the bottom one
+    assert [item["discrimination"] for item in items] == [1.0, 1.0, 1.0]
+    # Item 1 against the rest score [2, 1, 0, 0]: 0.75 / sqrt(0.75 * 2.75)
+    assert items[0]["point_biserial"] == pytest.approx(0.5222, abs=1e-4)
+    # 3/2 * (1 - (0.25 + 1/3 + 0.25) / (5/3))
+    assert analysis["cronbach_alpha"] == 0.75
+
+
+def test_degenerate_items_report_null_instead_of_nan():
+    analysis = compute_item_analysis(_matrix([[1, 0], [1, 1]]))
+
+    always_right = analysis["questions"][0]
+    assert always_right["difficulty"] == 1.0
+    assert always_right["point_biserial"] is None  # no variance to correlate
+    assert compute_item_analysis(_matrix(np.zeros((0, 2))))["questions"][0]["difficulty"] is None
+
+
+def test_quiz_analysis_pools_sessions_options_and_times(db, quiz, make_game):
+    france, italy = db.query(Question).filter(Question.quiz_id == quiz.id).order_by(Question.order).all()
+    first, second = make_game(status="finished"), make_game(status="finished")
+    ann, bo = Player(game_session_id=first.id, name="Ann"), Player(game_session_id=first.id, name="Bo")
+    cy, dee = Player(game_session_id=second.id, name="Cy"), Player(game_session_id=second.id, name="Dee")
+    db.add_all([ann, bo, cy, dee])
+    db.flush()
+    db.add_all([
+        Answer(player_id=ann.id, question_id=france.id, answer="Paris", is_correct=True, time_taken=4.0),
+        Answer(player_id=ann.id, question_id=italy.id, answer="Rome", is_correct=True, time_taken=6.0),
+        Answer(player_id=bo.id, question_id=france.id, answer="Rome", is_correct=False, time_taken=8.0),
+        Answer(player_id=bo.id, question_id=italy.id, answer="", is_correct=False, time_taken=10.0),
+        Answer(player_id=cy.id, question_id=france.id, answer="Paris", is_correct=True, time_taken=2.0),
+    ])
+    db.commit()
+
+    analysis = analyze_quiz(quiz.id)
+
+    # Dee never answered and is not a participant; Cy's missing answer counts as incorrect
+    assert (analysis["sessions"], analysis["participants"], analysis["answers"]) == (2, 3, 5)
+    q_france, q_italy = analysis["questions"]
+    assert (q_france["responses"], q_france["difficulty"]) == (3, 0.6667)
+    options = [(o["option"], o["count"], o["rate"]) for o in q_france["options"]]
+    assert options == [("Paris", 2, 0.6667), ("Rome", 1, 0.3333)]
+    assert q_france["time_taken"]["p50"] == 4.0
+    assert (q_italy["responses"], q_italy["difficulty"], q_italy["difficulty_answered"]) == (2, 0.3333, 0.5)
+    assert q_italy["unmatched_rate"] == 0.5
+    assert (q_italy["time_taken"]["p25"], q_italy["time_taken"]["p50"]) == (7.0, 8.0)
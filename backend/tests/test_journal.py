@@ -0,0 +1,104 @@
+import asyncio
+import os
+import time
+
+from config import settings
+from services import journal_service
+from services.game_state import GameRoom
+from services.socket_manager import _evict_rooms, _room_expiry_reason, active_games
+
+
+def _journal(events):
+    journal_service.start_journal()
+    try:
+        for pin, game_session_id, kind, data in events:
+            journal_service.append_event(pin, game_session_id, kind, data)
+    finally:
+        journal_service.stop_journal()  # drains the queue and fsyncs
+
+
+def test_replay_rebuilds_rooms_that_were_never_snapshotted(make_game):
+    game_session = make_game(status="active")
+    pin, game_id = game_session.pin, game_session.id
+    _journal([
+        (pin, game_id, "join", {"name": "Ann", "player_id": 1}),
+        (pin, game_id, "join", {"name": "Bo", "player_id": 2}),
+        (pin, game_id, "leave", {"name": "Bo", "player_id": 2}),
+        (pin, game_id, "start", None),
+        (pin, game_id, "question", {"index": 1, "question_text": "Capital of Italy?"}),
+    ])
+
+    rooms = {}
+    assert journal_service.replay_journals(rooms) >= 5
+
+    room = rooms[pin]
+    assert room.game_session_id == game_id
+    assert [p.name for p in room.players.values()] == ["Ann"]
+    assert (room.status, room.current_question) == ("active", 1)
+
+
+def test_replay_applies_only_events_after_the_snapshot(make_game):
+    game_session = make_game(status="active")
+    pin, game_id = game_session.pin, game_session.id
+    _journal([(pin, game_id, "join", {"name": "Ann", "player_id": 1})])
+    snapshot = GameRoom.from_snapshot({
+        "status": "waiting", "current_question": 0, "players": [["Ann", 1, 0]],
+        "journal_seq": max(r.seq for r in journal_service.read_journal((pin, game_id))), "game_session_id": game_id,
+    })
+    _journal([(pin, game_id, "start", None)])
+
+    rooms = {pin: snapshot}
+    journal_service.replay_journals(rooms)
+
+    assert len(rooms[pin].players) == 1
+    assert rooms[pin].status == "active"
+
+
+def test_replay_drops_journals_of_a_reused_pin(make_game):
+    game_session = make_game()
+    pin, stale_id = game_session.pin, game_session.id + 1000  # an earlier game that held this PIN
+    _journal([(pin, stale_id, "join", {"name": "Ghost", "player_id": 9})])
+
+    rooms = {}
+    journal_service.replay_journals(rooms)
+
+    assert pin not in rooms
+    assert not os.path.exists(os.path.join(settings.JOURNAL_DIR, pin, str(stale_id)))
+
+
+def test_evicted_rooms_keep_their_journal_compacted(make_game):
+    game_session = make_game(status="active")
+    pin, game_id = game_session.pin, game_session.id
+    room = GameRoom(game_session_id=game_id, status="active")
+    room.expiry_reason = _room_expiry_reason(room)
+    active_games[pin] = room
+
+    journal_service.start_journal()
+    try:
+        journal_service.append_event(pin, game_id, "join", {"name": "Ann", "player_id": 1})
+        journal_service.append_event(pin, game_id, "start", None)
+        asyncio.run(_evict_rooms([(pin, room.expiry_reason)]))
+    finally:
+        journal_service.stop_journal()
+
+    assert pin not in active_games
+    assert os.listdir(os.path.join(settings.JOURNAL_DIR, pin, str(game_id))) == [journal_service.COMPACTED_SEGMENT]
+    assert [r.kind for r in journal_service.read_journal((pin, game_id))] == ["join", "start"]
+    rooms = {}
+    journal_service.replay_journals(rooms)
+    assert pin not in rooms  # a finished record, not a room to bring back
+
+
+def test_replay_drops_journals_past_retention(make_game, monkeypatch):
+    old, recent = make_game(status="finished"), make_game(status="finished")
+    _journal([(g.pin, g.id, "start", None) for g in (old, recent)])
+    old_dir = os.path.join(settings.JOURNAL_DIR, old.pin, str(old.id))
+    two_days_ago = time.time() - 2 * 86400
+    for name in os.listdir(old_dir):
+        os.utime(os.path.join(old_dir, name), (two_days_ago, two_days_ago))
+
+    monkeypatch.setattr(settings, "JOURNAL_RETENTION_DAYS", 1)
+    journal_service.replay_journals({})
+
+    assert not os.path.exists(old_dir)
+    assert [r.kind for r in journal_service.read_journal((recent.pin, recent.id))] == ["start"]
@@ -0,0 +1,60 @@
+import pytest
+
+from database import GameSession, Question, Quiz
+from services.game_state import GameRoom
+from services.socket_manager import active_games
+
+
+def _first_question(db, quiz) -> Question:
+    return db.query(Question).filter(Question.quiz_id == quiz.id).order_by(Question.order).first()
+
+
+def _edits(client, quiz, question_id):
+    return [
+        client.put(f"/api/quiz/{quiz.id}/questions/{question_id}", json={"time_limit": 25}),
+        client.post(f"/api/quiz/{quiz.id}/questions/batch", json={"updates": [{"id": question_id, "time_limit": 30}]}),
+        client.delete(f"/api/quiz/{quiz.id}/questions/{question_id}"),
+        client.delete(f"/api/quiz/{quiz.id}"),
+    ]
+
+
+def test_a_game_being_played_blocks_edits(client, db, quiz, make_game, monkeypatch):
+    game_session = make_game(status="active")
+    monkeypatch.setitem(active_games, game_session.pin, GameRoom(game_session_id=game_session.id, status="active"))
+
+    responses = _edits(client, quiz, _first_question(db, quiz).id)
+
+    assert [r.status_code for r in responses] == [409, 409, 409, 409]
+    assert game_session.pin in responses[0].json()["detail"]
+
+
+def test_an_active_session_without_a_room_does_not_block_edits(client, db, quiz, make_game):
+    # e.g. a game whose host never ended it, or whose room was lost in a restart
+    make_game(status="active")
+    question_id = _first_question(db, quiz).id
+
+    assert client.put(f"/api/quiz/{quiz.id}/questions/{question_id}", json={"time_limit": 25}).status_code == 200
+    assert client.delete(f"/api/quiz/{quiz.id}").status_code == 200
+
+
+@pytest.mark.parametrize("status", ["waiting", "finished"])
+def test_rooms_not_in_play_do_not_block_edits(client, db, quiz, make_game, monkeypatch, status):
+    game_session = make_game(status=status)
+    monkeypatch.setitem(active_games, game_session.pin, GameRoom(game_session_id=game_session.id, status=status))
+
+    responses = _edits(client, quiz, _first_question(db, quiz).id)
+
+    assert [r.status_code for r in responses] == [200, 200, 200, 200]
+
+
+def test_a_game_of_another_quiz_does_not_block_edits(client, db, quiz, monkeypatch):
+    other_quiz = Quiz(title="Rivers", created_by="tests")
+    db.add(other_quiz)
+    db.flush()
+    other = GameSession(quiz_id=other_quiz.id, pin="999999", host_name="tests", status="active")
+    db.add(other)
+    db.commit()
+    monkeypatch.setitem(active_games, other.pin, GameRoom(game_session_id=other.id, status="active"))
+    question_id = _first_question(db, quiz).id
+
+    assert client.put(f"/api/quiz/{quiz.id}/questions/{question_id}", json={"time_limit": 25}).status_code == 200
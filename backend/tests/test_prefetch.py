@@ -0,0 +1,43 @@
+import base64
+import time
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from services.game_state import JSONFragment
+from services.prefetch_service import record_visible, reveal_payload, stage_question
+
+
+def _open(staged_payload: JSONFragment, reveal: dict) -> str:
+    body = staged_payload.decode()
+    key, iv, data = (base64.b64decode(value) for value in (reveal["key"], body["iv"], body["data"]))
+    return AESGCM(key).decrypt(iv, data, None).decode("utf-8")
+
+
+def test_staged_question_opens_with_the_revealed_key_only():
+    question = JSONFragment.encode({"index": 4, "question_text": "Capital of Norway?", "options": ["Oslo", "Bergen"]})
+
+    staged = stage_question(4, question)
+    reveal = reveal_payload(staged, opened_at=1700000000.5)
+
+    assert "Oslo" not in staged.payload.text
+    assert staged.payload.decode()["index"] == reveal["index"] == 4
+    assert reveal["server_ts"] == 1700000000500
+    assert _open(staged.payload, reveal) == question.text
+
+
+def test_every_staging_uses_a_fresh_key_and_nonce():
+    question = JSONFragment.encode({"index": 0, "question_text": "Capital of Peru?"})
+
+    first, second = stage_question(0, question), stage_question(0, question)
+
+    assert first.key != second.key
+    assert first.payload.decode()["iv"] != second.payload.decode()["iv"]
+
+
+def test_implausible_visibility_reports_are_rejected():
+    now = time.time()
+
+    assert record_visible("staged", now - 0.2, 35) is True
+    assert record_visible("live", 0, None) is False
+    assert record_visible("live", now - 3600, None) is False
+    assert record_visible("live", now + 60, None) is False
@@ -0,0 +1,80 @@
+from database import Question
+
+
+def _questions(db, quiz):
+    db.expire_all()
+    return db.query(Question).filter(Question.quiz_id == quiz.id).order_by(Question.order).all()
+
+
+def _new(text, **extra):
+    return {"question_text": text, "options": ["Yes", "No"], "correct_answer": "Yes", "time_limit": 15, **extra}
+
+
+def _batch(client, quiz, **body):
+    return client.post(f"/api/quiz/{quiz.id}/questions/batch", json=body)
+
+
+def test_batch_applies_edits_inserts_deletes_and_order(client, db, quiz):
+    france, italy = _questions(db, quiz)
+
+    response = _batch(
+        client, quiz,
+        updates=[{"id": italy.id, "question_text": "Capital city of Italy?", "time_limit": 30}],
+        inserts=[_new("Capital of Spain?", position=0), _new("Capital of Greece?")],
+        deletes=[france.id],
+    )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    spain, greece = body["inserted"]
+    assert body["order"] == [spain, italy.id, greece]
+    assert body["deleted"] == [france.id]
+    questions = _questions(db, quiz)
+    assert [q.id for q in questions] == [spain, italy.id, greece]
+    assert [q.order for q in questions] == [0, 1, 2]
+    assert (questions[1].question_text, questions[1].time_limit) == ("Capital city of Italy?", 30)
+
+
+def test_inserts_land_at_their_positions_in_the_new_order(client, db, quiz):
+    france, italy = _questions(db, quiz)
+
+    body = _batch(
+        client, quiz,
+        order=[italy.id, france.id],
+        inserts=[_new("Capital of Malta?", position=2), _new("Capital of Spain?", position=1)],
+    ).json()
+
+    questions = _questions(db, quiz)
+    assert [q.id for q in questions] == body["order"]
+    assert [q.question_text for q in questions] == ["Capital of Italy?", "Capital of Spain?", "Capital of Malta?",
+                                                    "Capital of France?"]
+
+
+def test_order_must_list_every_remaining_question_once(client, db, quiz):
+    france, italy = _questions(db, quiz)
+
+    for order, deletes in (([italy.id], []), ([italy.id, france.id, italy.id], []), ([italy.id, france.id], [france.id])):
+        response = _batch(client, quiz, order=order, deletes=deletes)
+        assert response.status_code == 400, order
+
+    assert [q.id for q in _questions(db, quiz)] == [france.id, italy.id]
+
+
+def test_conflicting_or_unknown_targets_are_rejected(client, db, quiz):
+    france, italy = _questions(db, quiz)
+
+    both = _batch(client, quiz, updates=[{"id": france.id, "time_limit": 30}], deletes=[france.id])
+    twice = _batch(client, quiz, updates=[{"id": france.id, "time_limit": 30}, {"id": france.id, "time_limit": 40}])
+    unknown = _batch(client, quiz, deletes=[italy.id + 10_000])
+
+    assert (both.status_code, twice.status_code, unknown.status_code) == (400, 400, 404)
+    assert [q.time_limit for q in _questions(db, quiz)] == [20, 20]
+
+
+def test_null_fields_are_rejected_not_written(client, db, quiz):
+    france, _ = _questions(db, quiz)
+
+    response = _batch(client, quiz, updates=[{"id": france.id, "correct_answer": None}])
+
+    assert response.status_code == 422
+    assert _questions(db, quiz)[0].correct_answer == "Paris"
@@ -0,0 +1,53 @@
+from database import Answer, Player, Question
+from services.regrade_service import regrade_questions
+from services.socket_manager import calculate_score
+
+
+def test_regrade_rescores_answers_and_moves_player_totals(db, quiz, make_game):
+    game_session = make_game(status="finished")
+    question = db.query(Question).filter(Question.quiz_id == quiz.id, Question.order == 0).one()
+    rome_points = calculate_score(True, 5.0, question.time_limit)
+    paris_points = calculate_score(True, 2.0, question.time_limit)
+
+    wrong, right = Player(game_session_id=game_session.id, name="Ann"), Player(game_session_id=game_session.id, name="Bo")
+    db.add_all([wrong, right])
+    db.flush()
+    right.score = paris_points
+    db.add_all([
+        Answer(player_id=wrong.id, question_id=question.id, answer="Rome", is_correct=False, time_taken=5.0, points_earned=0),
+        Answer(player_id=right.id, question_id=question.id, answer="Paris", is_correct=True, time_taken=2.0,
+               points_earned=paris_points),
+    ])
+    db.commit()
+
+    question.correct_answer = "Rome"
+    db.flush()
+    summary = regrade_questions(db, [question.id])
+    db.commit()
+
+    assert summary["answers_changed"] == 2
+    assert summary["players_updated"] == 2
+    assert summary["games"] == [game_session.pin]
+    db.refresh(wrong)
+    db.refresh(right)
+    assert (wrong.score, right.score) == (rome_points, 0)
+    answers = {a.player_id: a for a in db.query(Answer).filter(Answer.question_id == question.id)}
+    assert answers[wrong.id].is_correct and answers[wrong.id].points_earned == rome_points
+    assert not answers[right.id].is_correct and answers[right.id].points_earned == 0
+
+
+def test_regrade_leaves_unchanged_answers_alone(db, quiz, make_game):
+    game_session = make_game(status="finished")
+    question = db.query(Question).filter(Question.quiz_id == quiz.id, Question.order == 1).one()
+    player = Player(game_session_id=game_session.id, name="Cy", score=calculate_score(True, 4.0, question.time_limit))
+    db.add(player)
+    db.flush()
+    db.add(Answer(player_id=player.id, question_id=question.id, answer="Rome", is_correct=True, time_taken=4.0,
+                  points_earned=player.score))
+    db.commit()
+
+    summary = regrade_questions(db, [question.id])
+
+    assert summary["answers_checked"] == 1
+    assert summary["answers_changed"] == 0
+    assert summary["games"] == []
@@ -0,0 +1,48 @@
+import pytest
+
+from database import Question, Quiz, SessionLocal
+from services import search_service
+from services.search_service import MAX_RANKED_CANDIDATES, ensure_search_index, index_questions
+
+
+@pytest.fixture(scope="module", autouse=True)
+def search_index():
+    ensure_search_index()
+    if search_service._backend != "fts5":
+        pytest.skip("SQLite build without FTS5")
+
+
+@pytest.fixture(scope="module")
+def glacier_bank():
+    with SessionLocal() as db:
+        quiz = Quiz(title="Glaciers", created_by="tests")
+        db.add(quiz)
+        db.flush()
+        questions = [
+            Question(quiz_id=quiz.id, question_text=f"Which glacier is number {n}?", options=["a", "b"],
+                     correct_answer="a", time_limit=20, order=n)
+            for n in range(MAX_RANKED_CANDIDATES + 5)
+        ]
+        questions.append(Question(quiz_id=quiz.id, question_text="Which fjord did a glacier carve?", options=["a", "b"],
+                                  correct_answer="a", time_limit=20, order=len(questions)))
+        db.add_all(questions)
+        db.flush()
+        index_questions(db, questions)
+        db.commit()
+
+
+def test_broad_queries_report_that_ranking_was_capped(client, glacier_bank):
+    body = client.get("/api/quiz/search", params={"q": "glacier", "limit": 5}).json()
+
+    assert (body["candidates"], body["truncated"]) == (MAX_RANKED_CANDIDATES, True)
+    assert len(body["results"]) == 5
+
+    past_candidates = client.get("/api/quiz/search", params={"q": "glacier", "offset": MAX_RANKED_CANDIDATES}).json()
+    assert past_candidates["results"] == [] and past_candidates["truncated"]
+
+
+def test_narrow_queries_are_not_truncated(client, glacier_bank):
+    body = client.get("/api/quiz/search", params={"q": "fjord glacier"}).json()
+
+    assert (body["candidates"], body["truncated"]) == (1, False)
+    assert [r["question_text"] for r in body["results"]] == ["Which fjord did a glacier carve?"]
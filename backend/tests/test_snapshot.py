@@ -0,0 +1,16 @@
+import json
+
+from services.game_state import GameRoom, JSONFragment, PlayerState
+
+
+def test_snapshot_round_trip():
+    room = GameRoom(status="active", current_question=3, game_session_id=7)
+    room.add_player("sid-1", PlayerState("Ann", 11, 1200))
+    room.add_player("sid-2", PlayerState("Bo", None, 0))
+    room.current_question_data = JSONFragment.encode({"index": 3, "question_text": "Capital of Spain?"})
+
+    restored = GameRoom.from_snapshot(json.loads(json.dumps(room.to_snapshot())))
+
+    assert (restored.status, restored.current_question, restored.game_session_id) == ("active", 3, 7)
+    assert sorted((p.name, p.player_id, p.score) for p in restored.players.values()) == [("Ann", 11, 1200), ("Bo", None, 0)]
+    assert restored.current_question_data.decode()["question_text"] == "Capital of Spain?"
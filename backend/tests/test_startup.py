@@ -0,0 +1,9 @@
+from benchmarks.bench_startup import DEFAULT_MAX_SECONDS, measure
+
+
+def test_app_import_defers_heavy_modules_and_stays_within_budget():
+    # Export, parsing and analytics libraries load on first use, not when the app starts
+    report = measure(runs=3)
+
+    assert report["heavy_modules_loaded"] == []
+    assert report["median_seconds"] <= DEFAULT_MAX_SECONDS, report
@@ -0,0 +1,69 @@
+import asyncio
+from collections import defaultdict
+
+from services.timer_service import TimerWheel
+
+
+def _advance(wheel: TimerWheel, ticks: int) -> dict:
+    expired = defaultdict(list)
+    for _ in range(ticks):
+        wheel._advance(expired)
+    return dict(expired)
+
+
+def test_delay_rounds_up_to_whole_ticks():
+    wheel = TimerWheel(tick=0.25, slots=8)
+    wheel.schedule("grace", "a", 0.3, "payload")  # 1.2 ticks -> fires on the 2nd
+
+    assert _advance(wheel, 1) == {}
+    assert _advance(wheel, 1) == {"grace": [("a", "payload")]}
+    assert len(wheel) == 0
+
+
+def test_delays_longer_than_the_wheel_wait_extra_rounds():
+    wheel = TimerWheel(tick=0.25, slots=8)
+    wheel.schedule("expiry", "room", 5.0)  # 20 ticks on an 8-slot wheel
+
+    assert _advance(wheel, 19) == {}
+    assert _advance(wheel, 1) == {"expiry": [("room", None)]}
+
+
+def test_exact_multiples_do_not_fire_a_tick_late():
+    wheel = TimerWheel(tick=0.1, slots=4)
+    wheel.schedule("stage", "q", 0.3)  # 0.3 / 0.1 is 2.9999... in floating point
+
+    assert _advance(wheel, 2) == {}
+    assert _advance(wheel, 1) == {"stage": [("q", None)]}
+
+
+def test_schedule_replaces_and_cancel_removes():
+    wheel = TimerWheel(tick=0.25, slots=8)
+    wheel.schedule("grace", "a", 1.0, "first")
+    wheel.schedule("grace", "a", 0.25, "second")
+
+    assert len(wheel) == 1
+    assert _advance(wheel, 1) == {"grace": [("a", "second")]}
+
+    wheel.schedule("grace", "b", 1.0)
+    assert wheel.cancel("grace", "b") is True
+    assert wheel.cancel("grace", "b") is False
+    assert _advance(wheel, 8) == {}
+
+
+def test_timers_expiring_together_reach_the_handler_as_one_batch():
+    batches = []
+
+    async def handler(batch):
+        batches.append(sorted(batch))
+
+    async def run():
+        wheel = TimerWheel(tick=0.01, slots=16)
+        wheel.register("grace", handler)
+        for key in ("a", "b", "c"):
+            wheel.schedule("grace", key, 0.02, key.upper())
+        wheel.start()
+        await asyncio.sleep(0.1)
+        await wheel.stop()
+
+    asyncio.run(run())
+    assert batches == [[("a", "A"), ("b", "B"), ("c", "C")]]
@@ -1,6 +1,5 @@
 import random
 import string
-import qrcode
 from io import BytesIO
 import base64
 
@@ -12,6 +11,8 @@ def generate_game_pin(length: int = 6) -> str:
 
 def generate_qr_code(data: str) -> str:
     """Generate QR code and return as base64 encoded string"""
+    import qrcode
+    
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
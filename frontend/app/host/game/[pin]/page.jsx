@@ -136,15 +136,10 @@ export default function HostGamePage() {
     if (lastBroadcastedIndex.current === currentIndex) return;
 
     const socket = getSocket();
+    // The server holds the quiz; players get its copy of the question, without the answer
     socket.emit("next_question", {
       pin,
       question_index: currentIndex,
-      question_data: {
-        id: currentQuestion.id,
-        question_text: currentQuestion.question_text,
-        options: currentQuestion.options,
-        time_limit: currentQuestion.time_limit || 30,
-      },
     });
 
     lastBroadcastedIndex.current = currentIndex;
@@ -7,6 +7,15 @@ import { motion } from 'framer-motion'
 import { getSocket } from '@/lib/socket'
 import { gameAPI } from '@/lib/api'
 
+const fromBase64 = (value) => Uint8Array.from(atob(value), (c) => c.charCodeAt(0))
+
+// Decrypt a question pushed ahead of time (question_staged) with the key from question_reveal
+async function openStagedQuestion(staged, key) {
+  const cryptoKey = await crypto.subtle.importKey('raw', fromBase64(key), 'AES-GCM', false, ['decrypt'])
+  const plain = await crypto.subtle.decrypt({ name: 'AES-GCM', iv: fromBase64(staged.iv) }, cryptoKey, fromBase64(staged.data))
+  return JSON.parse(new TextDecoder().decode(plain))
+}
+
 export default function PlayerGamePage() {
   const router = useRouter()
   const [pin, setPin] = useState('')
@@ -58,14 +67,30 @@ export default function PlayerGamePage() {
     }
 
     const socket = getSocket()
+    const seat = {
+      pin,
+      name: storedName,
+      player_id: Number(storedPlayerId),
+      // WebCrypto only exists on secure origins; without it questions arrive in full
+      prefetch: Boolean(window.crypto?.subtle),
+    }
+    // Next question, still encrypted, pushed while the previous results are showing
+    let staged = null
+    // After the first join, reconnects reclaim the seat without a lobby-wide broadcast
+    let joined = false
 
     const onConnect = () => {
       setConnected(true)
-      socket.emit('join_lobby', {
-        pin,
-        name: storedName,
-        player_id: Number(storedPlayerId),
-      })
+      if (joined) {
+        socket.emit('resume', seat)
+      } else {
+        joined = true
+        socket.emit('join_lobby', seat)
+      }
+    }
+
+    const onResumeFailed = () => {
+      socket.emit('join_lobby', seat)
     }
 
     const onDisconnect = () => setConnected(false)
@@ -74,7 +99,7 @@ export default function PlayerGamePage() {
       setStatus('playing')
     }
 
-    const onQuestionUpdate = (payload) => {
+    const showQuestion = (payload) => {
       setStatus('playing')
       setQuestion(payload)
       setTimeLeft(payload?.time_limit || 30)
@@ -83,6 +108,47 @@ export default function PlayerGamePage() {
       setSubmitting(false)
     }
 
+    // Tell the server once the question has been painted (time-to-visible metrics)
+    const reportVisible = (index, receivedAt) => {
+      requestAnimationFrame(() => setTimeout(() => {
+        socket.emit('question_visible', { pin, index, render_ms: performance.now() - receivedAt })
+      }, 0))
+    }
+
+    const onQuestionUpdate = (payload) => {
+      const receivedAt = performance.now()
+      showQuestion(payload)
+      reportVisible(payload?.index, receivedAt)
+    }
+
+    const onQuestionStaged = (payload) => {
+      staged = payload
+    }
+
+    const onQuestionReveal = async (payload) => {
+      const receivedAt = performance.now()
+      try {
+        if (!staged || staged.index !== payload?.index) throw new Error('question not staged')
+        const next = await openStagedQuestion(staged, payload.key)
+        staged = null
+        showQuestion(next)
+        reportVisible(next.index, receivedAt)
+      } catch {
+        // Missed or unreadable push: fetch the current question from the server instead
+        socket.emit('resume', seat)
+      }
+    }
+
+    const onResumeState = (payload) => {
+      if (payload?.status === 'finished') {
+        setStatus('ended')
+      } else if (payload?.question) {
+        showQuestion(payload.question)
+      } else if (payload?.status === 'active') {
+        setStatus('playing')
+      }
+    }
+
     const onSocketError = (payload) => {
       setError(payload?.message || 'Socket error')
     }
@@ -95,8 +161,12 @@ export default function PlayerGamePage() {
     socket.on('disconnect', onDisconnect)
     socket.on('game_started', onGameStarted)
     socket.on('question_update', onQuestionUpdate)
+    socket.on('question_staged', onQuestionStaged)
+    socket.on('question_reveal', onQuestionReveal)
     socket.on('game_ended', onGameEnded)
     socket.on('error', onSocketError)
+    socket.on('resume_state', onResumeState)
+    socket.on('resume_failed', onResumeFailed)
 
     if (socket.connected) {
       onConnect()
@@ -107,8 +177,12 @@ export default function PlayerGamePage() {
       socket.off('disconnect', onDisconnect)
       socket.off('game_started', onGameStarted)
       socket.off('question_update', onQuestionUpdate)
+      socket.off('question_staged', onQuestionStaged)
+      socket.off('question_reveal', onQuestionReveal)
       socket.off('game_ended', onGameEnded)
       socket.off('error', onSocketError)
+      socket.off('resume_state', onResumeState)
+      socket.off('resume_failed', onResumeFailed)
     }
   }, [pin, pinResolved, router])
 